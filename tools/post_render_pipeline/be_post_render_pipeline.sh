@@ -7,6 +7,7 @@
 # 1. Remove warmup frames from rendered image folder
 # 2. Generate H.264 .mp4 movies for rendered sequences
 # 3. Extract depth and segmentation masks if required EXR images were generated
+# 4. Convert camera ground truth .csv files to .npz with precomputed camera matrices if not already done in Unreal
 #
 # Usage: 
 # + Run from Windows WSL2 (Python 3.10)
@@ -18,6 +19,7 @@
 # Requirements: 
 # + ffmpeg (see `create_movies_from_images.py` for details`)
 # + OpenEXR virtual environment (see `exr_save_depth_masks.py` for details)
+# + numpy (see `be_camera_ground_truth.py` for details)
 #
 VENV_PATH="$HOME/.virtualenvs/openexr"
 
@@ -96,3 +98,7 @@ if [ -n "$HAVE_EXR" ]; then
     ./exr_save_depth_masks.py "$EXR_FOLDER" "${RENDER_OUTPUT_DIRECTORY%/}/" > /dev/null
     deactivate
 fi
+
+# Binary camera ground truth, only for .csv files without up-to-date .npz file
+echo "Saving binary camera ground truth (.npz)"
+python3 ../../unreal/render/Core/Python/be_camera_ground_truth.py "${RENDER_OUTPUT_DIRECTORY%/}/ground_truth/camera"
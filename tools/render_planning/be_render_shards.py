@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Render cost model and render node sharding planner for body scene definition files (be_seq.csv)
+#
+# Render time of a sequence is estimated per render job (PNG, optional EXR depth/mask pass) as linear model of the sequence features:
+#   time = job + output_frames * (frame + bodies * body + clothing * clothing_body + overlay * overlay_body + hair * hair_body)
+# Frame terms are multiplied by the number of camera views (View rows). Coefficients are fitted from past render timings
+# (render_movie_render_queue.py telemetry, be_render_telemetry.jsonl), the default coefficients are rough estimates.
+# Coefficients which the timings cannot identify (collinear features, for example a fixed number of clothed bodies) are fitted
+# with the smallest relative deviation from the default coefficients.
+#
+# Sequences are assigned to render nodes longest processing time first (LPT): most expensive sequence first to the node with
+# the lowest predicted render time. Each shard is saved as sequence name list file which can be used directly as
+# NAME_LIST_FILE of create_movie_render_queue.py asset registry mode.
+#
+# Usage:
+#   be_render_shards.py fit TELEMETRY_JSONL MODEL_JSON INPUTCSVPATH...
+#   be_render_shards.py plan INPUTCSVPATH NUM_NODES OUTPUT_DIR [RENDER_PRESET] [MODEL_JSON]
+#
+# Dependencies:
+# + pip install numpy (fit only)
+#
+
+import csv
+import heapq
+import json
+import math
+from pathlib import Path
+import sys
+from typing import NamedTuple
+
+# Globals
+FEATURE_NAMES = ["job", "frame", "body", "clothing_body", "overlay_body", "hair_body"]
+
+# Default coefficients [s], 1280x720 with 7 temporal samples (PNG) and 1 sample (EXR)
+DEFAULT_MODEL = {
+    "png": { "job": 60.0, "frame": 1.0, "body": 0.2, "clothing_body": 0.3, "overlay_body": 0.05, "hair_body": 1.5 },
+    "exr": { "job": 40.0, "frame": 0.4, "body": 0.05, "clothing_body": 0.1, "overlay_body": 0.0, "hair_body": 0.5 },
+}
+MIN_DEFAULT_COEFFICIENT = 0.001 # [s], regularization weight of features with zero default coefficient
+
+class SequenceFeatures(NamedTuple):
+    name: str
+    frames: int
+    views: int = 1
+    bodies: int = 0
+    clothing: int = 0 # Bodies with simulated clothing
+    overlay: int = 0  # Bodies with clothing overlay texture
+    hair: int = 0
+
+################################################################################
+
+def load_sequence_features(csv_path):
+    """
+    Features of all sequences in be_seq.csv, sequence name -> SequenceFeatures
+    """
+    sequences = {}
+    current = None
+    with open(csv_path, mode="r") as csv_file:
+        for row in csv.DictReader(csv_file):
+            if row["Type"] == "Group":
+                config = dict(value.split("=") for value in row["Comment"].split(";"))
+                current = { "name": config["sequence_name"], "frames": int(config["frames"]), "views": 1, "bodies": 0, "clothing": 0, "overlay": 0, "hair": 0 }
+                sequences[current["name"]] = current
+            elif current is None:
+                continue
+            elif row["Type"] == "View":
+                current["views"] += 1 # Main camera of Group row is first view
+            elif row["Type"] == "Body":
+                config = dict(value.split("=") for value in row["Comment"].split(";")) if row["Comment"] != "" else {}
+                current["bodies"] += 1
+                if "texture_clothing" in config:
+                    current["clothing"] += 1
+                if "texture_clothing_overlay" in config:
+                    current["overlay"] += 1
+                if "hair" in config:
+                    current["hair"] += 1
+
+    return { name: SequenceFeatures(**values) for (name, values) in sequences.items() }
+
+def get_output_frames(frames, output_frame_step):
+    return math.ceil(frames / output_frame_step)
+
+def get_feature_vector(sequence, output_frames):
+    frames = output_frames * sequence.views
+    return [1.0, frames, frames * sequence.bodies, frames * sequence.clothing, frames * sequence.overlay, frames * sequence.hair]
+
+def predict(model, output_type, sequence, output_frames):
+    coefficients = model[output_type]
+    return sum(coefficients[name] * value for (name, value) in zip(FEATURE_NAMES, get_feature_vector(sequence, output_frames)))
+
+def get_sequence_cost(model, sequence, output_frame_step, generate_exr):
+    """
+    Predicted render time [s] of all render jobs of the sequence
+    """
+    output_frames = get_output_frames(sequence.frames, output_frame_step)
+    cost = predict(model, "png", sequence, output_frames)
+    if generate_exr:
+        cost += predict(model, "exr", sequence, output_frames)
+    return cost
+
+def parse_render_preset(render_preset):
+    """
+    Output frame step and EXR pass of create_movie_render_queue.py render preset (5_DepthMask)
+    """
+    values = render_preset.split("_")
+    return (int(values[0]), "DepthMask" in values)
+
+################################################################################
+
+def get_identifiable_features(features):
+    """
+    Indices of features which are linearly independent of the preceding features (FEATURE_NAMES order). The fit cannot
+    separate the other features, for example frame, body and clothing_body if all samples have the same number of clothed bodies.
+    """
+    import numpy as np
+
+    norms = np.linalg.norm(features, axis=0)
+    features = features / np.where(norms > 0.0, norms, 1.0)
+    identifiable = []
+    for index in range(features.shape[1]):
+        if np.linalg.matrix_rank(features[:, identifiable + [index]]) > len(identifiable):
+            identifiable.append(index)
+    return identifiable
+
+def fit_active_coefficients(features, times, defaults, active):
+    """
+    Least squares coefficients of active features, regularized towards the default coefficients for features which the
+    samples cannot identify. These features are linear combinations of the identifiable features (features @ A), the samples
+    only determine the combined coefficients M @ c = c_identifiable + A @ c_other. Of all coefficients with the fitted combined
+    coefficients the ones with the smallest relative deviation from the defaults are used.
+    Returns coefficients and indices of features which are not identifiable.
+    """
+    import numpy as np
+
+    coefficients = np.zeros(features.shape[1])
+    identifiable = [active[index] for index in get_identifiable_features(features[:, active])]
+    other = [index for index in active if index not in identifiable]
+    if len(identifiable) == 0:
+        coefficients[other] = defaults[other]
+        return (coefficients, other)
+
+    (solution, _, _, _) = np.linalg.lstsq(features[:, identifiable], times, rcond=None)
+    (combination, _, _, _) = np.linalg.lstsq(features[:, identifiable], features[:, other], rcond=None)
+    combined = np.hstack([np.eye(len(identifiable)), combination.reshape(len(identifiable), len(other))])
+    default = defaults[identifiable + other]
+    weights = np.maximum(default, MIN_DEFAULT_COEFFICIENT) ** 2
+    correction = np.linalg.solve((combined * weights) @ combined.T, solution - combined @ default)
+    coefficients[identifiable + other] = default + weights * (combined.T @ correction)
+    return (coefficients, other)
+
+def fit_coefficients(rows, times, default_coefficients):
+    """
+    Non-negative least squares by repeatedly dropping features with negative coefficients.
+    Returns coefficients and indices of features which the samples cannot identify (see fit_active_coefficients()).
+    """
+    import numpy as np
+
+    features = np.array(rows, dtype=np.float64)
+    times = np.array(times, dtype=np.float64)
+    defaults = np.array(default_coefficients, dtype=np.float64)
+    active = list(range(features.shape[1]))
+    while True:
+        (coefficients, other) = fit_active_coefficients(features, times, defaults, active)
+        if np.all(coefficients[active] >= 0.0):
+            return (coefficients, other)
+
+        active = [index for index in active if coefficients[index] >= 0.0]
+
+def fit_model(records, sequences):
+    """
+    Fit coefficients per output type from telemetry records of unpacked render jobs, default coefficients if not enough samples
+    """
+    model = json.loads(json.dumps(DEFAULT_MODEL))
+    model["samples"] = {}
+    for output_type in ["png", "exr"]:
+        samples = list(get_fit_samples(records, sequences, output_type))
+        rows = [get_feature_vector(sequences[sequence_name], frames) for (sequence_name, frames, _) in samples]
+        times = [time for (_, _, time) in samples]
+
+        model["samples"][output_type] = len(times)
+        if len(times) == 0:
+            print(f"WARNING: No {output_type} render timings, using default coefficients", file=sys.stderr)
+            continue
+
+        (coefficients, fixed) = fit_coefficients(rows, times, [DEFAULT_MODEL[output_type][name] for name in FEATURE_NAMES])
+        if len(fixed) > 0:
+            print(f"WARNING: {output_type} render timings do not identify {', '.join(FEATURE_NAMES[index] for index in fixed)} (rank deficient), fitted close to default coefficients", file=sys.stderr)
+
+        model[output_type] = { name: float(value) for (name, value) in zip(FEATURE_NAMES, coefficients) }
+
+        errors = [abs(predict(model, output_type, sequences[sequence_name], frames) - time) / time for (sequence_name, frames, time) in samples if time > 0.0]
+        if len(errors) > 0:
+            print(f"{output_type}: samples: {len(times)}, mean relative error: {100.0 * sum(errors) / len(errors):.1f}%")
+
+    return model
+
+def get_fit_samples(records, sequences, output_type):
+    """
+    Successful unpacked render jobs with camera data of output type: (sequence name, rendered frames per camera view, time)
+    """
+    for record in records:
+        job_name = record["job_name"]
+        is_exr = job_name.endswith("_exr")
+        sequence_name = job_name[:-len("_exr")] if is_exr else job_name
+        if (is_exr == (output_type == "exr")) and (sequence_name in sequences) and record.get("success", True) and record.get("camera_data", True):
+            yield (sequence_name, record["frames"] / sequences[sequence_name].views, record["time"])
+
+def load_jsonl(path):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip() != ""]
+
+################################################################################
+
+def plan_shards(costs, num_nodes):
+    """
+    Longest processing time first assignment, costs: sequence name -> predicted time.
+    Returns list of (predicted time, sequence names) per node.
+    """
+    nodes = [(0.0, node_index) for node_index in range(num_nodes)]
+    shards = [[] for _ in range(num_nodes)]
+    loads = [0.0] * num_nodes
+    for (name, cost) in sorted(costs.items(), key=lambda item: (-item[1], item[0])):
+        (load, node_index) = heapq.heappop(nodes)
+        shards[node_index].append(name)
+        loads[node_index] = load + cost
+        heapq.heappush(nodes, (loads[node_index], node_index))
+
+    return [(loads[node_index], sorted(shards[node_index])) for node_index in range(num_nodes)]
+
+def get_shard_name(shard_index, num_shards):
+    return f"shard{shard_index:03}of{num_shards:03}"
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) >= 5) and (sys.argv[1] == "fit"):
+        telemetry_path = Path(sys.argv[2])
+        model_path = Path(sys.argv[3])
+        sequences = {}
+        for csv_path in sys.argv[4:]:
+            sequences.update(load_sequence_features(csv_path))
+
+        model = fit_model(load_jsonl(telemetry_path), sequences)
+        print(f"Saving render cost model: {model_path}")
+        with open(model_path, "w") as f:
+            json.dump(model, f, indent=1)
+        sys.exit(0)
+
+    if (len(sys.argv) < 5) or (len(sys.argv) > 7) or (sys.argv[1] != "plan"):
+        print(f"Usage: {sys.argv[0]} fit TELEMETRY_JSONL MODEL_JSON INPUTCSVPATH...", file=sys.stderr)
+        print(f"       {sys.argv[0]} plan INPUTCSVPATH NUM_NODES OUTPUT_DIR [RENDER_PRESET] [MODEL_JSON]", file=sys.stderr)
+        sys.exit(1)
+
+    csv_path = Path(sys.argv[2])
+    num_nodes = int(sys.argv[3])
+    output_dir = Path(sys.argv[4])
+    (output_frame_step, generate_exr) = parse_render_preset(sys.argv[5] if len(sys.argv) >= 6 else "1")
+    model = DEFAULT_MODEL
+    if len(sys.argv) == 7:
+        with open(sys.argv[6], "r") as f:
+            model = json.load(f)
+
+    sequences = load_sequence_features(csv_path)
+    costs = { name: get_sequence_cost(model, sequence, output_frame_step, generate_exr) for (name, sequence) in sequences.items() }
+    shards = plan_shards(costs, num_nodes)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    plan = { "csv": str(csv_path), "nodes": num_nodes, "output_frame_step": output_frame_step, "exr": generate_exr, "shards": [] }
+    for (shard_index, (predicted_time, names)) in enumerate(shards):
+        shard_path = output_dir / f"{csv_path.stem}_{get_shard_name(shard_index, num_nodes)}.txt"
+        with open(shard_path, "w") as f:
+            for name in names:
+                f.write(name + "\n")
+        plan["shards"].append({ "path": str(shard_path), "sequences": len(names), "predicted_time": predicted_time })
+        print(f"  {shard_path.name}: sequences: {len(names)}, predicted time: {predicted_time / 3600.0:.2f}h")
+
+    # Makespan cannot be lower than the average node time or the most expensive sequence
+    total_time = sum(costs.values())
+    plan["makespan"] = max(predicted_time for (predicted_time, _) in shards)
+    plan["lower_bound"] = max(total_time / num_nodes, max(costs.values(), default=0.0))
+    plan_path = output_dir / f"{csv_path.stem}_shards.json"
+    with open(plan_path, "w") as f:
+        json.dump(plan, f, indent=1)
+
+    print(f"Sequences: {len(sequences)}, nodes: {num_nodes}, total: {total_time / 3600.0:.2f}h, predicted makespan: {plan['makespan'] / 3600.0:.2f}h (lower bound: {plan['lower_bound'] / 3600.0:.2f}h)")
+    print(f"Saved render plan: {plan_path}")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Summarize render throughput telemetry (be_render_telemetry.jsonl, written by render_movie_render_queue.py)
+#
+# summary: render throughput per output type (PNG, EXR depth/mask pass) aggregated by sequence features of the body scene
+#   definition files (be_seq.csv): group type, number of bodies, hair, simulated clothing and camera movement.
+#   Group type is the name of the folder which contains be_seq.csv (images/GROUPTYPE/be_seq.csv), use GROUPTYPE=INPUTCSVPATH
+#   to specify it. Camera movement is the camera_movement of be_camera_trajectories.py, LevelSequences which were generated with
+#   a camera movement template (create_level_sequences_csv.py CAMERA_MOVEMENT) are reported as Static.
+#   Packed render jobs are reported as "mixed" for features which differ between their sequences.
+#
+# compare: frames per second of jobs which were rendered in both telemetry files (same job name), for example before and after
+#   an Unreal Editor or project update. Exit code 2 if the throughput of an output type dropped by more than the threshold.
+#
+# Usage:
+#   be_render_telemetry.py summary TELEMETRY_JSONL [GROUPTYPE=]INPUTCSVPATH...
+#   be_render_telemetry.py compare BASELINE_TELEMETRY_JSONL TELEMETRY_JSONL [THRESHOLD_PERCENT]
+#
+
+import csv
+from pathlib import Path
+import sys
+
+from be_render_shards import load_jsonl, load_sequence_features
+
+# Globals
+DIMENSIONS = ["grouptype", "bodies", "hair", "clothing", "camera", "engine_version"]
+OUTPUT_TYPES = ["png", "exr"]
+REGRESSION_THRESHOLD = 10.0 # [%]
+
+################################################################################
+
+def load_camera_movements(csv_path):
+    """
+    Camera movement of all sequences in be_seq.csv, sequence name -> movement
+    """
+    camera_movements = {}
+    with open(csv_path, mode="r") as csv_file:
+        for row in csv.DictReader(csv_file):
+            if row["Type"] == "Group":
+                config = dict(value.split("=") for value in row["Comment"].split(";"))
+                camera_movements[config["sequence_name"]] = config.get("camera_movement", "Static")
+    return camera_movements
+
+def load_sequence_groups(csv_arg):
+    """
+    Aggregation keys of all sequences in be_seq.csv, sequence name -> dimension -> value
+    """
+    if ("=" in csv_arg) and not Path(csv_arg).exists():
+        (grouptype, csv_path) = csv_arg.split("=", 1)
+    else:
+        csv_path = csv_arg
+        grouptype = Path(csv_path).resolve().parent.name
+
+    camera_movements = load_camera_movements(csv_path)
+    groups = {}
+    for (name, sequence) in load_sequence_features(csv_path).items():
+        camera = camera_movements[name]
+        if sequence.views > 1:
+            camera += f" ({sequence.views} views)"
+        groups[name] = {
+            "grouptype": grouptype,
+            "bodies": str(sequence.bodies),
+            "hair": "hair" if sequence.hair > 0 else "no hair",
+            "clothing": "clothing" if sequence.clothing > 0 else "no clothing",
+            "camera": camera,
+        }
+    return groups
+
+def get_output_type(record):
+    return "exr" if record["job_name"].endswith("_exr") else "png"
+
+def get_job_sequences(record, groups):
+    """
+    Sequences rendered by job: sequence of unpacked and camera view jobs, shots of packed jobs
+    """
+    job_name = record["job_name"]
+    sequence_name = job_name[:-len("_exr")] if job_name.endswith("_exr") else job_name
+    if sequence_name in groups:
+        return [sequence_name]
+    return [shot_name for shot_name in record.get("shots", []) if shot_name in groups]
+
+def get_job_keys(record, groups):
+    """
+    Aggregation keys of job, None if its sequences are unknown
+    """
+    sequence_names = get_job_sequences(record, groups)
+    if len(sequence_names) == 0:
+        return None
+
+    keys = { "engine_version": record.get("engine_version", "unknown") }
+    for dimension in DIMENSIONS:
+        if dimension == "engine_version":
+            continue
+        values = set(groups[sequence_name][dimension] for sequence_name in sequence_names)
+        keys[dimension] = values.pop() if len(values) == 1 else "mixed"
+    return keys
+
+class Throughput:
+    def __init__(self):
+        self.jobs = 0
+        self.failed = 0
+        self.frames = 0
+        self.time = 0.0
+        self.render_time = 0.0 # Time after warm up
+        self.warmup = 0.0
+        self.warmup_jobs = 0
+        self.output_bytes = 0
+        self.no_camera_data = 0 # Successful jobs without frame count
+
+    def add(self, record):
+        self.jobs += 1
+        if not record.get("success", True):
+            self.failed += 1
+            return
+        if not record.get("camera_data", True):
+            self.no_camera_data += 1
+            return
+
+        warmup = record.get("warmup")
+        self.frames += record["frames"]
+        self.time += record["time"]
+        self.render_time += record["time"] - (warmup if warmup is not None else 0.0)
+        if warmup is not None:
+            self.warmup += warmup
+            self.warmup_jobs += 1
+        self.output_bytes += record.get("output_bytes", 0)
+
+    def get_frames_per_second(self):
+        return self.frames / self.render_time if self.render_time > 0.0 else 0.0
+
+    def format(self):
+        frames_per_second = self.get_frames_per_second()
+        seconds_per_frame = 1.0 / frames_per_second if frames_per_second > 0.0 else 0.0
+        warmup = f"{self.warmup / self.warmup_jobs:8.1f}" if self.warmup_jobs > 0 else f"{'n/a':>8}"
+        bytes_per_frame = self.output_bytes / self.frames / 1e6 if self.frames > 0 else 0.0
+        return f"{self.jobs:6} {self.failed:6} {self.frames:8} {self.time / 3600.0:8.2f} {frames_per_second:8.3f} {seconds_per_frame:8.2f} {warmup} {bytes_per_frame:8.2f}"
+
+THROUGHPUT_HEADER = f"{'jobs':>6} {'failed':>6} {'frames':>8} {'time[h]':>8} {'frames/s':>8} {'s/frame':>8} {'warmup':>8} {'MB/frame':>8}"
+
+################################################################################
+
+def summarize(records, groups):
+    unknown = 0
+    for output_type in OUTPUT_TYPES:
+        totals = Throughput()
+        tables = { dimension: {} for dimension in DIMENSIONS }
+        for record in records:
+            if get_output_type(record) != output_type:
+                continue
+            keys = get_job_keys(record, groups)
+            if keys is None:
+                unknown += 1
+                continue
+
+            totals.add(record)
+            for dimension in DIMENSIONS:
+                tables[dimension].setdefault(keys[dimension], Throughput()).add(record)
+
+        if totals.jobs == 0:
+            continue
+
+        print(f"{output_type.upper()} render jobs")
+        print(f"  {'':24} {THROUGHPUT_HEADER}")
+        print(f"  {'all':24} {totals.format()}")
+        if totals.no_camera_data > 0:
+            print(f"WARNING: Ignored frames and time of {totals.no_camera_data} {output_type} jobs without camera data", file=sys.stderr)
+        for dimension in DIMENSIONS:
+            print(f"  {dimension}")
+            for value in sorted(tables[dimension], key=lambda value: (len(value), value)):
+                print(f"    {value:22} {tables[dimension][value].format()}")
+        print("")
+
+    if unknown > 0:
+        print(f"WARNING: Ignored {unknown} jobs of sequences which are not in the specified be_seq.csv files", file=sys.stderr)
+
+def compare(baseline_records, records, threshold):
+    """
+    Frames per second of job names in both telemetry files, returns True if no output type regressed
+    """
+    baseline_jobs = { record["job_name"]: record for record in baseline_records if record.get("success", True) and record.get("camera_data", True) }
+    jobs = { record["job_name"]: record for record in records if record.get("success", True) and record.get("camera_data", True) }
+    job_names = sorted(set(baseline_jobs) & set(jobs))
+    if len(job_names) == 0:
+        print("No successful jobs in both telemetry files", file=sys.stderr)
+        return True
+
+    passed = True
+    print(f"{'':6} {'jobs':>6} {'baseline':>10} {'current':>10} {'change':>8}  (frames/s after warm up, warm up [s])")
+    for output_type in OUTPUT_TYPES:
+        baseline = Throughput()
+        current = Throughput()
+        for job_name in job_names:
+            if get_output_type(jobs[job_name]) == output_type:
+                baseline.add(baseline_jobs[job_name])
+                current.add(jobs[job_name])
+        if baseline.jobs == 0:
+            continue
+
+        change = 100.0 * (current.get_frames_per_second() / baseline.get_frames_per_second() - 1.0) if baseline.get_frames_per_second() > 0.0 else 0.0
+        status = ""
+        if change < -threshold:
+            status = "  REGRESSION"
+            passed = False
+        print(f"{output_type:6} {baseline.jobs:6} {baseline.get_frames_per_second():10.3f} {current.get_frames_per_second():10.3f} {change:7.1f}%{status}")
+        if (baseline.warmup_jobs > 0) and (current.warmup_jobs > 0):
+            print(f"{'warmup':6} {'':6} {baseline.warmup / baseline.warmup_jobs:10.1f} {current.warmup / current.warmup_jobs:10.1f}")
+
+    return passed
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) >= 4) and (sys.argv[1] == "summary"):
+        groups = {}
+        for csv_arg in sys.argv[3:]:
+            groups.update(load_sequence_groups(csv_arg))
+        summarize(load_jsonl(sys.argv[2]), groups)
+        sys.exit(0)
+
+    if (len(sys.argv) in [4, 5]) and (sys.argv[1] == "compare"):
+        threshold = float(sys.argv[4]) if len(sys.argv) == 5 else REGRESSION_THRESHOLD
+        if not compare(load_jsonl(sys.argv[2]), load_jsonl(sys.argv[3]), threshold):
+            sys.exit(2)
+        sys.exit(0)
+
+    print(f"Usage: {sys.argv[0]} summary TELEMETRY_JSONL [GROUPTYPE=]INPUTCSVPATH...", file=sys.stderr)
+    print(f"       {sys.argv[0]} compare BASELINE_TELEMETRY_JSONL TELEMETRY_JSONL [THRESHOLD_PERCENT]", file=sys.stderr)
+    sys.exit(1)
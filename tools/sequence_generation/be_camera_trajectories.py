@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Generate per-frame camera trajectories (orbit, dolly, zoom) for all sequences of a be_seq.csv file
+#
+# Trajectories are written as "Camera" rows after each "Group" row, one row per sequence frame:
+#   Index,Camera,None,X,Y,Z,Yaw,Pitch,Roll,frame=N;camera_hfov=HFOV
+# Camera poses are relative to camera root like the static camera pose of the Group row.
+# create_level_sequences_csv.py keys these values directly instead of using the LS_Camera_* template LevelSequences.
+#
+# Dependencies:
+# + pip install numpy
+#
+
+import numpy as np
+from pathlib import Path
+import sys
+from typing import NamedTuple
+
+from be_camera_visibility import SENSOR_WIDTH, SequenceTrajectories, get_comment_value, get_rotation_matrices
+from be_sequence_columns import load_table, save_table
+from be_sequence_table import POSE_COLUMNS, to_floats, to_strings
+
+# Globals
+FPS = 30
+TRAJECTORIES_PATH = None # Precomputed body trajectories for visibility check (be_camera_visibility.py), use SMPL-X animation data if None
+
+class ConfigCameraMovement(NamedTuple):
+    orbit_speed: float = 0.0   # [deg/s], rotation of camera around camera root Z axis, positive: counterclockwise when seen from above
+    orbit_radius: float = -1.0 # [cm], horizontal distance of camera from camera root, default: keep existing distance
+    dolly_speed: float = 0.0   # [cm/s], movement along initial camera view direction
+    zoom_factor: float = 1.0   # Focal length at last sequence frame relative to first frame
+
+configs_movement = {}
+configs_movement["orbit_a"] = ConfigCameraMovement(orbit_speed=10.0)
+configs_movement["orbit_b"] = ConfigCameraMovement(orbit_speed=-10.0)
+configs_movement["orbit_fast"] = ConfigCameraMovement(orbit_speed=30.0)
+configs_movement["dolly_in"] = ConfigCameraMovement(dolly_speed=50.0)
+configs_movement["dolly_out"] = ConfigCameraMovement(dolly_speed=-50.0)
+configs_movement["zoom_in"] = ConfigCameraMovement(zoom_factor=2.0)
+configs_movement["zoom_out"] = ConfigCameraMovement(zoom_factor=0.5)
+
+################################################################################
+
+def get_focal_lengths(hfov):
+    return SENSOR_WIDTH / (2.0 * np.tan(np.radians(hfov) / 2))
+
+def get_hfovs(focal_lengths):
+    return np.degrees(2.0 * np.arctan(SENSOR_WIDTH / (2.0 * focal_lengths)))
+
+def get_camera_trajectories(poses, hfov, frames, c):
+    """
+    Per-frame camera poses for all sequences
+      poses: (6, sequences), static camera pose X, Y, Z, Yaw, Pitch, Roll relative to camera root
+      hfov, frames: (sequences)
+    Returns poses (6, sequences, max(frames)) and hfov (sequences, max(frames)), values after sequence end are undefined
+    """
+    (x, y, z, yaw, pitch, roll) = [values[:, np.newaxis] for values in poses]
+    frame = np.arange(np.max(frames, initial=1))[np.newaxis, :]
+    t = frame / FPS
+
+    if c.orbit_radius > 0:
+        distance = np.hypot(x, y)
+        scale = np.divide(c.orbit_radius, distance, out=np.ones_like(distance), where=(distance > 0))
+        (x, y) = (x * scale, y * scale)
+
+    # Dolly along initial view direction
+    forward = get_rotation_matrices(yaw, pitch, roll)[..., 0, :]
+    x = x + forward[..., 0] * c.dolly_speed * t
+    y = y + forward[..., 1] * c.dolly_speed * t
+    z = z + forward[..., 2] * c.dolly_speed * t
+
+    # Orbit around camera root
+    angle = c.orbit_speed * t
+    sin_a = np.sin(np.radians(angle))
+    cos_a = np.cos(np.radians(angle))
+    (x, y) = (cos_a * x - sin_a * y, sin_a * x + cos_a * y)
+    yaw = yaw + angle
+
+    # Zoom with linear focal length change over sequence duration
+    u = frame / np.maximum(np.asarray(frames)[:, np.newaxis] - 1, 1)
+    focal_lengths = get_focal_lengths(hfov)[:, np.newaxis] * (1.0 + (c.zoom_factor - 1.0) * np.minimum(u, 1.0))
+
+    shape = (len(hfov), frame.shape[1])
+    trajectory_poses = np.stack([np.broadcast_to(values, shape) for values in (x, y, z, yaw, pitch, roll)])
+    return (trajectory_poses, get_hfovs(focal_lengths))
+
+def add_camera_trajectories(csv_path, movement_type, check_visibility=False):
+    c = configs_movement[movement_type]
+
+    table = load_table(csv_path, columnar=False)
+    if np.any(table.rowtype_mask("Camera")):
+        print(f"ERROR: Input already contains camera trajectories: {csv_path}", file=sys.stderr)
+        sys.exit(1)
+
+    is_group = table.rowtype_mask("Group")
+    group = table.get_columns(is_group)
+    poses = np.stack([to_floats(group[name]) for name in POSE_COLUMNS])
+    frames = np.array([int(get_comment_value(comment, "frames")) for comment in group["Comment"]], dtype=np.int64)
+
+    hfov = []
+    for comment in group["Comment"]:
+        camera_hfov = get_comment_value(comment, "camera_hfov")
+        if camera_hfov is None:
+            print("ERROR: Cannot find camera_hfov entry in source data", file=sys.stderr)
+            sys.exit(1)
+        hfov.append(float(camera_hfov))
+    hfov = np.array(hfov)
+
+    (trajectory_poses, trajectory_hfovs) = get_camera_trajectories(poses, hfov, frames, c)
+
+    if check_visibility:
+        trajectories = SequenceTrajectories(table, TRAJECTORIES_PATH)
+        visibility = trajectories.get_visibility(np.full(len(hfov), True), *trajectory_poses, trajectory_hfovs)
+        print(f"Camera trajectory visibility: min={visibility.min(initial=1.0):.3f}, mean={visibility.mean() if len(visibility) > 0 else 1.0:.3f}")
+        for group_id in np.flatnonzero(visibility < 1.0):
+            print(f"  {get_comment_value(group['Comment'][group_id], 'sequence_name')}: visibility={visibility[group_id]:.3f}")
+
+    table.append_comments(is_group, [f";camera_movement={movement_type}"] * len(hfov))
+
+    # Camera rows for all sequence frames
+    pose_strings = [to_strings(values.ravel()).reshape(values.shape) for values in trajectory_poses]
+    hfov_strings = to_strings(trajectory_hfovs.ravel()).reshape(trajectory_hfovs.shape)
+    camera_lines = []
+    for group_id in range(len(hfov)):
+        camera_lines.append([f"0,Camera,None,{','.join(values[group_id, frame] for values in pose_strings)},frame={frame};camera_hfov={hfov_strings[group_id, frame]}" for frame in range(frames[group_id])])
+
+    # Insert after Group rows and renumber rows
+    lines = []
+    group_id = 0
+    for (line, group_row) in zip(table.lines, is_group):
+        lines.append(line)
+        if group_row:
+            lines.extend(camera_lines[group_id])
+            group_id += 1
+
+    table.lines = np.array([f"{index},{line.split(',', 1)[1]}" for (index, line) in enumerate(lines)], dtype=object)
+    table.rowtypes = np.array([line.split(",", 2)[1] for line in table.lines], dtype=object)
+
+    output_path = csv_path.parent / (csv_path.stem + "_camtrajectory" + csv_path.suffix)
+    print(f"Saving camera trajectories ({np.sum(frames)} frames): {output_path}")
+    save_table(table, output_path)
+    return
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) < 3) or (len(sys.argv) > 4) or ((len(sys.argv) == 4) and (sys.argv[3] != "visibility")):
+        print(f"Usage: {sys.argv[0]} INPUTCSVPATH MOVEMENTTYPE [visibility]", file=sys.stderr)
+        print("       %s be_seq.csv orbit_a" % (sys.argv[0]), file=sys.stderr)
+        print("       %s be_seq.csv zoom_in visibility" % (sys.argv[0]), file=sys.stderr)
+        print(configs_movement.keys())
+        sys.exit(1)
+
+    movement_type = sys.argv[2]
+    if not movement_type in configs_movement:
+        print(f"ERROR: Undefined camera movement type: {movement_type}", file=sys.stderr)
+        print(configs_movement.keys())
+        sys.exit(1)
+
+    add_camera_trajectories(Path(sys.argv[1]), movement_type, check_visibility=(len(sys.argv) == 4))
+    sys.exit(0)
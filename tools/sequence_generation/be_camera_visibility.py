@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Camera frustum checks for placed body trajectories
+#
+# Coordinate systems:
+# + Unreal: [cm], X: forward, Y: right, Z: up
+#   + Rotations: Yaw (world Z, left-handed) -> Pitch (local Y, right-handed) -> Roll (local X, right-handed)
+# + SMPL-X animation data (motion_seq.npz, "trans"): [m], X: right of body, Y: up, Z: towards camera
+#
+# Precomputed trajectory file (.npz): one SMPL-X "trans" array (frames x 3) per body name (subject_animation) used in a be_seq.csv.
+# This allows visibility checks on machines without the SMPL-X animation data.
+#
+# Dependencies:
+# + pip install numpy
+#
+
+import numpy as np
+from pathlib import Path
+import sys
+
+from be_sequence_columns import load_table
+from be_sequence_table import to_floats
+
+# Globals
+SMPLX_NPZ_ANIMATION_FOLDER = Path("/mnt/c/bedlam/animations/gendered_ground_truth")
+
+SENSOR_WIDTH = 36.0   # [mm], all BEDLAM sequences use same camera filmback
+SENSOR_HEIGHT = 20.25 # [mm]
+
+VISIBILITY_FRAME_STEP = 5 # Only check every n-th frame of the body trajectories
+
+################################################################################
+
+def get_rotation_matrices(yaw, pitch, roll):
+    """
+    Unreal rotation matrices for arrays of yaw/pitch/roll angles [deg], shape (..., 3, 3).
+    Rows are the world space directions of the local forward (X), right (Y) and up (Z) axes (FRotationMatrix).
+    """
+    (sy, cy) = (np.sin(np.radians(yaw)), np.cos(np.radians(yaw)))
+    (sp, cp) = (np.sin(np.radians(pitch)), np.cos(np.radians(pitch)))
+    (sr, cr) = (np.sin(np.radians(roll)), np.cos(np.radians(roll)))
+
+    forward = np.stack([cp * cy, cp * sy, sp], axis=-1)
+    right = np.stack([sr * sp * cy - cr * sy, sr * sp * sy + cr * cy, -sr * cp], axis=-1)
+    up = np.stack([-(cr * sp * cy + sr * sy), cy * sr - cr * sp * sy, cr * cp], axis=-1)
+
+    return np.stack([forward, right, up], axis=-2)
+
+def get_trajectory_points(trans, start_frame, frames, x, y, z, yaw, frame_step=VISIBILITY_FRAME_STEP):
+    """
+    Unreal world locations [cm] of placed body root for every frame_step-th sequence frame
+    """
+    trans = trans[start_frame : start_frame + frames : frame_step]
+
+    # SMPL-X [m] to Unreal local body coordinates [cm], see get_image_coordinates_from_smplx() in be_generate_sequences_crowd.py
+    local_x = trans[:, 0] * 100.0
+    local_y = trans[:, 2] * 100.0
+    local_z = trans[:, 1] * 100.0
+
+    sin_a = np.sin(np.radians(yaw))
+    cos_a = np.cos(np.radians(yaw))
+
+    return np.stack([x + cos_a * local_x - sin_a * local_y, y + sin_a * local_x + cos_a * local_y, z + local_z], axis=-1)
+
+def get_in_frustum(points, camera_locations, camera_rotations, hfovs):
+    """
+    Test points against camera frustums, all arguments are arrays with one entry per point
+      points, camera_locations: (n, 3)
+      camera_rotations: (n, 3, 3), see get_rotation_matrices()
+      hfovs: (n), horizontal field-of-view [deg]
+    """
+    local = np.einsum("nij,nj->ni", camera_rotations, points - camera_locations)
+    depth = local[:, 0]
+
+    tan_h = np.tan(np.radians(hfovs) / 2)
+    tan_v = tan_h * (SENSOR_HEIGHT / SENSOR_WIDTH)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        in_frustum = (depth > 0) & (np.abs(local[:, 1]) <= depth * tan_h) & (np.abs(local[:, 2]) <= depth * tan_v)
+
+    return in_frustum
+
+################################################################################
+
+def load_trajectories(body_names, trajectories_path=None, animation_folder=SMPLX_NPZ_ANIMATION_FOLDER):
+    """
+    Get SMPL-X trans arrays for given body names, either from precomputed trajectory file or from SMPL-X animation data
+    """
+    trajectories = {}
+
+    if trajectories_path is not None:
+        with np.load(trajectories_path) as data:
+            for body_name in body_names:
+                if body_name not in data:
+                    print(f"ERROR: No trajectory for body in {trajectories_path}: {body_name}", file=sys.stderr)
+                    sys.exit(1)
+                trajectories[body_name] = data[body_name]
+        return trajectories
+
+    for body_name in body_names:
+        with np.load(get_animation_path(body_name, animation_folder)) as data:
+            trajectories[body_name] = data["trans"]
+
+    return trajectories
+
+def get_animation_path(body_name, animation_folder=SMPLX_NPZ_ANIMATION_FOLDER):
+    """
+    SMPL-X animation data of body name (subject_animation)
+    """
+    (subject, animation_name) = body_name.rsplit("_", maxsplit=1)
+    return animation_folder / subject / "moving_body_para" / animation_name / "motion_seq.npz"
+
+def get_comment_value(comment, key):
+    for item in comment.split(";"):
+        if item.startswith(key + "="):
+            return item.split("=", maxsplit=1)[1]
+    return None
+
+class SequenceTrajectories:
+    """
+    Placed body root trajectories of all sequences in a be_seq.csv file, flattened into one point array for vectorized visibility tests
+    """
+    def __init__(self, table, trajectories_path=None, animation_folder=SMPLX_NPZ_ANIMATION_FOLDER, frame_step=VISIBILITY_FRAME_STEP):
+        group_ids = table.group_ids()
+        is_body = table.rowtype_mask("Body")
+
+        group = table.get_columns(table.rowtype_mask("Group"))
+        self.num_groups = len(group["Comment"])
+        self.group_comments = group["Comment"]
+        frames = [int(get_comment_value(comment, "frames")) for comment in group["Comment"]]
+
+        body = table.get_columns(is_body)
+        body_group_ids = group_ids[is_body]
+        x = to_floats(body["X"])
+        y = to_floats(body["Y"])
+        z = to_floats(body["Z"])
+        yaw = to_floats(body["Yaw"])
+
+        trajectories = load_trajectories(sorted(set(body["Body"])), trajectories_path, animation_folder)
+
+        points = []
+        point_group_ids = []
+        point_frames = []
+        for (index, body_name) in enumerate(body["Body"]):
+            start_frame = int(get_comment_value(body["Comment"][index], "start_frame") or 0)
+            group_id = body_group_ids[index]
+            body_points = get_trajectory_points(trajectories[body_name], start_frame, frames[group_id], x[index], y[index], z[index], yaw[index], frame_step)
+            points.append(body_points)
+            point_group_ids.append(np.full(len(body_points), group_id))
+            point_frames.append(np.arange(len(body_points)) * frame_step)
+
+        self.points = np.concatenate(points) if len(points) > 0 else np.zeros((0, 3))
+        self.point_group_ids = np.concatenate(point_group_ids) if len(point_group_ids) > 0 else np.zeros(0, dtype=np.int64)
+        self.point_frames = np.concatenate(point_frames) if len(point_frames) > 0 else np.zeros(0, dtype=np.int64) # Sequence frame of each point
+
+        # Camera root transform of each sequence, camera poses in be_seq.csv are relative to it
+        self.cameraroot_locations = np.zeros((self.num_groups, 3))
+        self.cameraroot_yaws = np.zeros(self.num_groups)
+        for (group_id, comment) in enumerate(self.group_comments):
+            cameraroot_x = get_comment_value(comment, "cameraroot_x")
+            if cameraroot_x is not None:
+                self.cameraroot_locations[group_id] = [float(cameraroot_x), float(get_comment_value(comment, "cameraroot_y")), float(get_comment_value(comment, "cameraroot_z"))]
+
+            cameraroot_yaw = get_comment_value(comment, "cameraroot_yaw")
+            if cameraroot_yaw is not None:
+                self.cameraroot_yaws[group_id] = float(cameraroot_yaw)
+
+    def get_visibility(self, group_mask, x, y, z, yaw, pitch, roll, hfov):
+        """
+        Fraction of body trajectory points inside camera frustum for selected sequences.
+        Camera pose arrays have one entry per selected sequence and are relative to camera root.
+        For moving cameras the arrays have shape (sequences, frames) and each point is tested against the camera of its frame.
+        """
+        group_ids = np.flatnonzero(group_mask)
+        selected = np.full(self.num_groups, -1)
+        selected[group_ids] = np.arange(len(group_ids))
+
+        point_mask = selected[self.point_group_ids] >= 0
+        point_selected_ids = selected[self.point_group_ids[point_mask]]
+
+        # Camera world pose, camera root only rotates around Z
+        root_yaw = self.cameraroot_yaws[group_ids]
+        root_location = self.cameraroot_locations[group_ids]
+        camera_index = point_selected_ids
+        if np.ndim(x) == 2:
+            root_yaw = root_yaw[:, np.newaxis]
+            root_location = root_location[:, np.newaxis]
+            camera_index = (point_selected_ids, np.minimum(self.point_frames[point_mask], np.shape(x)[1] - 1))
+
+        sin_a = np.sin(np.radians(root_yaw))
+        cos_a = np.cos(np.radians(root_yaw))
+        camera_locations = root_location + np.stack([cos_a * x - sin_a * y, sin_a * x + cos_a * y, np.broadcast_to(z, np.shape(x))], axis=-1)
+        camera_rotations = get_rotation_matrices(root_yaw + yaw, pitch, roll)
+
+        in_frustum = get_in_frustum(self.points[point_mask], camera_locations[camera_index], camera_rotations[camera_index], hfov[camera_index])
+
+        num_points = np.bincount(point_selected_ids, minlength=len(group_ids))
+        num_visible = np.bincount(point_selected_ids, weights=in_frustum, minlength=len(group_ids))
+
+        # Sequences without bodies are treated as fully visible
+        return np.divide(num_visible, num_points, out=np.ones(len(group_ids)), where=(num_points > 0))
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: {sys.argv[0]} INPUTCSVPATH OUTPUT_TRAJECTORIES_NPZ", file=sys.stderr)
+        print("       Precompute body trajectory file for camera visibility checks in be_modify_sequences.py", file=sys.stderr)
+        sys.exit(1)
+
+    table = load_table(Path(sys.argv[1]))
+    body_names = sorted(set(table.get_columns(table.rowtype_mask("Body"))["Body"]))
+    trajectories = load_trajectories(body_names)
+
+    output_path = Path(sys.argv[2])
+    print(f"Saving body trajectories ({len(trajectories)}): {output_path}")
+    np.savez_compressed(output_path, **trajectories)
@@ -4,20 +4,40 @@
 #
 # Modify crowd sequence
 #
+# Dependencies:
+# + pip install numpy
+#
 
 import csv
+import hashlib
 import json
-from math import sin, cos, radians
+import numpy as np
 from pathlib import Path
-import random
 import re
+import shutil
 import sys
 from typing import NamedTuple
 
+from be_camera_visibility import SequenceTrajectories, get_animation_path
+from be_sequence_columns import load_table, save_table
+from be_sequence_table import POSE_COLUMNS, to_floats, to_strings
+
 # Globals
 SUBJECT_GENDER_PATH = Path("../../config/gender.csv")                       # Gender information for each subject
 TEXTURES_OVERLAY_PATH = Path("../../config/textures_clothing_overlay.json") # List of available overlay textures per gender
 WHITELIST_HAIR_PATH = Path("../../config/whitelist_hair.json")
+TRAJECTORIES_PATH = None # Precomputed body trajectories for camera visibility checks (be_camera_visibility.py), use SMPL-X animation data if None
+
+# Output file suffix for each modification
+OUTPUT_SUFFIXES = { "camera": "_camrandom", "views": "_views", "cameraroot": "_camroot", "sequenceroot": "_sequenceroot", "clothing_overlay": "_overlay", "hair": "_hair" }
+
+# Content-addressed cache for seeded modifications, sources are part of the cache key
+CACHE_DIR = Path.home() / ".cache" / "bedlam" / "be_modify_sequences"
+CACHE_SOURCE_PATHS = [Path(__file__), Path(__file__).with_name("be_sequence_table.py"), Path(__file__).with_name("be_sequence_columns.py"), Path(__file__).with_name("be_camera_visibility.py")]
+
+CAMERA_HFOV_PATTERN = re.compile(r"(.+)camera_hfov=([^;]+)(.*)")
+TEXTURE_CLOTHING_PATTERN = re.compile(r"(.*)texture_clothing=([^;]+)(.*)")
+SUBJECT_PATTERN = re.compile(r"(.+)_\d\d\d\d")
 
 # Predefined configurations
 # Notes:
@@ -43,6 +63,8 @@ class ConfigCamera(NamedTuple):
     pitch_z_min: float = 5.0
     z_max: float = 250.0
     pitch_z_max: float = -40.0
+    visibility_min: float = 0.0 # Minimum fraction of body trajectory points in camera frustum, 0: no visibility check
+    visibility_max_trials: int = 100
 
 configs_camera = {}
 
@@ -94,276 +116,316 @@ configs_camera["cam_bigoffice_a"] = ConfigCamera(override_cam_position=True, x=-
 
 ################################################################################
 
-def change_camera(csv_path, config_camera, config_type):
-
-    c = config_camera
-
-    with open(csv_path, "r") as f:
-        bodies = f.readlines()
-
-    output = []
+def get_random_camera_poses(c, rng, x_start, y_start, z_start):
+    num_groups = len(x_start)
 
-    for line in bodies:
-        line = line.rstrip()
-        if line.startswith("Index"):
-            output.append(line + "\n")
-            continue
+    if c.override_cam_position:
+        x_start = np.full(num_groups, c.x)
+        y_start = np.full(num_groups, c.y)
+        if c.pitch_from_height:
+            z_start = rng.uniform(c.z_min, c.z_max, num_groups)
         else:
-            items = line.split(",")
-            index = int(items[0])
-            rowtype = items[1]
-            if index == 0:
-                line = f"{line};cam_x_offset={c.x_offset_max};cam_y_offset={c.y_offset_max};cam_z_offset={c.z_offset_max};cam_yaw_min={c.yaw_min};cam_yaw_max={c.yaw_max};cam_pitch_min={c.pitch_min};cam_pitch_max={c.pitch_max};cam_roll_min={c.roll_min};cam_roll_max={c.roll_max};cam_config={config_type}"
-                output.append(line + "\n")
-                continue
-
-            if rowtype == "Group":
-                name = items[2]
-                if c.override_cam_position:
-                    x_start = c.x
-                    y_start = c.y
-                    if c.pitch_from_height:
-                        z_start = random.uniform(c.z_min, c.z_max)
-                    else:
-                        z_start = c.z
-                else:
-                    x_start = float(items[3])
-                    y_start = float(items[4])
-                    z_start = float(items[5])
-
-                x = x_start + random.uniform(-c.x_offset_max, c.x_offset_max)
-                y = y_start + random.uniform(-c.y_offset_max, c.y_offset_max)
-                z = z_start + random.uniform(-c.z_offset_max, c.z_offset_max)
-                yaw = random.uniform(c.yaw_min, c.yaw_max)
-
-                pitch_start = 0.0
-                if c.pitch_from_height:
-                    t = (z - c.z_min)/(c.z_max - c.z_min) # [0,1]
-                    pitch_start = (1 - t) * c.pitch_z_min + t * c.pitch_z_max
-
-                pitch = pitch_start + random.uniform(c.pitch_min, c.pitch_max)
-                roll = random.uniform(c.roll_min, c.roll_max)
-                comment = items[9]
-                if c.hfov > 0:
-                    # Use new horizontal field-of-view from configuration
-                    match = re.search(r"(.+)camera_hfov=([^;]+)(.*)", comment)
-                    if not match:
-                        print("ERROR: Cannot find camera_hfov entry in source data")
-                        sys.exit(1)
-
-                    comment = match.group(1) + f"camera_hfov={c.hfov}" + match.group(3)
-
-                line = f"{index},{rowtype},{name},{x},{y},{z},{yaw},{pitch},{roll},{comment}"
-
-            output.append(line + "\n")
-
-    csv_output_path = csv_path.parent / csv_path.name.replace(".csv", "_camrandom.csv")
-    print(f"Saving modified sequence: {csv_output_path}")
-    with open(csv_output_path, "w") as f:
-        f.writelines(output)
+            z_start = np.full(num_groups, c.z)
 
-    return
+    x = x_start + rng.uniform(-c.x_offset_max, c.x_offset_max, num_groups)
+    y = y_start + rng.uniform(-c.y_offset_max, c.y_offset_max, num_groups)
+    z = z_start + rng.uniform(-c.z_offset_max, c.z_offset_max, num_groups)
+    yaw = rng.uniform(c.yaw_min, c.yaw_max, num_groups)
 
-def change_camera_root(csv_path):
+    pitch_start = np.zeros(num_groups)
+    if c.pitch_from_height:
+        t = (z - c.z_min)/(c.z_max - c.z_min) # [0,1]
+        pitch_start = (1 - t) * c.pitch_z_min + t * c.pitch_z_max
 
-    with open(csv_path, "r") as f:
-        bodies = f.readlines()
+    pitch = pitch_start + rng.uniform(c.pitch_min, c.pitch_max, num_groups)
+    roll = rng.uniform(c.roll_min, c.roll_max, num_groups)
 
-    output = []
+    return np.stack([x, y, z, yaw, pitch, roll])
 
-    for line in bodies:
-        line = line.rstrip()
-        if line.startswith("Index"):
-            output.append(line + "\n")
-            continue
+def change_camera(csv_path, config_camera, config_type, seed=None):
 
-        items = line.split(",")
-        index = int(items[0])
-        rowtype = items[1]
-        if index == 0:
-            line = f"{line};cameraroot_yaw_min=0;cameraroot_yaw_max=360]"
-            output.append(line + "\n")
-            continue
+    c = config_camera
 
-        if rowtype == "Group":
-            cam_root_yaw = random.uniform(0, 360)
-            line = f"{line};cameraroot_yaw={cam_root_yaw}"
+    table = load_table(csv_path)
+    if np.any(table.rowtype_mask("Camera")):
+        # Trajectories are computed from the Group camera pose, add them after changing the camera
+        print(f"ERROR: Input contains camera trajectories (Camera rows), change camera before running be_camera_trajectories.py: {csv_path}", file=sys.stderr)
+        sys.exit(1)
 
-        output.append(line + "\n")
+    rng = np.random.default_rng(seed)
 
-    csv_output_path = csv_path.parent / csv_path.name.replace(".csv", "_camroot.csv")
-    print(f"Saving modified sequence: {csv_output_path}")
-    with open(csv_output_path, "w") as f:
-        f.writelines(output)
+    # Store camera configuration in file comment
+    is_comment = table.rowtype_mask("Comment")
+    table.append_comments(is_comment, [f";cam_x_offset={c.x_offset_max};cam_y_offset={c.y_offset_max};cam_z_offset={c.z_offset_max};cam_yaw_min={c.yaw_min};cam_yaw_max={c.yaw_max};cam_pitch_min={c.pitch_min};cam_pitch_max={c.pitch_max};cam_roll_min={c.roll_min};cam_roll_max={c.roll_max};cam_config={config_type}"] * np.count_nonzero(is_comment))
 
-    return
+    # Randomize camera pose of all sequences at once
+    is_group = table.rowtype_mask("Group")
+    group = table.get_columns(is_group)
+    start = [to_floats(group["X"]), to_floats(group["Y"]), to_floats(group["Z"])]
 
-# Rotate camera and bodies in world space (HDRI background and body lighting variation)
-def change_sequence_root(csv_path):
+    poses = get_random_camera_poses(c, rng, *start)
 
-    with open(csv_path, "r") as f:
-        bodies = f.readlines()
+    if c.hfov > 0:
+        # Use new horizontal field-of-view from configuration
+        comments = []
+        for comment in group["Comment"]:
+            match = CAMERA_HFOV_PATTERN.search(comment)
+            if not match:
+                print("ERROR: Cannot find camera_hfov entry in source data")
+                sys.exit(1)
 
-    output = []
+            comments.append(match.group(1) + f"camera_hfov={c.hfov}" + match.group(3))
 
-    angle = 0.0
-    for line in bodies:
-        line = line.rstrip()
-        if line.startswith("Index"):
-            output.append(line + "\n")
-            continue
-        else:
-            items = line.split(",")
+        group["Comment"] = comments
 
-            index = int(items[0])
-            rowtype = items[1]
-            name = items[2]
-            x = float(items[3])
-            y = float(items[4])
-            z = float(items[5])
-            yaw  = float(items[6])
-            pitch = float(items[7])
-            roll = float(items[8])
-            comment = items[9]
+    if c.visibility_min > 0:
+        # Resample cameras until desired fraction of body trajectory points is in camera frustum
+        hfov = []
+        for comment in group["Comment"]:
+            match = CAMERA_HFOV_PATTERN.search(comment)
+            if not match:
+                print("ERROR: Cannot find camera_hfov entry in source data")
+                sys.exit(1)
+            hfov.append(float(match.group(2)))
+        hfov = np.array(hfov)
 
+        trajectories = SequenceTrajectories(table, TRAJECTORIES_PATH)
 
-            if rowtype == "Group":
-                angle = random.uniform(0.0, 360.0)
+        best_poses = poses
+        best_visibility = trajectories.get_visibility(np.full(len(hfov), True), *poses, hfov)
+        trial = 1
+        while trial < c.visibility_max_trials:
+            failed = best_visibility < c.visibility_min
+            if not np.any(failed):
+                break
 
-                # Note: we do not need to rotate camera location since it's at origin for HDRI scenes
+            start_failed = [values[failed] for values in start]
+            candidate_poses = get_random_camera_poses(c, rng, *start_failed)
+            candidate_visibility = trajectories.get_visibility(failed, *candidate_poses, hfov[failed])
 
-                yaw_r = yaw + angle
-                if yaw_r >= 360.0:
-                    yaw_r -= 360.0
+            improved = candidate_visibility > best_visibility[failed]
+            failed_ids = np.flatnonzero(failed)[improved]
+            best_poses[:, failed_ids] = candidate_poses[:, improved]
+            best_visibility[failed_ids] = candidate_visibility[improved]
+            trial += 1
 
-                comment += f";angle={angle}"
+        poses = best_poses
+        print(f"Camera visibility: min={best_visibility.min(initial=1.0):.3f}, trials={trial}")
+        for group_id in np.flatnonzero(best_visibility < c.visibility_min):
+            print(f"WARNING: Camera visibility below {c.visibility_min} after {trial} trials: {trajectories.group_comments[group_id].split(';')[0]}, visibility={best_visibility[group_id]:.3f}", file=sys.stderr)
 
-                line = f"{index},{rowtype},{name},{x},{y},{z},{yaw_r},{pitch},{roll},{comment}"
+    for (name, values) in zip(POSE_COLUMNS, poses):
+        group[name] = to_strings(values)
 
-            elif rowtype == "Body":
-                # Rotate body in world space
-                sin_a = sin(radians(angle))
-                cos_a = cos(radians(angle))
+    table.set_columns(is_group, group)
 
-                x_r = cos_a * x - sin_a * y
-                y_r = sin_a * x + cos_a * y
+    csv_output_path = get_output_path(csv_path, "camera")
+    print(f"Saving modified sequence: {csv_output_path}")
+    save_table(table, csv_output_path)
 
-                yaw_r = yaw + angle
-                if yaw_r >= 360.0:
-                    yaw_r -= 360.0
+    return
 
-                line = f"{index},{rowtype},{name},{x_r},{y_r},{z},{yaw_r},{pitch},{roll},{comment}"
+# Add camera views which render the same bodies from different camera poses in one LevelSequence and render job
+#   View rows after each Group row: Index,View,None,X,Y,Z,Yaw,Pitch,Roll,view=N;camera_hfov=HFOV
+#   Group row camera is view 0, view poses are relative to camera root like the Group row camera pose
+def add_camera_views(csv_path, config_camera, config_type, num_views, seed=None):
 
-            output.append(line + "\n")
+    c = config_camera
 
-    csv_output_path = csv_path.parent / csv_path.name.replace(".csv", "_sequenceroot.csv")
-    print(f"Saving modified sequence: {csv_output_path}")
-    with open(csv_output_path, "w") as f:
-        f.writelines(output)
+    table = load_table(csv_path, columnar=False)
+    if np.any(table.rowtype_mask("View")):
+        print(f"ERROR: Input already contains camera views: {csv_path}", file=sys.stderr)
+        sys.exit(1)
 
-    return
+    rng = np.random.default_rng(seed)
 
-# Replace textured geometry clothing with clothing overlay
-def clothing_overlay_replace(csv_path):
+    is_comment = table.rowtype_mask("Comment")
+    table.append_comments(is_comment, [f";cam_views={num_views};cam_views_config={config_type}"] * np.count_nonzero(is_comment))
 
-    with open(csv_path, "r") as f:
-        bodies = f.readlines()
+    is_group = table.rowtype_mask("Group")
+    group = table.get_columns(is_group)
+    start = [to_floats(group["X"]), to_floats(group["Y"]), to_floats(group["Z"])]
 
-    output = []
+    hfov = []
+    for comment in group["Comment"]:
+        match = CAMERA_HFOV_PATTERN.search(comment)
+        if c.hfov > 0:
+            hfov.append(str(c.hfov))
+        elif match:
+            hfov.append(match.group(2))
+        else:
+            print("ERROR: Cannot find camera_hfov entry in source data")
+            sys.exit(1)
+
+    # Randomize camera poses of all sequences at once, one call per view
+    view_lines = [[] for _ in hfov]
+    for view in range(1, num_views):
+        pose_strings = [to_strings(values) for values in get_random_camera_poses(c, rng, *start)]
+        for group_id in range(len(hfov)):
+            view_lines[group_id].append(f"0,View,None,{','.join(values[group_id] for values in pose_strings)},view={view};camera_hfov={hfov[group_id]}")
+
+    # Insert after Group rows and renumber rows
+    lines = []
+    group_id = 0
+    for (line, group_row) in zip(table.lines, is_group):
+        lines.append(line)
+        if group_row:
+            lines.extend(view_lines[group_id])
+            group_id += 1
+
+    table.lines = np.array([f"{index},{line.split(',', 1)[1]}" for (index, line) in enumerate(lines)], dtype=object)
+    table.rowtypes = np.array([line.split(",", 2)[1] for line in table.lines], dtype=object)
+
+    csv_output_path = get_output_path(csv_path, "views")
+    print(f"Saving modified sequence ({num_views} camera views): {csv_output_path}")
+    save_table(table, csv_output_path)
 
-    for line in bodies:
-        line = line.rstrip()
+    return
 
+def change_camera_root(csv_path, seed=None):
 
-        if line.startswith("Index"):
-            output.append(line + "\n")
-            continue
+    table = load_table(csv_path)
+    rng = np.random.default_rng(seed)
 
-        items = line.split(",")
-        index = int(items[0])
-        rowtype = items[1]
-        subject_animation_index = items[2].split("_")[-1]
-        subject = items[2].replace(f"_{subject_animation_index}", "")
-        if rowtype == "Body":
-            match = re.search(r"(.+)texture_clothing=([^\;]+)(.*)", line)
-            if match:
-                texture_clothing_overlay = f"{subject}_{match.group(2)}"
-                line = match.group(1) + f"texture_clothing_overlay={texture_clothing_overlay}" + match.group(3)
+    is_comment = table.rowtype_mask("Comment")
+    table.append_comments(is_comment, [";cameraroot_yaw_min=0;cameraroot_yaw_max=360]"] * np.count_nonzero(is_comment))
 
-        output.append(line + "\n")
+    is_group = table.rowtype_mask("Group")
+    cam_root_yaws = rng.uniform(0, 360, np.count_nonzero(is_group))
+    table.append_comments(is_group, [f";cameraroot_yaw={cam_root_yaw}" for cam_root_yaw in cam_root_yaws.tolist()])
 
-    csv_output_path = csv_path.parent / csv_path.name.replace(".csv", "_overlay.csv")
+    csv_output_path = get_output_path(csv_path, "cameraroot")
     print(f"Saving modified sequence: {csv_output_path}")
-    with open(csv_output_path, "w") as f:
-        f.writelines(output)
+    save_table(table, csv_output_path)
 
     return
 
-# Add textured geometry clothing to files which do not have geometry clothing information
-def clothing_overlay_add(csv_path):
-
-    subject_gender = {}
-    with open(SUBJECT_GENDER_PATH) as f:
-        csv_reader = csv.DictReader(f)
-        for row in csv_reader:
-            subject_gender[row["Name"]] = row["Gender"]
+# Rotate camera and bodies in world space (HDRI background and body lighting variation)
+def change_sequence_root(csv_path, seed=None):
 
-    textures_overlay = {}
-    with open(TEXTURES_OVERLAY_PATH) as f:
-        textures_overlay = json.load(f)
+    table = load_table(csv_path)
+    rng = np.random.default_rng(seed)
 
-    current_textures_overlay = { "f": [], "m": [] }
+    is_group = table.rowtype_mask("Group")
+    is_body = table.rowtype_mask("Body")
+    is_camera = table.rowtype_mask("Camera")
+    is_rotated = is_group | is_body | table.rowtype_mask("View") | is_camera
 
-    with open(csv_path, "r") as f:
-        bodies = f.readlines()
+    # One random angle per sequence, rows before first Group are not rotated
+    angles = rng.uniform(0.0, 360.0, np.count_nonzero(is_group))
+    row_angles = np.concatenate(([0.0], angles))[table.group_ids() + 1][is_rotated]
 
-    output = []
+    rows = table.get_columns(is_rotated)
+    rows_group = (rows["Type"] == "Group")
 
-    for line in bodies:
-        line = line.rstrip()
+    # Note: we do not need to rotate static camera location since it's at origin for HDRI scenes.
+    # Camera trajectory rows (be_camera_trajectories.py) move around the bodies and are rotated like the bodies.
+    rows_located = (rows["Type"] == "Body") | (rows["Type"] == "Camera")
+    yaw_r = to_floats(rows["Yaw"]) + row_angles
+    yaw_r = np.where(yaw_r >= 360.0, yaw_r - 360.0, yaw_r)
+    rows["Yaw"] = to_strings(yaw_r)
 
+    rows["Comment"][rows_group] += np.array([f";angle={angle}" for angle in angles.tolist()], dtype=object)
 
-        if line.startswith("Index"):
-            output.append(line + "\n")
-            continue
+    # Rotate bodies and camera trajectories in world space
+    angles_r = np.radians(row_angles[rows_located])
+    sin_a = np.sin(angles_r)
+    cos_a = np.cos(angles_r)
 
-        items = line.split(",")
-        index = int(items[0])
-        rowtype = items[1]
-        body = items[2]
+    x = to_floats(rows["X"][rows_located])
+    y = to_floats(rows["Y"][rows_located])
 
-        if rowtype == "Body":
-            match = re.search(r"(.+)_\d\d\d\d", body)
-            if not match:
-                print("ERROR: Invalid subject name: {body}")
-                sys.exit(1)
-            subject = match.group(1)
+    rows["X"][rows_located] = to_strings(cos_a * x - sin_a * y)
+    rows["Y"][rows_located] = to_strings(sin_a * x + cos_a * y)
 
-            gender = subject_gender[subject]
-            if len(current_textures_overlay[gender]) == 0:
-                current_textures_overlay[gender] = list(textures_overlay[gender])
+    table.set_columns(is_rotated, rows)
 
-            texture_clothing_overlay = current_textures_overlay[gender].pop(random.randrange(len(current_textures_overlay[gender])))
+    csv_output_path = get_output_path(csv_path, "sequenceroot")
+    print(f"Saving modified sequence: {csv_output_path}")
+    save_table(table, csv_output_path)
 
-            line += f";texture_clothing_overlay={texture_clothing_overlay}"
+    return
 
-        output.append(line + "\n")
+# Replace textured geometry clothing with clothing overlay
+def clothing_overlay_replace(csv_path):
 
-    csv_output_path = csv_path.parent / csv_path.name.replace(".csv", "_overlay.csv")
+    table = load_table(csv_path)
+
+    is_body = table.rowtype_mask("Body")
+    body = table.get_columns(is_body)
+    comments = []
+    for (body_name, comment) in zip(body["Body"], body["Comment"]):
+        subject = body_name.rsplit("_", 1)[0]
+        match = TEXTURE_CLOTHING_PATTERN.search(comment)
+        if match:
+            texture_clothing_overlay = f"{subject}_{match.group(2)}"
+            comment = match.group(1) + f"texture_clothing_overlay={texture_clothing_overlay}" + match.group(3)
+        comments.append(comment)
+    body["Comment"] = np.array(comments, dtype=object)
+    table.set_columns(is_body, body)
+
+    csv_output_path = get_output_path(csv_path, "clothing_overlay")
     print(f"Saving modified sequence: {csv_output_path}")
-    with open(csv_output_path, "w") as f:
-        f.writelines(output)
+    save_table(table, csv_output_path)
 
     return
 
-# Add hair
-def hair_add(csv_path):
-
+def load_subject_gender():
     subject_gender = {}
     with open(SUBJECT_GENDER_PATH) as f:
         csv_reader = csv.DictReader(f)
         for row in csv_reader:
             subject_gender[row["Name"]] = row["Gender"]
+    return subject_gender
+
+def get_body_genders(table, is_body, subject_gender):
+    """
+    Gender of each Body row
+    """
+    genders = []
+    for body in table.get_columns(is_body)["Body"]:
+        match = SUBJECT_PATTERN.search(body)
+        if not match:
+            print(f"ERROR: Invalid subject name: {body}", file=sys.stderr)
+            sys.exit(1)
+        genders.append(subject_gender[match.group(1)])
+    return genders
+
+def get_balanced_choices(genders, choices, rng):
+    """
+    Random choice per gender, equal use of all choices by not using choices of previous bodies if possible
+    """
+    current_choices = { "f": [], "m": [] }
+    selected = []
+    for gender in genders:
+        if len(current_choices[gender]) == 0:
+            current_choices[gender] = list(choices[gender])
+        selected.append(current_choices[gender].pop(rng.integers(len(current_choices[gender]))))
+    return selected
+
+# Add textured geometry clothing to files which do not have geometry clothing information
+def clothing_overlay_add(csv_path, seed=None):
+
+    textures_overlay = {}
+    with open(TEXTURES_OVERLAY_PATH) as f:
+        textures_overlay = json.load(f)
+
+    rng = np.random.default_rng(seed)
+
+    table = load_table(csv_path)
+    is_body = table.rowtype_mask("Body")
+    genders = get_body_genders(table, is_body, load_subject_gender())
+    textures_clothing_overlay = get_balanced_choices(genders, textures_overlay, rng)
+    table.append_comments(is_body, [f";texture_clothing_overlay={texture_clothing_overlay}" for texture_clothing_overlay in textures_clothing_overlay])
+
+    csv_output_path = get_output_path(csv_path, "clothing_overlay")
+    print(f"Saving modified sequence: {csv_output_path}")
+    save_table(table, csv_output_path)
+
+    return
+
+# Add hair
+def hair_add(csv_path, seed=None):
 
     # Get gender hair whitelelist
     whitelist_hair = {}
@@ -371,93 +433,183 @@ def hair_add(csv_path):
         whitelist_hair = json.load(f)
 
     # Ensure equal use of hair types over all sequences by not using hair from previous sequences if possible.
-    current_hair = { 'f':[], 'm':[] }
-
-    with open(csv_path, "r") as f:
-        bodies = f.readlines()
-
-    output = []
+    rng = np.random.default_rng(seed)
 
-    for line in bodies:
-        line = line.rstrip()
+    table = load_table(csv_path)
+    is_body = table.rowtype_mask("Body")
+    genders = get_body_genders(table, is_body, load_subject_gender())
+    hair_names = get_balanced_choices(genders, whitelist_hair, rng)
+    table.append_comments(is_body, [f";hair={hair_name}" for hair_name in hair_names])
 
+    csv_output_path = get_output_path(csv_path, "hair")
+    print(f"Saving modified sequence: {csv_output_path}")
+    save_table(table, csv_output_path)
 
-        if line.startswith("Index"):
-            output.append(line + "\n")
-            continue
+    return
 
-        items = line.split(",")
-        index = int(items[0])
-        rowtype = items[1]
-        body = items[2]
+def get_output_path(csv_path, target_type):
+    return csv_path.parent / (csv_path.stem + OUTPUT_SUFFIXES[target_type] + csv_path.suffix)
 
-        if rowtype == "Body":
-            match = re.search(r"(.+)_\d\d\d\d", body)
-            if not match:
-                print("ERROR: Invalid subject name: {body}")
-                sys.exit(1)
-            subject = match.group(1)
+def get_cache_key(csv_path, target_type, options, seed, config=None, catalog_paths=None, animation_paths=None):
+    """
+    Content hash of everything which determines the modification output: script sources, input file, modifier, configuration, catalogs and seed.
+    Animation data files are only identified by path, size and modification time since reading all of them would take longer than the modification.
+    """
+    hash = hashlib.sha256()
 
-            gender = subject_gender[subject]
+    def add(data):
+        hash.update(len(data).to_bytes(8, "little"))
+        hash.update(data)
 
-            if len(current_hair[gender]) == 0:
-                current_hair[gender] = list(whitelist_hair[gender])
+    for source_path in CACHE_SOURCE_PATHS:
+        add(source_path.read_bytes())
 
-            hair_name = current_hair[gender].pop(random.randrange(len(current_hair[gender])))
+    add(csv_path.read_bytes())
 
-            line += f";hair={hair_name}"
+    if config is not None:
+        config = config._asdict()
+    add(json.dumps([target_type, options, seed, config]).encode())
 
-        output.append(line + "\n")
+    for catalog_path in (catalog_paths or []):
+        add(Path(catalog_path).read_bytes())
 
-    csv_output_path = csv_path.parent / csv_path.name.replace(".csv", "_hair.csv")
-    print(f"Saving modified sequence: {csv_output_path}")
-    with open(csv_output_path, "w") as f:
-        f.writelines(output)
+    for animation_path in (animation_paths or []):
+        stat = Path(animation_path).stat()
+        add(json.dumps([str(animation_path), stat.st_size, stat.st_mtime_ns]).encode())
 
-    return
+    return hash.hexdigest()
 
 def print_usage():
-    print(f"Usage: {sys.argv[0]} INPUTCSVPATH camera CONFIGTYPE", file=sys.stderr)
+    print(f"Usage: {sys.argv[0]} [--seed SEED] [--cache-dir CACHE_DIR] INPUTCSVPATH camera CONFIGTYPE [VISIBILITY_MIN]", file=sys.stderr)
     print("       %s be_seq.csv camera cam_random_a" % (sys.argv[0]), file=sys.stderr)
+    print("       %s be_seq.csv camera cam_random_h 0.9" % (sys.argv[0]), file=sys.stderr)
+    print("       %s --seed 1 be_seq.csv camera cam_random_a" % (sys.argv[0]), file=sys.stderr)
     print(configs_camera.keys())
-    print(f"Usage: {sys.argv[0]} INPUTCSVPATH cameraroot", file=sys.stderr)
-    print(f"Usage: {sys.argv[0]} INPUTCSVPATH sequenceroot", file=sys.stderr)
-    print(f"Usage: {sys.argv[0]} INPUTCSVPATH clothing_overlay [add]", file=sys.stderr)
-    print(f"Usage: {sys.argv[0]} INPUTCSVPATH hair", file=sys.stderr)
+    print(f"Usage: {sys.argv[0]} [--seed SEED] [--cache-dir CACHE_DIR] INPUTCSVPATH views CONFIGTYPE NUM_VIEWS", file=sys.stderr)
+    print("       %s --seed 1 be_seq.csv views cam_random_c 3" % (sys.argv[0]), file=sys.stderr)
+    print(f"Usage: {sys.argv[0]} [--seed SEED] [--cache-dir CACHE_DIR] INPUTCSVPATH cameraroot", file=sys.stderr)
+    print(f"Usage: {sys.argv[0]} [--seed SEED] [--cache-dir CACHE_DIR] INPUTCSVPATH sequenceroot", file=sys.stderr)
+    print(f"Usage: {sys.argv[0]} [--seed SEED] [--cache-dir CACHE_DIR] INPUTCSVPATH clothing_overlay [add]", file=sys.stderr)
+    print(f"Usage: {sys.argv[0]} [--seed SEED] [--cache-dir CACHE_DIR] INPUTCSVPATH hair", file=sys.stderr)
     return
 
 ################################################################################
 # Main
 ################################################################################
 
-if len(sys.argv) < 3:
+# Optional arguments
+seed = None
+cache_dir = CACHE_DIR
+args = sys.argv[1:]
+while len(args) > 0 and args[0].startswith("--"):
+    if len(args) < 2:
+        print_usage()
+        sys.exit(1)
+
+    if args[0] == "--seed":
+        seed = int(args[1])
+    elif args[0] == "--cache-dir":
+        cache_dir = Path(args[1])
+    else:
+        print(f"ERROR: Unknown option: {args[0]}", file=sys.stderr)
+        print_usage()
+        sys.exit(1)
+    args = args[2:]
+
+if len(args) < 2:
     print_usage()
     sys.exit(1)
 
-csv_path = Path(sys.argv[1])
-target_type = sys.argv[2]
+csv_path = Path(args[0])
+target_type = args[1]
+options = args[2:]
+
+config_camera = None
+catalog_paths = []
+animation_paths = []
 
 if target_type == "camera":
-    config_type = sys.argv[3]
+    if len(options) < 1:
+        print_usage()
+        sys.exit(1)
+
+    config_type = options[0]
     if not config_type in configs_camera:
         print(f"ERROR: Undefined camera type: {config_type}", file=sys.stderr)
         print(configs_camera.keys())
         sys.exit(1)
 
-    change_camera(csv_path, configs_camera[config_type], config_type)
+    config_camera = configs_camera[config_type]
+    if len(options) >= 2:
+        # Resample cameras until given fraction of body trajectory points is visible
+        config_camera = config_camera._replace(visibility_min=float(options[1]))
+
+    if config_camera.visibility_min > 0:
+        if TRAJECTORIES_PATH is not None:
+            catalog_paths = [TRAJECTORIES_PATH]
+        else:
+            # Visibility check reads SMPL-X animation data of all bodies
+            table = load_table(csv_path)
+            animation_paths = [get_animation_path(body_name) for body_name in sorted(set(table.get_columns(table.rowtype_mask("Body"))["Body"]))]
+
+    modify = lambda: change_camera(csv_path, config_camera, config_type, seed)
+elif target_type == "views":
+    if len(options) != 2:
+        print_usage()
+        sys.exit(1)
+
+    config_type = options[0]
+    if not config_type in configs_camera:
+        print(f"ERROR: Undefined camera type: {config_type}", file=sys.stderr)
+        print(configs_camera.keys())
+        sys.exit(1)
+
+    config_camera = configs_camera[config_type]
+    num_views = int(options[1])
+    if num_views < 2:
+        print("ERROR: Number of camera views must be at least 2", file=sys.stderr)
+        sys.exit(1)
+
+    modify = lambda: add_camera_views(csv_path, config_camera, config_type, num_views, seed)
 elif target_type == "cameraroot":
-    change_camera_root(csv_path)
+    modify = lambda: change_camera_root(csv_path, seed)
 elif target_type == "sequenceroot":
-    change_sequence_root(csv_path)
+    modify = lambda: change_sequence_root(csv_path, seed)
 elif target_type == "clothing_overlay":
-    if len(sys.argv) == 4:
-        clothing_overlay_add(csv_path)
+    if len(options) == 1:
+        catalog_paths = [SUBJECT_GENDER_PATH, TEXTURES_OVERLAY_PATH]
+        modify = lambda: clothing_overlay_add(csv_path, seed)
     else:
-        clothing_overlay_replace(csv_path)
+        modify = lambda: clothing_overlay_replace(csv_path)
 elif target_type == "hair":
-    hair_add(csv_path)
+    catalog_paths = [SUBJECT_GENDER_PATH, WHITELIST_HAIR_PATH]
+    modify = lambda: hair_add(csv_path, seed)
 else:
     print(f"ERROR: Unknown target type: {target_type}", file=sys.stderr)
     sys.exit(1)
 
+csv_output_path = get_output_path(csv_path, target_type)
+
+# Seeded modifications are reproducible and stored in content-addressed cache
+cache_path = None
+if seed is not None:
+    cache_key = get_cache_key(csv_path, target_type, options, seed, config_camera, catalog_paths, animation_paths)
+    cache_path = cache_dir / cache_key[:2] / f"{cache_key}{csv_path.suffix}"
+    if cache_path.exists():
+        print(f"Using cached modification: {cache_path}")
+        print(f"Saving modified sequence: {csv_output_path}")
+        shutil.copyfile(cache_path, csv_output_path)
+        sys.exit(0)
+else:
+    print("WARNING: No seed specified, modification is not reproducible and will not be cached", file=sys.stderr)
+
+modify()
+
+if cache_path is not None:
+    # Write to temporary file first so that interrupted runs never leave incomplete cache entries
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path_tmp = cache_path.with_name(cache_path.name + ".tmp")
+    shutil.copyfile(csv_output_path, cache_path_tmp)
+    cache_path_tmp.replace(cache_path)
+
 sys.exit(0)
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Columnar binary representation of body scene definition files (be_seq.csv)
+#
+# Format: uncompressed .npz file with one typed array per column
+# + index: int64
+# + pose: float64 (rows x 6), X, Y, Z, Yaw, Pitch, Roll
+# + type, body: dictionary encoded (<name>_codes: int32, <name>_values: str)
+# + Comment key=value pairs: one dictionary encoded column per key (comment_<key>_codes/_values, code -1: key not set)
+#   and the key order of each row (comment_layout_codes/_values)
+# + Values which would not be written back identically (non-canonical numbers, unparsable comments, unexpected column count)
+#   are stored as raw text fallback (<name>_raw_rows/_raw_values) so that CSV -> npz -> CSV conversion is lossless
+#
+# Arrays are memory-mapped on load and string columns are deduplicated. Modifications (be_modify_sequences.py) access the
+# columns through ColumnTable which only builds CSV lines for the rows which are read or modified, unmodified rows are
+# written back from their columns.
+#
+# Dependencies:
+# + pip install numpy
+#
+
+import numpy as np
+from pathlib import Path
+import struct
+import sys
+import zipfile
+
+from be_sequence_table import CSV_COLUMNS, POSE_COLUMNS, SequenceTable, load_csv, save_csv, split_lines
+
+# Globals
+COMMENT_KEY_SEPARATOR = ";"
+
+################################################################################
+
+def encode_strings(values):
+    """
+    Dictionary encode list of str, None entries get code -1
+    """
+    values = np.array(values, dtype=object)
+    codes = np.full(len(values), -1, dtype=np.int32)
+    is_set = np.array([value is not None for value in values], dtype=bool)
+    if not np.any(is_set):
+        return (codes, np.array([], dtype=str))
+
+    (dictionary, inverse) = np.unique(values[is_set].astype(str), return_inverse=True)
+    codes[is_set] = inverse
+    return (codes, dictionary)
+
+def decode_strings(codes, dictionary, missing=None):
+    values = np.full(len(codes), missing, dtype=object)
+    is_set = codes >= 0
+    values[is_set] = np.asarray(dictionary, dtype=object)[codes[is_set]]
+    return values
+
+def encode_raw(values, rows):
+    rows = np.array(rows, dtype=np.int64)
+    raw_values = np.array(values, dtype=str) if len(values) > 0 else np.array([], dtype=str)
+    return (rows, raw_values)
+
+################################################################################
+
+class SequenceColumns:
+    """
+    Read access to columnar sequence definition, arrays are usually memory-mapped (see load_npz())
+    """
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.header = str(arrays["header"][0])
+        self.comment_keys = [str(key) for key in arrays["comment_keys"]]
+
+    def __len__(self):
+        return len(self.arrays["index"])
+
+    @property
+    def index(self):
+        return self.arrays["index"]
+
+    @property
+    def pose(self):
+        return self.arrays["pose"]
+
+    def get_strings(self, name, missing=""):
+        """
+        Decoded dictionary column (type, body) as dtype=object array
+        """
+        return decode_strings(self.arrays[f"{name}_codes"], self.arrays[f"{name}_values"], missing)
+
+    def get_comment(self, key, missing=None):
+        """
+        Decoded Comment value for each row, missing if key is not set in row
+        """
+        if key not in self.comment_keys:
+            return np.full(len(self), missing, dtype=object)
+        return decode_strings(self.arrays[f"comment_{key}_codes"], self.arrays[f"comment_{key}_values"], missing)
+
+    def get_comment_floats(self, key):
+        """
+        Numeric Comment values (frames, start_frame, camera_hfov, ...), NaN if key is not set in row
+        """
+        values = np.full(len(self), np.nan)
+        if key not in self.comment_keys:
+            return values
+
+        codes = self.arrays[f"comment_{key}_codes"]
+        dictionary = np.asarray(self.arrays[f"comment_{key}_values"]).astype(np.float64)
+        is_set = codes >= 0
+        values[is_set] = dictionary[codes[is_set]]
+        return values
+
+    def rowtype_mask(self, rowtype):
+        dictionary = list(self.arrays["type_values"])
+        if rowtype not in dictionary:
+            return np.zeros(len(self), dtype=bool)
+        return np.asarray(self.arrays["type_codes"]) == dictionary.index(rowtype)
+
+    def get_lines(self, rows=None):
+        """
+        Reconstruct CSV rows, all rows or only given row indices
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        positions = self._get_positions(rows)
+
+        index = np.array(list(map(str, np.asarray(self.index)[rows].tolist())), dtype=object)
+        self._apply_raw(index, "index", positions)
+
+        types = decode_strings(np.asarray(self.arrays["type_codes"])[rows], self.arrays["type_values"], "")
+        bodies = decode_strings(np.asarray(self.arrays["body_codes"])[rows], self.arrays["body_values"], "")
+
+        pose = np.array(list(map(str, np.asarray(self.pose, dtype=np.float64)[rows].ravel().tolist())), dtype=object).reshape(len(rows), len(POSE_COLUMNS))
+        raw_rows = np.asarray(self.arrays["pose_raw_rows"])
+        if len(raw_rows) > 0:
+            selected = positions[raw_rows] >= 0
+            pose[positions[raw_rows[selected]], np.asarray(self.arrays["pose_raw_columns"])[selected]] = np.asarray(self.arrays["pose_raw_values"], dtype=object)[selected]
+
+        comments = self._get_comments(rows, positions)
+
+        lines = np.array(list(map(",".join, zip(index, types, bodies, *pose.T, comments))), dtype=object)
+        self._apply_raw(lines, "line", positions)
+        return lines
+
+    def to_table(self):
+        lines = self.get_lines()
+        return SequenceTable(self.header, lines, self.get_strings("type"))
+
+    def _get_positions(self, rows):
+        """
+        Position of each row in selected rows, -1 if not selected
+        """
+        positions = np.full(len(self), -1, dtype=np.int64)
+        positions[rows] = np.arange(len(rows))
+        return positions
+
+    def _apply_raw(self, values, name, positions):
+        raw_rows = np.asarray(self.arrays[f"{name}_raw_rows"])
+        if len(raw_rows) > 0:
+            selected = positions[raw_rows] >= 0
+            values[positions[raw_rows[selected]]] = np.asarray(self.arrays[f"{name}_raw_values"], dtype=object)[selected]
+
+    def _get_comments(self, rows, positions):
+        layouts = [layout.split(COMMENT_KEY_SEPARATOR) if layout != "" else [] for layout in map(str, self.arrays["comment_layout_values"])]
+        layout_codes = np.asarray(self.arrays["comment_layout_codes"])[rows].tolist()
+        columns = { key: decode_strings(np.asarray(self.arrays[f"comment_{key}_codes"])[rows], self.arrays[f"comment_{key}_values"]).tolist() for key in self.comment_keys }
+
+        comments = np.array([COMMENT_KEY_SEPARATOR.join(f"{key}={columns[key][row]}" for key in layouts[code]) if code >= 0 else "" for (row, code) in enumerate(layout_codes)], dtype=object)
+        self._apply_raw(comments, "comment", positions)
+        return comments
+
+class ColumnTable:
+    """
+    SequenceTable interface on SequenceColumns. CSV lines are only built for the rows which are read (get_columns())
+    or modified, saving as .npz only re-encodes the modified rows.
+    """
+    def __init__(self, columns):
+        self.columns = columns
+        self.header = columns.header
+        self.rowtypes = columns.get_strings("type")
+        self.modified = {} # Row index -> modified line
+
+    def __len__(self):
+        return len(self.rowtypes)
+
+    def rowtype_mask(self, rowtype):
+        return self.rowtypes == rowtype
+
+    def group_ids(self):
+        return np.cumsum(self.rowtype_mask("Group")) - 1
+
+    def get_lines(self, mask):
+        rows = np.flatnonzero(mask)
+        lines = self.columns.get_lines(rows)
+        if len(self.modified) > 0:
+            for (position, row) in enumerate(rows.tolist()):
+                if row in self.modified:
+                    lines[position] = self.modified[row]
+        return lines
+
+    def get_columns(self, mask):
+        items = split_lines(self.get_lines(mask))
+        num_columns = len(CSV_COLUMNS)
+        return { name: np.array(items[column_index::num_columns], dtype=object) for (column_index, name) in enumerate(CSV_COLUMNS) }
+
+    def set_columns(self, mask, columns):
+        self.modified.update(zip(np.flatnonzero(mask).tolist(), map(",".join, zip(*(columns[name] for name in CSV_COLUMNS)))))
+
+    def append_comments(self, mask, suffixes):
+        self.modified.update(zip(np.flatnonzero(mask).tolist(), [line + suffix for (line, suffix) in zip(self.get_lines(mask), suffixes)]))
+
+    def to_table(self):
+        return SequenceTable(self.header, self.get_lines(np.full(len(self), True)), self.rowtypes.copy())
+
+    def to_arrays(self):
+        """
+        Column arrays with modified rows, unmodified rows are copied without building their lines
+        """
+        arrays = { name: np.asarray(values) for (name, values) in self.columns.arrays.items() }
+        if len(self.modified) == 0:
+            return arrays
+
+        rows = np.array(sorted(self.modified), dtype=np.int64)
+        modified = table_to_arrays(SequenceTable(self.header, np.array([self.modified[row] for row in rows.tolist()], dtype=object), self.rowtypes[rows]))
+        keep = np.full(len(self), True)
+        keep[rows] = False
+
+        # Raw text fallbacks of unmodified rows and of modified rows, sorted by row
+        for (name, value_names) in [("line", ["values"]), ("index", ["values"]), ("comment", ["values"]), ("pose", ["columns", "values"])]:
+            source_rows = arrays[f"{name}_raw_rows"]
+            source_keep = keep[source_rows] if len(source_rows) > 0 else np.zeros(0, dtype=bool)
+            merged_rows = np.concatenate([source_rows[source_keep], rows[modified[f"{name}_raw_rows"]]]).astype(np.int64)
+            order = np.argsort(merged_rows, kind="stable")
+            arrays[f"{name}_raw_rows"] = merged_rows[order]
+            for value_name in value_names:
+                arrays[f"{name}_raw_{value_name}"] = np.concatenate([arrays[f"{name}_raw_{value_name}"][source_keep], modified[f"{name}_raw_{value_name}"]])[order]
+
+        for name in ["index", "pose"]:
+            arrays[name] = arrays[name].copy()
+            arrays[name][rows] = modified[name]
+
+        def merge_strings(name, source_present=True, modified_present=True):
+            values = decode_strings(arrays[f"{name}_codes"], arrays[f"{name}_values"]) if source_present else np.full(len(self), None, dtype=object)
+            values[rows] = decode_strings(modified[f"{name}_codes"], modified[f"{name}_values"]) if modified_present else None
+            (arrays[f"{name}_codes"], arrays[f"{name}_values"]) = encode_strings(values)
+
+        for name in ["type", "body", "comment_layout"]:
+            merge_strings(name)
+
+        comment_keys = list(self.columns.comment_keys)
+        comment_keys.extend(str(key) for key in modified["comment_keys"] if str(key) not in comment_keys)
+        used_keys = []
+        for key in comment_keys:
+            merge_strings(f"comment_{key}", key in self.columns.comment_keys, key in modified["comment_keys"])
+            if np.any(arrays[f"comment_{key}_codes"] >= 0):
+                used_keys.append(key)
+            else:
+                del arrays[f"comment_{key}_codes"]
+                del arrays[f"comment_{key}_values"]
+        arrays["comment_keys"] = np.array(used_keys, dtype=str) if len(used_keys) > 0 else np.array([], dtype=str)
+
+        return arrays
+
+################################################################################
+
+def parse_comment(comment):
+    """
+    Split Comment into ordered key=value pairs, None if comment cannot be reproduced from them
+    """
+    items = [item.split("=", 1) for item in comment.split(COMMENT_KEY_SEPARATOR)]
+    if any(len(item) != 2 for item in items):
+        return None
+
+    pairs = dict(items)
+    if len(pairs) != len(items):
+        return None # Duplicate keys
+    return pairs
+
+def table_to_arrays(table):
+    """
+    Convert SequenceTable rows to dictionary of typed column arrays
+    """
+    num_rows = len(table)
+    num_columns = len(CSV_COLUMNS)
+
+    # Rows with unexpected column count are stored as raw lines and left empty in the columns
+    fields = [line.split(",", num_columns - 1) for line in table.lines]
+    line_raw = [row for (row, items) in enumerate(fields) if len(items) != num_columns]
+    for row in line_raw:
+        fields[row] = ["0", fields[row][1] if len(fields[row]) > 1 else "", ""] + ["0.0"] * len(POSE_COLUMNS) + [""]
+    (index_column, type_column, body_column, *pose_columns, comment_column) = zip(*fields) if num_rows > 0 else [()] * num_columns
+
+    arrays = {}
+    arrays["header"] = np.array([table.header], dtype=str)
+    arrays["line_raw_rows"], arrays["line_raw_values"] = encode_raw([table.lines[row] for row in line_raw], line_raw)
+
+    # Index
+    index = np.zeros(num_rows, dtype=np.int64)
+    index_raw = []
+    for (row, value) in enumerate(index_column):
+        try:
+            index[row] = int(value)
+            if str(index[row]) == value:
+                continue
+        except ValueError:
+            pass
+        index_raw.append(row)
+    arrays["index"] = index
+    arrays["index_raw_rows"], arrays["index_raw_values"] = encode_raw([index_column[row] for row in index_raw], index_raw)
+
+    arrays["type_codes"], arrays["type_values"] = encode_strings(type_column)
+    arrays["body_codes"], arrays["body_values"] = encode_strings(body_column)
+
+    # Pose, values which do not match Python float formatting are kept as text
+    pose = np.zeros((num_rows, len(POSE_COLUMNS)))
+    pose_raw = []
+    for (column_index, column) in enumerate(pose_columns):
+        for (row, value) in enumerate(column):
+            try:
+                pose[row, column_index] = float(value)
+                if str(pose[row, column_index].item()) == value:
+                    continue
+            except ValueError:
+                pass
+            pose[row, column_index] = np.nan
+            pose_raw.append((row, column_index, value))
+    arrays["pose"] = pose
+    arrays["pose_raw_rows"] = np.array([row for (row, _, _) in pose_raw], dtype=np.int64)
+    arrays["pose_raw_columns"] = np.array([column_index for (_, column_index, _) in pose_raw], dtype=np.int64)
+    arrays["pose_raw_values"] = np.array([value for (_, _, value) in pose_raw], dtype=str) if len(pose_raw) > 0 else np.array([], dtype=str)
+
+    # Comment key=value pairs
+    comments = [parse_comment(comment) if comment != "" else {} for comment in comment_column]
+    comment_raw = [row for (row, pairs) in enumerate(comments) if pairs is None]
+    arrays["comment_raw_rows"], arrays["comment_raw_values"] = encode_raw([comment_column[row] for row in comment_raw], comment_raw)
+
+    layouts = [COMMENT_KEY_SEPARATOR.join(pairs.keys()) if pairs is not None else None for pairs in comments]
+    arrays["comment_layout_codes"], arrays["comment_layout_values"] = encode_strings(layouts)
+
+    comment_keys = []
+    for pairs in comments:
+        if pairs is not None:
+            comment_keys.extend(key for key in pairs if key not in comment_keys)
+    arrays["comment_keys"] = np.array(comment_keys, dtype=str) if len(comment_keys) > 0 else np.array([], dtype=str)
+
+    for key in comment_keys:
+        arrays[f"comment_{key}_codes"], arrays[f"comment_{key}_values"] = encode_strings([pairs.get(key) if pairs is not None else None for pairs in comments])
+
+    return arrays
+
+################################################################################
+
+def save_npz(table, npz_path):
+    # Uncompressed so that arrays can be memory-mapped
+    np.savez(npz_path, **table_to_arrays(table))
+    return
+
+def load_npz_arrays(npz_path):
+    """
+    Memory-map all arrays of uncompressed .npz file
+    """
+    arrays = {}
+    with zipfile.ZipFile(npz_path) as archive, open(npz_path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.load(archive.open(info))
+                continue
+
+            # Skip zip local file header, array data starts after .npy header
+            f.seek(info.header_offset)
+            local_header = f.read(30)
+            (name_length, extra_length) = struct.unpack("<HH", local_header[26:30])
+            f.seek(info.header_offset + 30 + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                (shape, fortran_order, dtype) = np.lib.format.read_array_header_1_0(f)
+            else:
+                (shape, fortran_order, dtype) = np.lib.format.read_array_header_2_0(f)
+
+            if np.prod(shape) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(npz_path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order="F" if fortran_order else "C")
+
+    return arrays
+
+def load_npz(npz_path):
+    return SequenceColumns(load_npz_arrays(npz_path))
+
+def load_table(path, columnar=True):
+    """
+    Load sequence definition from .csv or columnar .npz file.
+    columnar: .npz files are accessed as ColumnTable, otherwise all lines are built (SequenceTable), needed for inserting rows
+    """
+    if Path(path).suffix == ".npz":
+        columns = load_npz(path)
+        return ColumnTable(columns) if columnar else columns.to_table()
+    return load_csv(path)
+
+def save_table(table, path):
+    if isinstance(table, ColumnTable):
+        if Path(path).suffix == ".npz":
+            np.savez(path, **table.to_arrays())
+        else:
+            save_csv(table.to_table(), path)
+    elif Path(path).suffix == ".npz":
+        save_npz(table, path)
+    else:
+        save_csv(table, path)
+    return
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: {sys.argv[0]} INPUTPATH OUTPUTPATH", file=sys.stderr)
+        print("       %s be_seq.csv be_seq.npz" % (sys.argv[0]), file=sys.stderr)
+        print("       %s be_seq.npz be_seq.csv" % (sys.argv[0]), file=sys.stderr)
+        sys.exit(1)
+
+    input_path = Path(sys.argv[1])
+    output_path = Path(sys.argv[2])
+
+    table = load_table(input_path)
+    print(f"Saving sequence definition ({len(table)} rows): {output_path}")
+    save_table(table, output_path)
+
+    sys.exit(0)
@@ -0,0 +1,105 @@
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Vectorized access to body scene definition files (be_seq.csv)
+#
+# Rows are kept as unparsed lines. Only the rows which are modified are split into columns, converted to NumPy arrays
+# and joined again. Unmodified rows are written out exactly as they were read.
+#
+# Dependencies:
+# + pip install numpy
+#
+
+from dataclasses import dataclass
+import numpy as np
+import re
+
+# Globals
+CSV_HEADER = "Index,Type,Body,X,Y,Z,Yaw,Pitch,Roll,Comment"
+CSV_COLUMNS = CSV_HEADER.split(",")
+POSE_COLUMNS = ["X", "Y", "Z", "Yaw", "Pitch", "Roll"]
+
+ROWTYPE_PATTERN = re.compile(r"^[^,\n]*,([^,\n]*)", re.MULTILINE)
+
+################################################################################
+
+@dataclass
+class SequenceTable:
+    header: str
+    lines: np.ndarray    # dtype=object, one str per row without line ending
+    rowtypes: np.ndarray # dtype=object, Type column
+
+    def __len__(self):
+        return len(self.lines)
+
+    def rowtype_mask(self, rowtype):
+        return self.rowtypes == rowtype
+
+    def group_ids(self):
+        """
+        Index of the Group each row belongs to, -1 for rows before the first Group (Comment)
+        """
+        return np.cumsum(self.rowtype_mask("Group")) - 1
+
+    def get_columns(self, mask):
+        """
+        Split selected rows into dictionary of columns (dtype=object arrays of str)
+        """
+        items = split_lines(self.lines[mask])
+        num_columns = len(CSV_COLUMNS)
+        return { name: np.array(items[column_index::num_columns], dtype=object) for (column_index, name) in enumerate(CSV_COLUMNS) }
+
+    def set_columns(self, mask, columns):
+        self.lines[mask] = list(map(",".join, zip(*(columns[name] for name in CSV_COLUMNS))))
+
+    def append_comments(self, mask, suffixes):
+        # Comment is last column so we can directly append to the row
+        self.lines[mask] = [line + suffix for (line, suffix) in zip(self.lines[mask], suffixes)]
+
+################################################################################
+
+def split_lines(lines):
+    """
+    Split rows into flat list of items, row-major
+    """
+    num_columns = len(CSV_COLUMNS)
+    if len(lines) == 0:
+        return []
+
+    # Split all rows at once instead of creating a list per row.
+    # Comment is last column and only contains ';' separated key=value pairs, so each row has exactly one item per column.
+    items = ",".join(lines).split(",")
+    if len(items) != len(lines) * num_columns:
+        # Fallback for unexpected separators, limit splits per row to keep Comment intact
+        items = [item for line in lines for item in line.split(",", num_columns - 1)]
+
+    return items
+
+def to_floats(column):
+    return column.astype(np.float64)
+
+def to_strings(values):
+    # Python float formatting (shortest repr) matches the f-string output of the sequence generator
+    return np.array(list(map(str, np.asarray(values, dtype=np.float64).tolist())), dtype=object)
+
+def load_csv(csv_path):
+    with open(csv_path, "r") as f:
+        text = f.read()
+
+    header = CSV_HEADER
+    if text.startswith("Index"):
+        (header, _, text) = text.partition("\n")
+
+    lines = [line for line in text.splitlines() if line != ""]
+    rowtypes = ROWTYPE_PATTERN.findall("\n".join(lines))
+    if len(rowtypes) != len(lines):
+        rowtypes = [line.split(",", 2)[1] for line in lines]
+
+    return SequenceTable(header, np.array(lines, dtype=object), np.array(rowtypes, dtype=object))
+
+def save_csv(table, csv_path):
+    with open(csv_path, "w") as f:
+        f.write(table.header + "\n")
+        if len(table) > 0:
+            f.write("\n".join(table.lines) + "\n")
+    return
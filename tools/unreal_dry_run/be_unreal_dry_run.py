@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Dry run BEDLAM Unreal Python scripts without Unreal Editor (any OS) against the offline unreal stand-in module
+#
+# All unreal API calls are recorded and reported per script: call counts and time per API function,
+# API calls per created LevelSequence and per import task, Python-side time (script time without API time).
+# Scripts run one after another in the same stand-in editor session, "+" separates scripts.
+# Render queues started by a script are finished after the script returned, like in the editor.
+#
+# Usage:
+#   python be_unreal_dry_run.py [OPTIONS] SCRIPTPATH [ARGS...] [+ SCRIPTPATH [ARGS...]]...
+#
+# Options:
+#   --inventory INVENTORYPATH: asset inventory (be_asset_preflight.py export), only these assets exist
+#   --inventory-from-csv INPUTCSVPATH: asset registry lists all assets referenced by be_seq.csv, all other assets exist as well
+#   --select ASSETPATH: add asset to Content Browser selection, created LevelSequences are always selected
+#   --set NAME=VALUE: override global variable of scripts (data roots, output folders), VALUE is a Python literal or a string
+#   --report REPORTPATH: save call statistics (.json)
+#
+# Examples:
+#   python be_unreal_dry_run.py --inventory-from-csv be_seq.csv ../../unreal/render/Core/Python/create_level_sequences_csv.py be_seq.csv
+#   python be_unreal_dry_run.py --inventory-from-csv be_seq.csv ../../unreal/render/Core/Python/create_level_sequences_csv.py be_seq.csv + ../../unreal/render/Core/Python/create_movie_render_queue.py /tmp/images 1_DepthMask + ../../unreal/render/Core/Python/render_movie_render_queue.py /tmp/images
+#   python be_unreal_dry_run.py --set data_root=/data/abc/smplx ../../unreal/import/import_abc_smplx.py
+#
+
+import ast
+import json
+from pathlib import Path
+import sys
+import time
+import traceback
+
+# Use stand-in module instead of Unreal Editor module
+sys.path.insert(0, str(Path(__file__).parent))
+import unreal
+
+# Globals
+REPO_ROOT = Path(__file__).resolve().parents[2]
+RENDER_PYTHON_DIR = REPO_ROOT / "unreal" / "render" / "Core" / "Python"
+SCRIPT_SEPARATOR = "+"
+
+################################################################################
+
+def parse_value(value):
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+def load_script(script_path, overrides):
+    """
+    Compile script and replace values of overridden top-level global variables
+    """
+    tree = ast.parse(script_path.read_text(), filename=str(script_path))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and (len(node.targets) == 1) and isinstance(node.targets[0], ast.Name) and (node.targets[0].id in overrides):
+            node.value = ast.copy_location(ast.Constant(overrides[node.targets[0].id]), node.value)
+    return compile(tree, str(script_path), "exec")
+
+def get_inventory_from_csv(csv_path):
+    sys.path.insert(0, str(RENDER_PYTHON_DIR))
+    from be_asset_preflight import AssetRoots, get_required_assets, load_csv_rows
+    return set(get_required_assets(load_csv_rows(csv_path), AssetRoots()).keys())
+
+def summarize_scopes(scopes):
+    summary = {}
+    for kind in sorted(set(scope["kind"] for scope in scopes)):
+        calls = [scope["calls"] for scope in scopes if scope["kind"] == kind]
+        times = [scope["time"] for scope in scopes if scope["kind"] == kind]
+        summary[kind] = { "count": len(calls), "calls": sum(calls), "calls_mean": sum(calls) / len(calls), "calls_max": max(calls), "time_mean": sum(times) / len(times) }
+    return summary
+
+def run_script(script_path, script_args, overrides):
+    code = load_script(script_path, overrides)
+    sys.argv = [str(script_path)] + script_args
+    sys.path.insert(0, str(script_path.parent))
+    unreal.recorder.reset()
+    errors = unreal.session.errors
+
+    exit_code = 0
+    start_time = time.perf_counter()
+    try:
+        try:
+            exec(code, { "__name__": "__main__", "__file__": str(script_path), "__builtins__": __builtins__ })
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        unreal.session.run_executors()
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        script_time = time.perf_counter() - start_time
+        sys.path.remove(str(script_path.parent))
+
+    calls = { name: { "count": count, "time": call_time } for (name, (count, call_time)) in unreal.recorder.calls.items() }
+    api_time = sum(call["time"] for call in calls.values())
+    return { "script": str(script_path), "args": script_args, "exit_code": exit_code, "errors": unreal.session.errors - errors,
+             "time": script_time, "api_time": api_time, "python_time": script_time - api_time, "api_calls": sum(call["count"] for call in calls.values()),
+             "calls": calls, "scopes": summarize_scopes(unreal.recorder.scopes), "unmodeled": sorted(unreal.recorder.unmodeled),
+             "actors": len(unreal.session.actors), "max_actors": unreal.session.max_actors }
+
+def print_result(result):
+    print("=" * 80)
+    print(f"Dry run: {Path(result['script']).name} {' '.join(result['args'])} (exit code: {result['exit_code']}, logged errors: {result['errors']})")
+    print(f"  Time: {result['time']:.3f}s, API: {result['api_time']:.3f}s ({result['api_calls']} calls), Python: {result['python_time']:.3f}s")
+    for (kind, scope) in result["scopes"].items():
+        if kind == "setup":
+            print(f"  Setup: {scope['calls']} API calls")
+        else:
+            print(f"  {kind}: {scope['count']}, API calls per {kind}: mean={scope['calls_mean']:.1f}, max={scope['calls_max']}")
+    print(f"  Level actors: {result['actors']}, max: {result['max_actors']}")
+    if len(result["unmodeled"]) > 0:
+        print(f"  Unmodeled API: {', '.join(result['unmodeled'])}")
+
+    print(f"  {'count':>8} {'time [ms]':>10}  API")
+    for (name, call) in sorted(result["calls"].items(), key=lambda item: (-item[1]["count"], item[0])):
+        print(f"  {call['count']:8} {1000.0 * call['time']:10.2f}  {name}")
+    return
+
+def print_usage():
+    print(f"Usage: {sys.argv[0]} [--inventory INVENTORYPATH | --inventory-from-csv INPUTCSVPATH] [--select ASSETPATH]... [--set NAME=VALUE]... [--report REPORTPATH] SCRIPTPATH [ARGS...] [+ SCRIPTPATH [ARGS...]]...", file=sys.stderr)
+    return
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    inventory = None
+    strict = False
+    selection = []
+    overrides = {}
+    report_path = None
+
+    args = sys.argv[1:]
+    while (len(args) >= 2) and args[0].startswith("--"):
+        (option, value) = (args[0], args[1])
+        args = args[2:]
+        if option == "--inventory":
+            with open(value, "r") as f:
+                inventory = set(line.strip() for line in f if line.strip() != "")
+            strict = True
+        elif option == "--inventory-from-csv":
+            inventory = get_inventory_from_csv(value)
+        elif option == "--select":
+            selection.append(value)
+        elif option == "--set":
+            (name, _, override) = value.partition("=")
+            overrides[name] = parse_value(override)
+        elif option == "--report":
+            report_path = value
+        else:
+            print(f"ERROR: Unknown option: {option}", file=sys.stderr)
+            print_usage()
+            sys.exit(1)
+
+    if len(args) == 0:
+        print_usage()
+        sys.exit(1)
+
+    # Split into script invocations
+    invocations = [[]]
+    for arg in args:
+        if arg == SCRIPT_SEPARATOR:
+            invocations.append([])
+        else:
+            invocations[-1].append(arg)
+
+    unreal.session = unreal.DryRunSession(inventory, strict, selection)
+
+    results = []
+    for invocation in invocations:
+        if len(invocation) == 0:
+            print("ERROR: Missing script path", file=sys.stderr)
+            sys.exit(1)
+        results.append(run_script(Path(invocation[0]).resolve(), invocation[1:], overrides))
+
+    for result in results:
+        print_result(result)
+
+    if report_path is not None:
+        print(f"Saving dry run report: {report_path}")
+        with open(report_path, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if any(result["exit_code"] != 0 for result in results):
+        sys.exit(1)
+
+    sys.exit(0)
@@ -0,0 +1,1444 @@
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Offline stand-in for the Unreal Editor Python module (unreal) used by be_unreal_dry_run.py
+#
+# Implements the subset of the Unreal 5.0 Python API which the BEDLAM Unreal scripts use
+# (create_level_sequences_csv.py, create_movie_render_queue.py, render_movie_render_queue.py, unreal/import/*.py)
+# with an in-memory asset store, level, Sequencer data model and Movie Render Queue.
+# Every API function and method call is recorded with call count and execution time.
+# API which is not modeled resolves to generic objects and is reported as unmodeled.
+#
+# Not a simulation of the editor: nothing is rendered, imported or loaded from disk.
+#
+
+import copy
+import functools
+import os
+from pathlib import Path
+import tempfile
+import time
+import uuid
+
+# Globals
+TICK_DELTA_TIME = 60.0 # [s], simulated editor tick time, one tick per rendered job
+MAX_IDLE_TICKS = 1000  # Ticks without started render before registered tick callbacks are ignored
+ENGINE_VERSION = "5.0.3-0+++UE5+Release-5.0" # Reported by SystemLibrary.get_engine_version()
+
+################################################################################
+# Call recording
+################################################################################
+
+class CallRecorder:
+    """
+    Call count and time per API name. Calls are grouped into scopes, a new scope starts with each created
+    LevelSequence or import task so that calls per sequence and per import can be reported.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.calls = {}
+        self.unmodeled = set()
+        self.scopes = []
+        self.scope = { "kind": "setup", "name": "", "calls": 0, "time": 0.0 }
+        self.scopes.append(self.scope)
+        self.depth = 0
+        return
+
+    def add(self, name, duration):
+        entry = self.calls.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += duration
+        self.scope["calls"] += 1
+        self.scope["time"] += duration
+        return
+
+    def begin_scope(self, kind, name):
+        self.scope = { "kind": kind, "name": name, "calls": 0, "time": 0.0 }
+        self.scopes.append(self.scope)
+        return
+
+recorder = CallRecorder()
+
+def _record_call(name, function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        # Only outermost call is recorded, stand-in internals may call other API functions
+        if recorder.depth > 0:
+            return function(*args, **kwargs)
+
+        recorder.depth += 1
+        start_time = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            recorder.depth -= 1
+            recorder.add(name, time.perf_counter() - start_time)
+    return wrapper
+
+def _recorded(function):
+    return _record_call(function.__name__, function)
+
+def _record_construction(function):
+    # Label by constructed type, __init__ is usually inherited
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        return _record_call(f"{type(self).__name__}()", function)(self, *args, **kwargs)
+    return wrapper
+
+def _unmodeled_call(name):
+    recorder.unmodeled.add(name)
+    return _record_call(name, lambda *args, **kwargs: Object(name=name.rsplit(".", 1)[-1]))
+
+################################################################################
+# Objects
+################################################################################
+
+class _Class:
+    """
+    UClass reference as returned by static_class(), get_class() and load_class()
+    """
+    def __init__(self, name, python_class=None):
+        self.name = name
+        self.python_class = python_class
+
+    def get_name(self):
+        return self.name
+
+    def __eq__(self, other):
+        return isinstance(other, _Class) and (other.name == self.name)
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return f"<Class '{self.name}'>"
+
+class Object:
+    """
+    Base of all stand-in UObjects and structs. Public methods of subclasses are recorded automatically.
+    Editor properties are plain attributes, unknown methods return generic objects.
+    """
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if "__init__" in cls.__dict__:
+            cls.__init__ = _record_construction(cls.__dict__["__init__"])
+        for (name, value) in list(cls.__dict__.items()):
+            if name.startswith("_"):
+                continue
+            label = f"{cls.__name__}.{name}"
+            if isinstance(value, staticmethod):
+                setattr(cls, name, staticmethod(_record_call(label, value.__func__)))
+            elif isinstance(value, classmethod):
+                setattr(cls, name, classmethod(_record_call(label, value.__func__)))
+            elif callable(value) and not isinstance(value, type):
+                setattr(cls, name, _record_call(label, value))
+
+    def __init__(self, name="", package_name="", **properties):
+        self._name = name
+        self._package_name = package_name
+        self._class_name = type(self).__name__
+        for (key, value) in properties.items():
+            setattr(self, key, value)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return _unmodeled_call(f"{type(self).__name__}.{name}")
+
+    def __repr__(self):
+        return f"<Object '{self.get_path_name()}' ({self._class_name})>"
+
+    @classmethod
+    def static_class(cls):
+        return _Class(cls.__name__, cls)
+
+    def get_class(self):
+        return _Class(self._class_name, type(self))
+
+    def get_name(self):
+        return self._name
+
+    def get_fname(self):
+        return self._name
+
+    def get_path_name(self):
+        if self._package_name == "":
+            return self._name
+        return f"{self._package_name}.{self._name}"
+
+    def get_full_name(self):
+        return f"{self._class_name} {self.get_path_name()}"
+
+    def get_outer(self):
+        return None
+
+    def get_editor_property(self, name):
+        return getattr(self, name.lower())
+
+    def set_editor_property(self, name, value, notify_mode=None):
+        setattr(self, name.lower(), value)
+        return
+
+Object.__init__ = _record_construction(Object.__init__)
+
+class _Struct(Object):
+    """
+    Struct with positional fields: Vector(1, 2, 3)
+    """
+    _fields = []
+    _defaults = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(name=type(self).__name__)
+        for field in self._fields:
+            setattr(self, field, self._defaults.get(field, 0))
+        for (field, value) in zip(self._fields, args):
+            setattr(self, field, value)
+        for (key, value) in kwargs.items():
+            setattr(self, key, value)
+
+    def __eq__(self, other):
+        return (type(other) is type(self)) and all(getattr(self, field) == getattr(other, field) for field in self._fields)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, field) for field in self._fields))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{field}={getattr(self, field)!r}' for field in self._fields)})"
+
+class Vector(_Struct):
+    _fields = ["x", "y", "z"]
+
+class Rotator(_Struct):
+    _fields = ["roll", "pitch", "yaw"]
+
+class IntPoint(_Struct):
+    _fields = ["x", "y"]
+
+class FrameNumber(_Struct):
+    _fields = ["value"]
+
+class FrameRate(_Struct):
+    _fields = ["numerator", "denominator"]
+    _defaults = { "numerator": 30, "denominator": 1 }
+
+class SoftObjectPath(_Struct):
+    _fields = ["asset_path_name"]
+    _defaults = { "asset_path_name": "" }
+
+class DirectoryPath(_Struct):
+    _fields = ["path"]
+    _defaults = { "path": "" }
+
+class Guid(_Struct):
+    _fields = ["value"]
+
+class MovieSceneObjectBindingID(_Struct):
+    _fields = ["guid"]
+
+class _Enum:
+    """
+    Enum namespace, any member is valid: AntiAliasingMethod.AAM_TSR -> "AntiAliasingMethod.AAM_TSR"
+    """
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return f"{self._name}.{name}"
+
+AbcConversionPreset = _Enum("AbcConversionPreset")
+AbcGeometryCacheMotionVectorsImport = _Enum("AbcGeometryCacheMotionVectorsImport")
+AlembicImportType = _Enum("AlembicImportType")
+AlembicSamplingType = _Enum("AlembicSamplingType")
+AntiAliasingMethod = _Enum("AntiAliasingMethod")
+ComponentMobility = _Enum("ComponentMobility")
+EXRCompressionFormat = _Enum("EXRCompressionFormat")
+MovieSceneKeyInterpolation = _Enum("MovieSceneKeyInterpolation")
+MoviePipelineObjectIdPassIdType = _Enum("MoviePipelineObjectIdPassIdType")
+SequenceTimeUnit = _Enum("SequenceTimeUnit")
+
+################################################################################
+# Assets
+################################################################################
+
+class Texture(Object):
+    pass
+
+class Texture2D(Texture):
+    pass
+
+class TextureCube(Texture):
+    pass
+
+class MaterialInterface(Object):
+    pass
+
+class Material(MaterialInterface):
+    pass
+
+class MaterialInstanceConstant(MaterialInterface):
+    pass
+
+class GeometryCache(Object):
+    pass
+
+class StaticMesh(Object):
+    pass
+
+class SkeletalMesh(Object):
+    pass
+
+class AnimSequence(Object):
+    pass
+
+class Blueprint(Object):
+    pass
+
+class Factory(Object):
+    pass
+
+class LevelSequenceFactoryNew(Factory):
+    pass
+
+class MaterialInstanceConstantFactoryNew(Factory):
+    pass
+
+class AbcImportSettings(Object):
+    pass
+
+class AbcSamplingSettings(Object):
+    pass
+
+class AbcGeometryCacheSettings(Object):
+    pass
+
+class AbcConversionSettings(Object):
+    pass
+
+class AssetImportTask(Object):
+    def __init__(self, **properties):
+        super().__init__(name="AssetImportTask", **properties)
+        self.filename = ""
+        self.destination_path = ""
+        self.destination_name = ""
+        self.imported_object_paths = []
+
+class AssetData(Object):
+    def __init__(self, package_name, asset_class):
+        super().__init__(name=package_name.rsplit("/", 1)[-1], package_name=package_name)
+        self.package_name = package_name
+        self.package_path = package_name.rsplit("/", 1)[0]
+        self.asset_name = self._name
+        self.asset_class = asset_class
+        self.object_path = f"{package_name}.{self._name}"
+
+################################################################################
+# Sequencer
+################################################################################
+
+class MovieSceneScriptingKey(Object):
+    def __init__(self, frame, value, interpolation=None):
+        super().__init__(name="Key")
+        self._frame = frame
+        self._value = value
+        self._interpolation = interpolation
+
+    def get_time(self, time_unit=None):
+        return FrameNumber(self._frame)
+
+    def set_time(self, new_frame_number, sub_frame=0.0, time_unit=None):
+        self._frame = new_frame_number.value
+        return
+
+    def get_value(self):
+        return self._value
+
+    def set_value(self, new_value):
+        self._value = new_value
+        return
+
+    def get_interpolation_mode(self):
+        return self._interpolation
+
+    def set_interpolation_mode(self, interpolation_mode):
+        self._interpolation = interpolation_mode
+        return
+
+class MovieSceneScriptingChannel(Object):
+    def __init__(self, name="Channel"):
+        super().__init__(name=name)
+        self._default = None
+        self._keys = []
+
+    def add_key(self, time, new_value, sub_frame=0.0, time_unit=None, interpolation=None):
+        key = MovieSceneScriptingKey(time.value, new_value, interpolation)
+        self._keys.append(key)
+        return key
+
+    def remove_key(self, key):
+        self._keys.remove(key)
+        return
+
+    def get_keys(self):
+        return list(self._keys)
+
+    def get_num_keys(self):
+        return len(self._keys)
+
+    def set_default(self, default_value):
+        self._default = default_value
+        return
+
+    def get_default(self):
+        return self._default
+
+    def has_default(self):
+        return self._default is not None
+
+    def remove_default(self):
+        self._default = None
+        return
+
+class MovieSceneSection(Object):
+    def __init__(self, num_channels=1):
+        super().__init__(name="Section")
+        self._channels = [MovieSceneScriptingChannel() for _ in range(num_channels)]
+        self._start_frame = None
+        self._end_frame = None
+        self._row_index = 0
+        self.params = Object(name="params")
+
+    def get_channels(self):
+        return list(self._channels)
+
+    def get_all_channels(self):
+        return list(self._channels)
+
+    def set_range(self, start_frame, end_frame):
+        self._start_frame = start_frame
+        self._end_frame = end_frame
+        return
+
+    def set_start_frame(self, start_frame):
+        self._start_frame = start_frame
+        return
+
+    def set_end_frame(self, end_frame):
+        self._end_frame = end_frame
+        return
+
+    def get_start_frame(self):
+        return self._start_frame
+
+    def get_end_frame(self):
+        return self._end_frame
+
+    def set_start_frame_bounded(self, is_bounded):
+        if not is_bounded:
+            self._start_frame = None
+        return
+
+    def set_end_frame_bounded(self, is_bounded):
+        if not is_bounded:
+            self._end_frame = None
+        return
+
+    def set_constraint_binding_id(self, constraint_binding_id):
+        self.constraint_binding_id = constraint_binding_id
+        return
+
+    def set_row_index(self, new_row_index):
+        self._row_index = new_row_index
+        return
+
+    def get_row_index(self):
+        return self._row_index
+
+class MovieSceneCinematicShotSection(MovieSceneSection):
+    def __init__(self, num_channels=0):
+        super().__init__(num_channels)
+        self._sequence = None
+        self._shot_display_name = ""
+
+    def set_sequence(self, sequence):
+        self._sequence = sequence
+        return
+
+    def get_sequence(self):
+        return self._sequence
+
+    def set_shot_display_name(self, shot_name):
+        self._shot_display_name = shot_name
+        return
+
+    def get_shot_display_name(self):
+        return self._shot_display_name
+
+class MovieSceneTrack(Object):
+    _num_channels = 1
+    _section_class = MovieSceneSection
+
+    def __init__(self):
+        super().__init__(name=type(self).__name__)
+        self._sections = []
+        self._property_name = ""
+
+    def add_section(self):
+        section = self._section_class(self._num_channels)
+        self._sections.append(section)
+        return section
+
+    def get_sections(self):
+        return list(self._sections)
+
+    def remove_section(self, section):
+        self._sections.remove(section)
+        return
+
+    def set_property_name_and_path(self, property_name, property_path):
+        self._property_name = property_name
+        return
+
+    def get_property_name(self):
+        return self._property_name
+
+class MovieScene3DTransformTrack(MovieSceneTrack):
+    _num_channels = 9 # location X, Y, Z, rotation roll, pitch, yaw, scale X, Y, Z
+
+class MovieScene3DAttachTrack(MovieSceneTrack):
+    _num_channels = 0
+
+class MovieSceneCameraCutTrack(MovieSceneTrack):
+    _num_channels = 0
+
+class MovieSceneCinematicShotTrack(MovieSceneTrack):
+    _num_channels = 0
+    _section_class = MovieSceneCinematicShotSection
+
+class MovieSceneFloatTrack(MovieSceneTrack):
+    pass
+
+class MovieSceneGeometryCacheTrack(MovieSceneTrack):
+    _num_channels = 0
+
+class MovieSceneIntegerTrack(MovieSceneTrack):
+    pass
+
+class MovieSceneObjectPropertyTrack(MovieSceneTrack):
+    pass
+
+class MovieSceneSkeletalAnimationTrack(MovieSceneTrack):
+    _num_channels = 0
+
+class MovieSceneStringTrack(MovieSceneTrack):
+    pass
+
+class MovieSceneBindingProxy(Object):
+    def __init__(self, name):
+        super().__init__(name=name)
+        self._id = Guid(uuid.uuid4().hex)
+        self._display_name = name
+        self._tracks = []
+        self._parent = None
+
+    def get_id(self):
+        return self._id
+
+    def get_display_name(self):
+        return self._display_name
+
+    def set_display_name(self, display_name):
+        self._display_name = display_name
+        return
+
+    def add_track(self, track_type):
+        track = track_type()
+        self._tracks.append(track)
+        return track
+
+    def get_tracks(self):
+        return list(self._tracks)
+
+    def find_tracks_by_exact_type(self, track_type):
+        return [track for track in self._tracks if type(track) is track_type]
+
+    def remove_track(self, track):
+        self._tracks.remove(track)
+        return
+
+    def set_parent(self, parent):
+        self._parent = parent
+        return
+
+    def get_parent(self):
+        return self._parent
+
+class LevelSequence(Object):
+    def __init__(self, name="", package_name=""):
+        super().__init__(name=name, package_name=package_name)
+        self._possessables = []
+        self._spawnables = []
+        self._master_tracks = []
+        self._display_rate = FrameRate(30, 1)
+        self._playback_start = 0
+        self._playback_end = 0
+
+    def add_possessable(self, object_to_possess):
+        binding = MovieSceneBindingProxy(_get_binding_name(object_to_possess))
+        self._possessables.append(binding)
+        return binding
+
+    def add_spawnable_from_instance(self, object_to_spawn):
+        binding = MovieSceneBindingProxy(_get_binding_name(object_to_spawn))
+        self._spawnables.append(binding)
+        return binding
+
+    def get_possessables(self):
+        return list(self._possessables)
+
+    def get_spawnables(self):
+        return list(self._spawnables)
+
+    def get_bindings(self):
+        return self._possessables + self._spawnables
+
+    def add_master_track(self, track_type):
+        track = track_type()
+        self._master_tracks.append(track)
+        return track
+
+    def get_master_tracks(self):
+        return list(self._master_tracks)
+
+    def find_master_tracks_by_type(self, track_type):
+        return [track for track in self._master_tracks if isinstance(track, track_type)]
+
+    def set_display_rate(self, display_rate):
+        self._display_rate = display_rate
+        return
+
+    def get_display_rate(self):
+        return self._display_rate
+
+    def set_playback_start(self, start_frame):
+        self._playback_start = start_frame
+        return
+
+    def set_playback_end(self, end_frame):
+        self._playback_end = end_frame
+        return
+
+    def get_playback_start(self):
+        return self._playback_start
+
+    def get_playback_end(self):
+        return self._playback_end
+
+def _get_camera_cut_names(level_sequence):
+    """
+    Camera binding display names of camera cut sections, Movie Render Queue renders each camera cut as separate shot
+    """
+    bindings = { binding.get_id(): binding for binding in level_sequence.get_bindings() }
+    names = []
+    for track in level_sequence.find_master_tracks_by_type(MovieSceneCameraCutTrack):
+        for section in track.get_sections():
+            binding_id = getattr(section, "camerabindingid", None)
+            binding = bindings.get(binding_id.guid) if binding_id is not None else None
+            names.append(binding.get_display_name() if binding is not None else "")
+    return names
+
+def _get_binding_name(target):
+    if isinstance(target, Actor):
+        return target._label
+    return target._name
+
+################################################################################
+# Level
+################################################################################
+
+class SceneComponent(Object):
+    def set_material(self, element_index, material):
+        return
+
+    def set_mobility(self, new_mobility):
+        self.mobility = new_mobility
+        return
+
+class GeometryCacheComponent(SceneComponent):
+    pass
+
+class StaticMeshComponent(SceneComponent):
+    def set_static_mesh(self, new_mesh):
+        self.static_mesh = new_mesh
+        return True
+
+class SkeletalMeshComponent(SceneComponent):
+    def set_skeletal_mesh(self, new_mesh, reinit_pose=True):
+        self.skeletal_mesh = new_mesh
+        return
+
+class CineCameraComponent(SceneComponent):
+    def __init__(self, name="CameraComponent"):
+        super().__init__(name=name)
+        self.filmback = Object(name="filmback", sensor_width=36.0, sensor_height=20.25)
+        self.current_focal_length = 35.0
+
+class Actor(Object):
+    def __init__(self, name="", label=None, class_name=None):
+        super().__init__(name=name, package_name=_level_package_name)
+        self._label = label if label is not None else name
+        self._location = Vector(0.0, 0.0, 0.0)
+        self._attach_parent = None
+        if class_name is not None:
+            self._class_name = class_name
+
+    def get_actor_label(self):
+        return self._label
+
+    def set_actor_label(self, new_actor_label, mark_dirty=True):
+        self._label = new_actor_label
+        return
+
+    def get_actor_location(self):
+        return self._location
+
+    def set_actor_location(self, new_location, sweep=False, teleport=False):
+        self._location = new_location
+        return
+
+    def get_attach_parent_actor(self):
+        return self._attach_parent
+
+    def set_mobility(self, new_mobility):
+        self.mobility = new_mobility
+        return
+
+class GeometryCacheActor(Actor):
+    def __init__(self, name="GeometryCacheActor", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self._geometry_cache_component = GeometryCacheComponent(name="GeometryCacheComponent")
+
+    def get_geometry_cache_component(self):
+        return self._geometry_cache_component
+
+class StaticMeshActor(Actor):
+    def __init__(self, name="StaticMeshActor", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.static_mesh_component = StaticMeshComponent(name="StaticMeshComponent0")
+
+class SkeletalMeshActor(Actor):
+    def __init__(self, name="SkeletalMeshActor", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.skeletal_mesh_component = SkeletalMeshComponent(name="SkeletalMeshComponent0")
+
+class CineCameraActor(Actor):
+    def __init__(self, name="CineCameraActor", **kwargs):
+        super().__init__(name=name, **kwargs)
+        self._camera_component = CineCameraComponent()
+
+    def get_cine_camera_component(self):
+        return self._camera_component
+
+class World(Object):
+    pass
+
+class Level(Object):
+    def __init__(self, world):
+        super().__init__(name="PersistentLevel", package_name=world._package_name)
+        self._world = world
+
+    def get_outer(self):
+        return self._world
+
+# Map which the stand-in level represents
+_level_package_name = "/Game/Bedlam/Maps/BE_Map"
+
+################################################################################
+# Movie Render Queue
+################################################################################
+
+class MoviePipelineSetting(Object):
+    def __init__(self):
+        super().__init__(name=type(self).__name__)
+
+class MoviePipelineAntiAliasingSetting(MoviePipelineSetting):
+    pass
+
+class MoviePipelineOutputSetting(MoviePipelineSetting):
+    def __init__(self):
+        super().__init__()
+        self.use_custom_playback_range = False
+        self.custom_start_frame = 0
+        self.custom_end_frame = 0
+        self.output_frame_step = 1
+
+class MoviePipelineImageSequenceOutput_EXR(MoviePipelineSetting):
+    pass
+
+class MoviePipelineImageSequenceOutput_JPG(MoviePipelineSetting):
+    pass
+
+class MoviePipelineImageSequenceOutput_PNG(MoviePipelineSetting):
+    pass
+
+class MoviePipelineObjectIdRenderPass(MoviePipelineSetting):
+    pass
+
+class MoviePipelineDeferredPassBase(MoviePipelineSetting):
+    def __init__(self):
+        super().__init__()
+        # World depth and motion vectors
+        self.additional_post_process_materials = [Object(name="MoviePipelinePostProcessPass", enabled=False) for _ in range(2)]
+
+class MoviePipelineConfigBase(Object):
+    def __init__(self):
+        super().__init__(name=type(self).__name__)
+        self._settings = []
+
+    def find_setting_by_class(self, setting_class):
+        for setting in self._settings:
+            if type(setting) is setting_class:
+                return setting
+        return None
+
+    def find_or_add_setting_by_class(self, setting_class):
+        setting = self.find_setting_by_class(setting_class)
+        if setting is None:
+            setting = setting_class()
+            self._settings.append(setting)
+        return setting
+
+    def remove_setting(self, setting):
+        self._settings.remove(setting)
+        return
+
+    def get_all_settings(self):
+        return list(self._settings)
+
+class MoviePipelineMasterConfig(MoviePipelineConfigBase):
+    def __init__(self):
+        super().__init__()
+        # Default configuration of new jobs
+        self._settings = [MoviePipelineDeferredPassBase(), MoviePipelineImageSequenceOutput_JPG(), MoviePipelineOutputSetting()]
+
+class MoviePipelineShotConfig(MoviePipelineConfigBase):
+    pass
+
+class MoviePipelineExecutorShot(Object):
+    def __init__(self, outer_name, inner_name=""):
+        super().__init__(name="MoviePipelineExecutorShot")
+        self.outer_name = outer_name
+        self.inner_name = inner_name
+        self.enabled = True
+        self._shot_override_config = None
+
+    def allocate_new_shot_override_config(self, config_type=MoviePipelineShotConfig):
+        self._shot_override_config = config_type()
+        return self._shot_override_config
+
+    def get_shot_override_configuration(self):
+        return self._shot_override_config
+
+class MoviePipelineExecutorJob(Object):
+    def __init__(self):
+        super().__init__(name="MoviePipelineExecutorJob")
+        self.job_name = ""
+        self.sequence = SoftObjectPath()
+        self.map = SoftObjectPath()
+        self.author = ""
+        self.shot_info = []
+        self._configuration = MoviePipelineMasterConfig()
+
+    def get_configuration(self):
+        return self._configuration
+
+    def set_configuration(self, preset):
+        self._configuration = copy.deepcopy(preset)
+        return
+
+class MoviePipelineQueue(Object):
+    def __init__(self):
+        super().__init__(name="MoviePipelineQueue")
+        self._jobs = []
+
+    def allocate_new_job(self, job_type):
+        recorder.begin_scope("render job", str(len(self._jobs)))
+        job = job_type()
+        self._jobs.append(job)
+        return job
+
+    def get_jobs(self):
+        return list(self._jobs)
+
+    def delete_job(self, job):
+        self._jobs.remove(job)
+        return
+
+    def delete_all_jobs(self):
+        self._jobs = []
+        return
+
+class _Delegate:
+    def __init__(self):
+        self.callables = []
+
+    def add_callable(self, callable):
+        self.callables.append(callable)
+        return
+
+    def add_callable_unique(self, callable):
+        if callable not in self.callables:
+            self.callables.append(callable)
+        return
+
+    def remove_callable(self, callable):
+        self.callables.remove(callable)
+        return
+
+    def broadcast(self, *args):
+        for callable in list(self.callables):
+            callable(*args)
+        return
+
+class MoviePipelineExecutorBase(Object):
+    def __init__(self):
+        super().__init__(name=type(self).__name__)
+        self.on_executor_finished_delegate = _Delegate()
+        self.on_individual_job_finished_delegate = _Delegate()
+
+    def is_rendering(self):
+        return False
+
+class MoviePipelinePIEExecutor(MoviePipelineExecutorBase):
+    pass
+
+class MoviePipelineLinearExecutorBase(MoviePipelineExecutorBase):
+    pass
+
+################################################################################
+# Editor subsystems and function libraries
+################################################################################
+
+class EditorSubsystem(Object):
+    pass
+
+class EditorActorSubsystem(EditorSubsystem):
+    def get_all_level_actors(self):
+        return list(session.actors)
+
+    def get_selected_level_actors(self):
+        return []
+
+    def spawn_actor_from_class(self, actor_class, location, rotation=None, transient=False):
+        if isinstance(actor_class, _Class):
+            if actor_class.python_class is not None:
+                actor = actor_class.python_class()
+            else:
+                actor = Actor(name=actor_class.name, class_name=actor_class.name)
+        else:
+            actor = actor_class()
+        actor._location = location
+        session.add_actor(actor)
+        return actor
+
+    def destroy_actor(self, actor_to_destroy):
+        return session.remove_actor(actor_to_destroy)
+
+class LayersSubsystem(EditorSubsystem):
+    def add_actor_to_layer(self, actor, layer_name):
+        session.layers.setdefault(layer_name, []).append(actor)
+        return True
+
+    def add_all_layer_names_to(self):
+        return list(session.layers.keys())
+
+    def delete_layer(self, layer_to_delete):
+        session.layers.pop(str(layer_to_delete), None)
+        return
+
+class MoviePipelineQueueSubsystem(EditorSubsystem):
+    def get_queue(self):
+        return session.queue
+
+    def render_queue_with_executor(self, executor_type):
+        executor = executor_type()
+        session.executors.append(executor)
+        return executor
+
+class MoviePipelineLibrary(Object):
+    @staticmethod
+    def update_job_shot_list_from_sequence(sequence, job):
+        """
+        Shots of cinematic shot track, otherwise one shot per camera cut with camera binding name as inner name
+        """
+        job.shot_info = [MoviePipelineExecutorShot(section.get_shot_display_name()) for shot_track in sequence.find_master_tracks_by_type(MovieSceneCinematicShotTrack) for section in shot_track.get_sections()]
+        if len(job.shot_info) == 0:
+            job.shot_info = [MoviePipelineExecutorShot(sequence.get_name(), camera_name) for camera_name in _get_camera_cut_names(sequence)]
+        return
+
+class AssetRegistry(Object):
+    def scan_paths_synchronous(self, paths, force_rescan=False, ignore_deny_list_scan_filters=False):
+        return
+
+    def get_assets_by_path(self, package_path, recursive=False, include_only_on_disk_assets=False):
+        package_path = str(package_path).rstrip("/")
+        assets = []
+        for package_name in session.get_package_names():
+            (parent, _) = package_name.rsplit("/", 1)
+            if (parent == package_path) or (recursive and parent.startswith(package_path + "/")):
+                assets.append(AssetData(package_name, session.get_asset_class_name(package_name)))
+        return assets
+
+class AssetTools(Object):
+    def create_asset(self, asset_name, package_path, asset_class, factory, calling_context="None"):
+        package_name = f"{package_path.rstrip('/')}/{asset_name}"
+        asset = asset_class(name=asset_name, package_name=package_name)
+        session.add_asset(package_name, asset)
+        return asset
+
+    def import_asset_tasks(self, import_tasks):
+        for task in import_tasks:
+            recorder.begin_scope("import", str(task.filename))
+            name = task.destination_name if task.destination_name != "" else Path(str(task.filename).replace("\\", "/")).stem
+            package_name = f"{task.destination_path.rstrip('/')}/{name}"
+            asset_class = GeometryCache if str(task.filename).lower().endswith(".abc") else Texture2D
+            session.add_asset(package_name, asset_class(name=name, package_name=package_name))
+            task.imported_object_paths = [f"{package_name}.{name}"]
+        return
+
+class AssetToolsHelpers(Object):
+    @staticmethod
+    def get_asset_tools():
+        return session.asset_tools
+
+class AssetRegistryHelpers(Object):
+    @staticmethod
+    def get_asset_registry():
+        return session.asset_registry
+
+class EditorAssetLibrary(Object):
+    @staticmethod
+    def does_asset_exist(asset_path):
+        return session.asset_exists(asset_path)
+
+    @staticmethod
+    def load_asset(asset_path):
+        return session.load_asset(asset_path)
+
+    @staticmethod
+    def duplicate_asset(source_asset_path, destination_asset_path):
+        source = session.load_asset(source_asset_path)
+        if source is None:
+            return None
+        package_name = get_package_name(destination_asset_path)
+        asset = copy.deepcopy(source)
+        asset._name = package_name.rsplit("/", 1)[-1]
+        asset._package_name = package_name
+        session.add_asset(package_name, asset)
+        return asset
+
+    @staticmethod
+    def delete_asset(asset_path_to_delete):
+        return session.delete_asset(asset_path_to_delete)
+
+    @staticmethod
+    def save_asset(asset_to_save, only_if_is_dirty=True):
+        return session.asset_exists(asset_to_save)
+
+    @staticmethod
+    def save_directory(directory_path, only_if_is_dirty=True, recursive=True):
+        return True
+
+    @staticmethod
+    def list_assets(directory_path, recursive=True, include_folder=False):
+        directory_path = directory_path.rstrip("/") + "/"
+        return [package_name for package_name in session.get_package_names() if package_name.startswith(directory_path) and (recursive or ("/" not in package_name[len(directory_path):]))]
+
+class EditorUtilityLibrary(Object):
+    @staticmethod
+    def get_selected_assets():
+        return [asset for asset in (session.load_asset(path) for path in session.get_selection()) if asset is not None]
+
+class EditorLevelLibrary(Object):
+    @staticmethod
+    def get_editor_world():
+        return session.world
+
+    @staticmethod
+    def get_all_level_actors():
+        return list(session.actors)
+
+class EditorLevelUtils(Object):
+    @staticmethod
+    def get_levels(world):
+        return [Level(world)]
+
+class SystemLibrary(Object):
+    @staticmethod
+    def get_path_name(object):
+        return object.get_path_name()
+
+    @staticmethod
+    def get_engine_version():
+        return ENGINE_VERSION
+
+    @staticmethod
+    def get_outer_object(object):
+        return object.get_outer()
+
+    @staticmethod
+    def conv_soft_obj_path_to_soft_obj_ref(soft_object_path):
+        return soft_object_path
+
+    @staticmethod
+    def collect_garbage():
+        return
+
+class MaterialEditingLibrary(Object):
+    @staticmethod
+    def set_material_instance_parent(instance, new_parent):
+        instance.parent = new_parent
+        return
+
+    @staticmethod
+    def set_material_instance_texture_parameter_value(instance, parameter_name, value, association="GlobalParameter"):
+        return True
+
+    @staticmethod
+    def set_material_instance_scalar_parameter_value(instance, parameter_name, value, association="GlobalParameter"):
+        return True
+
+    @staticmethod
+    def update_material_instance(instance):
+        return
+
+class Paths(Object):
+    @staticmethod
+    def project_log_dir():
+        return session.get_log_dir() + "/"
+
+    @staticmethod
+    def project_dir():
+        return session.get_log_dir() + "/"
+
+    @staticmethod
+    def project_content_dir():
+        return session.get_log_dir() + "/Content/"
+
+    @staticmethod
+    def convert_relative_path_to_full(in_path):
+        return os.path.abspath(in_path).replace("\\", "/") + ("/" if in_path.endswith("/") else "")
+
+    @staticmethod
+    def get_project_file_path():
+        return f"{session.get_log_dir()}/{session.project_name}.uproject"
+
+    @staticmethod
+    def split(in_path):
+        (path, filename) = os.path.split(in_path)
+        (filename, extension) = os.path.splitext(filename)
+        return (path, filename, extension.lstrip("."))
+
+################################################################################
+# Module functions
+################################################################################
+
+@_recorded
+def log(arg):
+    print(f"LogPython: {arg}")
+    return
+
+@_recorded
+def log_warning(arg):
+    session.warnings += 1
+    print(f"LogPython: Warning: {arg}")
+    return
+
+@_recorded
+def log_error(arg):
+    session.errors += 1
+    print(f"LogPython: Error: {arg}")
+    return
+
+@_recorded
+def log_flush():
+    return
+
+@_recorded
+def register_slate_post_tick_callback(callable_object):
+    handle = max(session.tick_callbacks.keys(), default=0) + 1
+    session.tick_callbacks[handle] = callable_object
+    return handle
+
+@_recorded
+def unregister_slate_post_tick_callback(handle):
+    session.tick_callbacks.pop(handle, None)
+    return
+
+@_recorded
+def get_editor_subsystem(subsystem):
+    if subsystem not in session.subsystems:
+        session.subsystems[subsystem] = subsystem(name=subsystem.__name__)
+    return session.subsystems[subsystem]
+
+@_recorded
+def load_object(outer, name, type=None):
+    return session.load_asset(name)
+
+@_recorded
+def load_asset(name, type=None):
+    return session.load_asset(name)
+
+@_recorded
+def load_class(outer, name):
+    package_name = get_package_name(name)
+    if not session.asset_exists(package_name):
+        return None
+    return _Class(name.split(".")[-1].rstrip("'"))
+
+def __getattr__(name):
+    # Classes and functions which are not modeled
+    if name.startswith("_"):
+        raise AttributeError(name)
+    recorder.unmodeled.add(name)
+    stand_in = type(name, (Object,), {})
+    globals()[name] = stand_in
+    return stand_in
+
+################################################################################
+# Dry-run session
+################################################################################
+
+def get_package_name(asset_path):
+    """
+    Package name from object reference: GeometryCache'/Engine/PS/Bedlam/SMPLX/s/b.b' -> /Engine/PS/Bedlam/SMPLX/s/b
+    """
+    asset_path = str(asset_path)
+    if asset_path.endswith("'") and ("'" in asset_path[:-1]):
+        asset_path = asset_path[asset_path.index("'") + 1:-1]
+    return asset_path.split(".")[0]
+
+def _get_class_hint(asset_path):
+    asset_path = str(asset_path)
+    if asset_path.endswith("'") and ("'" in asset_path[:-1]):
+        return asset_path[:asset_path.index("'")]
+    return None
+
+class DryRunSession:
+    """
+    Editor state shared by all scripts of one dry run: assets, level actors, layers, render queue
+      inventory: package names which the asset registry lists, None: only assets created in this session
+      strict: only inventory assets exist, otherwise every asset exists except generated ones (generated_roots)
+      selection: Content Browser selection, all LevelSequences created in this session are selected as well
+    """
+    project_name = "BedlamDryRun"
+    generated_roots = ["/Game/Bedlam/LevelSequences/", "/Game/Bedlam/LS_Template_Frames"]
+
+    def __init__(self, inventory=None, strict=False, selection=[]):
+        self.inventory = inventory
+        self.strict = strict
+        self.selection = list(selection)
+        self.assets = {}
+        self.deleted = set()
+        self.loaded = {}
+        self.layers = {}
+        self.subsystems = {}
+        self.executors = []
+        self.tick_callbacks = {}
+        self.errors = 0
+        self.warnings = 0
+        self.log_dir = None
+        self.max_actors = 0
+
+        self.world = World(name=_level_package_name.rsplit("/", 1)[-1], package_name=_level_package_name)
+        self.queue = MoviePipelineQueue()
+        self.asset_tools = AssetTools(name="AssetTools")
+        self.asset_registry = AssetRegistry(name="AssetRegistry")
+
+        # BEDLAM target level: BE_CineCameraActor_Blueprint attached to BE_CameraRoot, BE_GroundTruthLogger
+        camera_root = Actor(name="BE_CameraRoot")
+        camera_actor = CineCameraActor(name="BE_CineCameraActor_Blueprint")
+        camera_actor._attach_parent = camera_root
+        logger_actor = Actor(name="BE_GroundTruthLogger", class_name="BE_GroundTruthLogger_C")
+        self.actors = [camera_root, camera_actor, logger_actor]
+        self.max_actors = len(self.actors)
+
+    def is_template(self, package_name):
+        name = package_name.rsplit("/", 1)[-1]
+        return name.startswith("LS_Template_HDRI") or name.startswith("LS_Camera_")
+
+    def is_generated(self, package_name):
+        return any(package_name.startswith(root) for root in self.generated_roots)
+
+    def asset_exists(self, asset_path):
+        package_name = get_package_name(asset_path)
+        if package_name in self.assets:
+            return True
+        if (package_name in self.deleted) or self.is_generated(package_name):
+            return False
+        if self.is_template(package_name):
+            return True
+        if not self.strict:
+            return True
+        return (self.inventory is not None) and (package_name in self.inventory)
+
+    def get_package_names(self):
+        package_names = set(self.assets.keys())
+        if self.inventory is not None:
+            package_names.update(package_name for package_name in self.inventory if package_name not in self.deleted)
+        return sorted(package_names)
+
+    def get_asset_class_name(self, package_name):
+        if package_name in self.assets:
+            return self.assets[package_name]._class_name
+        return "Object"
+
+    def add_asset(self, package_name, asset):
+        if isinstance(asset, LevelSequence):
+            recorder.begin_scope("LevelSequence", package_name)
+        self.assets[package_name] = asset
+        self.deleted.discard(package_name)
+        return
+
+    def delete_asset(self, asset_path):
+        package_name = get_package_name(asset_path)
+        if not self.asset_exists(package_name):
+            return False
+        self.assets.pop(package_name, None)
+        self.loaded.pop(package_name, None)
+        self.deleted.add(package_name)
+        return True
+
+    def load_asset(self, asset_path):
+        package_name = get_package_name(asset_path)
+        if package_name in self.assets:
+            return self.assets[package_name]
+        if not self.asset_exists(package_name):
+            return None
+
+        # Existing project and engine content is created on first load
+        if package_name not in self.loaded:
+            name = package_name.rsplit("/", 1)[-1]
+            if self.is_template(package_name):
+                self.loaded[package_name] = _create_template(name, package_name)
+            else:
+                asset_class = globals().get(_get_class_hint(asset_path) or "", Object)
+                if not (isinstance(asset_class, type) and issubclass(asset_class, Object)):
+                    asset_class = Object
+                self.loaded[package_name] = asset_class(name=name, package_name=package_name)
+        return self.loaded[package_name]
+
+    def get_selection(self):
+        created = [package_name for (package_name, asset) in self.assets.items() if isinstance(asset, LevelSequence) and package_name.startswith(self.generated_roots[0])]
+        return self.selection + [package_name for package_name in created if package_name not in self.selection]
+
+    def add_actor(self, actor):
+        self.actors.append(actor)
+        self.max_actors = max(self.max_actors, len(self.actors))
+        return
+
+    def remove_actor(self, actor):
+        if actor not in self.actors:
+            return False
+        self.actors.remove(actor)
+        for actors in self.layers.values():
+            if actor in actors:
+                actors.remove(actor)
+        return True
+
+    def get_log_dir(self):
+        if self.log_dir is None:
+            self.log_dir = tempfile.mkdtemp(prefix="bedlam_dry_run_").replace("\\", "/")
+        return self.log_dir
+
+    def run_executors(self):
+        """
+        Finish started render queues like the editor does after the script returned.
+        Camera ground truth lines are written to the project log for every output frame.
+        """
+        idle_ticks = 0
+        while (len(self.executors) > 0) or (len(self.tick_callbacks) > 0):
+            if len(self.executors) == 0:
+                # Editor ticks until registered tick callbacks start the next render or unregister
+                self._tick()
+                idle_ticks += 1
+                if idle_ticks > MAX_IDLE_TICKS:
+                    log_warning(f"Dry run: tick callbacks still registered after {MAX_IDLE_TICKS} ticks without render")
+                    return
+                continue
+
+            idle_ticks = 0
+            executor = self.executors.pop(0)
+            success = True
+            for job in self.queue.get_jobs():
+                self._tick() # editor ticks during rendering
+                self._write_camera_log(job)
+                executor.on_individual_job_finished_delegate.broadcast(job, True)
+            executor.on_executor_finished_delegate.broadcast(executor, success)
+        return
+
+    def _tick(self):
+        for callback in list(self.tick_callbacks.values()):
+            callback(TICK_DELTA_TIME)
+        return
+
+    def _write_camera_log(self, job):
+        level_sequence = self.assets.get(get_package_name(job.sequence.asset_path_name))
+
+        # Master sequences log frames of each shot, multi-camera sequences log frames of each camera cut.
+        # Each shot has the rendered frame number of its sequence frame 0.
+        shots = [(level_sequence, 0)]
+        if isinstance(level_sequence, LevelSequence):
+            for track in level_sequence._master_tracks:
+                if isinstance(track, MovieSceneCinematicShotTrack):
+                    shots = [(section._sequence, section.get_start_frame() - section._sequence._playback_start) for section in track._sections]
+            shots *= max(1, sum(len(track._sections) for track in level_sequence._master_tracks if isinstance(track, MovieSceneCameraCutTrack)))
+
+        log_path = Path(self.get_log_dir()) / f"{self.project_name}.log"
+        with open(log_path, "a") as f:
+            # Ground truth logger starts with the SequenceName of the first shot
+            f.write(f"LogBlueprintUserMessages: BEDLAM_CAMERA_START:{shots[0][0].get_name()}\n")
+            # Custom playback range of resumed jobs, frames before 0 are warm up frames.
+            # Only every output_frame_step-th frame is written, on rendered frame numbers which are multiples of the step.
+            output_setting = job.get_configuration().find_setting_by_class(MoviePipelineOutputSetting)
+            for (shot_sequence, frame_offset) in shots:
+                num_frames = shot_sequence._playback_end if isinstance(shot_sequence, LevelSequence) else 0
+                frames = range(num_frames)
+                if output_setting.use_custom_playback_range:
+                    frames = range(max(0, output_setting.custom_start_frame), min(num_frames, output_setting.custom_end_frame))
+                for frame in frames:
+                    if (frame + frame_offset) % output_setting.output_frame_step != 0:
+                        continue
+                    f.write(f"LogBlueprintUserMessages: BEDLAM_CAMERA:{frame},0.0,0.0,0.0,0.0,0.0,0.0,35.0,36.0,20.25,54.43\n")
+        return
+
+def _create_template(name, package_name):
+    """
+    Template LevelSequences with the bindings which create_level_sequences_csv.py expects
+    """
+    level_sequence = LevelSequence(name=name, package_name=package_name)
+    if name.startswith("LS_Template_HDRI"):
+        skylight_binding = MovieSceneBindingProxy("Skylight")
+        skylight_binding.add_track(MovieSceneObjectPropertyTrack).add_section()
+        level_sequence._possessables.append(skylight_binding)
+        return level_sequence
+
+    # LS_Camera_*: keyed camera root yaw (Orbit) and focal length (Zoom) from frame 0 to 1
+    camera_binding = MovieSceneBindingProxy("BE_CineCameraActor_Blueprint")
+    component_binding = MovieSceneBindingProxy("CameraComponent")
+    component_binding.set_parent(camera_binding)
+    focal_length_channel = component_binding.add_track(MovieSceneFloatTrack).add_section().get_channels()[0]
+    cameraroot_binding = MovieSceneBindingProxy("BE_CameraRoot")
+    yaw_channel = cameraroot_binding.add_track(MovieScene3DTransformTrack).add_section().get_channels()[5]
+    for (frame, focal_length, yaw) in [(0, 35.0, 0.0), (1, 70.0, 360.0)]:
+        focal_length_channel.add_key(FrameNumber(frame), focal_length)
+        yaw_channel.add_key(FrameNumber(frame), yaw)
+    level_sequence._possessables.extend([camera_binding, component_binding, cameraroot_binding])
+    level_sequence.add_master_track(MovieSceneCameraCutTrack).add_section()
+    return level_sequence
+
+session = DryRunSession()
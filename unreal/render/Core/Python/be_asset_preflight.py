@@ -0,0 +1,193 @@
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Asset preflight check for be_seq.csv files
+#
+# All assets referenced by a sequence definition are validated at once against an in-memory asset inventory
+# before any LevelSequence is created. The inventory is built with one asset registry query per asset root.
+#
+# Usage:
+# + Unreal Editor: used by create_level_sequences_csv.py, or export asset inventory for offline checks:
+#     be_asset_preflight.py export INVENTORYPATH
+# + Offline (no Unreal required):
+#     python be_asset_preflight.py check INPUTCSVPATH INVENTORYPATH
+#
+# Inventory file: one Unreal package name per line (example: /Engine/PS/Bedlam/SMPLX/rp_aaron_posed_002/rp_aaron_posed_002_1000)
+#
+
+import csv
+from dataclasses import dataclass
+import re
+import sys
+
+# Globals
+# Default asset roots, create_level_sequences_csv.py passes its own settings
+data_root_unreal = "/Engine/PS/Bedlam/"
+
+@dataclass
+class AssetRoots:
+    body_root: str = data_root_unreal + "SMPLX/"
+    clothing_root: str = data_root_unreal + "Clothing/"
+    hair_root: str = data_root_unreal + "Hair/CC/Meshes/"
+    animation_root: str = data_root_unreal + "SMPLX_batch01_hand_animations/"
+    hdri_root: str = data_root_unreal + "HDRI/4k/"
+    hdri_suffix: str = ""
+    material_body_root: str = "/Engine/PS/Meshcapade/SMPL/Materials"
+    material_clothing_root: str = data_root_unreal + "Clothing/Materials"
+    texture_body_root: str = "/Engine/PS/Meshcapade/SMPL/MC_texture_skintones"
+    texture_clothing_overlay_root: str = data_root_unreal + "Clothing/MaterialsSMPLX/Textures"
+    material_hidden_name: str = data_root_unreal + "Core/Materials/M_SMPLX_Hidden"
+
+    def get_query_roots(self):
+        """
+        Content folders which contain all referenced assets, one asset registry query each
+        """
+        roots = [self.body_root, self.clothing_root, self.hair_root, self.animation_root, self.hdri_root, self.material_body_root, self.material_clothing_root, self.texture_body_root, self.texture_clothing_overlay_root, self.material_hidden_name.rsplit("/", 1)[0]]
+        roots = [root.rstrip("/") for root in roots]
+
+        # Skip roots which are already covered by a parent root
+        return sorted(root for root in set(roots) if not any(root.startswith(other + "/") for other in roots))
+
+################################################################################
+
+def get_package_name(asset_path):
+    """
+    Package name from object reference: GeometryCache'/Engine/PS/Bedlam/SMPLX/s/b.b' -> /Engine/PS/Bedlam/SMPLX/s/b
+    """
+    match = re.match(r"^\w+'(.+)'$", asset_path)
+    if match:
+        asset_path = match.group(1)
+    return asset_path.split(".")[0]
+
+def parse_comment(comment):
+    return dict(value.split("=") for value in comment.split(";"))
+
+def get_required_assets(csv_rows, roots):
+    """
+    Required asset package names for all sequences, dictionary of package name -> list of (row index, sequence name)
+    """
+    required = {}
+    def add(asset_path, row_index, sequence_name):
+        required.setdefault(get_package_name(asset_path), []).append((row_index, sequence_name))
+
+    sequence_name = None
+    for (row_index, row) in enumerate(csv_rows):
+        if row["Type"] == "Group":
+            group_config = parse_comment(row["Comment"])
+            sequence_name = group_config["sequence_name"]
+            if "hdri" in group_config:
+                add(f"{roots.hdri_root}{group_config['hdri']}{roots.hdri_suffix}", row_index, sequence_name)
+            continue
+
+        if row["Type"] != "Body":
+            continue
+
+        body = row["Body"]
+        body_config = parse_comment(row["Comment"])
+        match = re.search(r"(.+)_(.+)", body)
+        if not match:
+            add(f"(invalid body name) {body}", row_index, sequence_name)
+            continue
+
+        subject = match.group(1)
+        animation_id = match.group(2)
+
+        body_path = f"{roots.body_root}{subject}/{body}"
+        add(body_path, row_index, sequence_name)
+
+        texture_body = body_config.get("texture_body")
+        texture_clothing = body_config.get("texture_clothing")
+        texture_clothing_overlay = body_config.get("texture_clothing_overlay")
+
+        if texture_clothing_overlay is not None:
+            gender = "female" if texture_body.startswith("skin_f") else "male"
+            add(f"{roots.texture_body_root}/{gender}/skin/{texture_body}", row_index, sequence_name)
+            add(f"{roots.texture_clothing_overlay_root}/{texture_clothing_overlay}", row_index, sequence_name)
+        else:
+            if texture_body is not None:
+                add(f"{roots.material_body_root}/MI_{texture_body}", row_index, sequence_name)
+
+        if texture_clothing is not None:
+            clothing_path = body_path.replace(roots.body_root, roots.clothing_root).replace(animation_id, f"{animation_id}_clo")
+            add(clothing_path, row_index, sequence_name)
+            if texture_clothing_overlay is None:
+                add(f"{roots.material_clothing_root}/{subject}/MI_{subject}_{texture_clothing}", row_index, sequence_name)
+
+        if "hair" in body_config:
+            hair_type = body_config["hair"]
+            add(f"{roots.hair_root}{hair_type}/{hair_type}", row_index, sequence_name)
+            add(f"{roots.animation_root}{subject}/{body}_Anim", row_index, sequence_name)
+            add(f"{roots.animation_root}{subject}/{body}", row_index, sequence_name)
+            add(roots.material_hidden_name, row_index, sequence_name)
+
+    return required
+
+def find_missing_assets(csv_rows, inventory, roots):
+    """
+    Validate all sequences against asset inventory (set of package names), returns sorted list of (package name, references)
+    """
+    required = get_required_assets(csv_rows, roots)
+    return sorted((package_name, references) for (package_name, references) in required.items() if package_name not in inventory)
+
+def log_missing_assets(missing, log):
+    for (package_name, references) in missing:
+        sequence_names = sorted(set(sequence_name for (_, sequence_name) in references))
+        log(f"Missing asset: {package_name} (rows: {len(references)}, sequences: {', '.join(sequence_names)})")
+    return
+
+################################################################################
+
+def get_asset_inventory(roots):
+    """
+    Query asset registry once per root after synchronous scan of the roots, requires Unreal Editor
+    """
+    import unreal
+
+    asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+    query_roots = roots.get_query_roots()
+    asset_registry.scan_paths_synchronous(query_roots) # asset registry might still be loading when run from command line, missing assets would abort the run
+
+    inventory = set()
+    for root in query_roots:
+        for asset_data in asset_registry.get_assets_by_path(root, recursive=True):
+            inventory.add(str(asset_data.package_name))
+    return inventory
+
+def load_inventory(inventory_path):
+    with open(inventory_path, "r") as f:
+        return set(line.strip() for line in f if line.strip() != "")
+
+def save_inventory(inventory, inventory_path):
+    with open(inventory_path, "w") as f:
+        for package_name in sorted(inventory):
+            f.write(package_name + "\n")
+    return
+
+def load_csv_rows(csv_path):
+    with open(csv_path, mode="r") as csv_file:
+        return list(csv.DictReader(csv_file))
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) == 3) and (sys.argv[1] == "export"):
+        import unreal
+        inventory = get_asset_inventory(AssetRoots())
+        unreal.log(f"Saving asset inventory ({len(inventory)} assets): {sys.argv[2]}")
+        save_inventory(inventory, sys.argv[2])
+    elif (len(sys.argv) == 4) and (sys.argv[1] == "check"):
+        csv_rows = load_csv_rows(sys.argv[2])
+        inventory = load_inventory(sys.argv[3])
+        missing = find_missing_assets(csv_rows, inventory, AssetRoots())
+        if len(missing) > 0:
+            log_missing_assets(missing, lambda message: print(f"ERROR: {message}", file=sys.stderr))
+            print(f"ERROR: {len(missing)} missing assets", file=sys.stderr)
+            sys.exit(1)
+        print(f"All required assets available ({len(get_required_assets(csv_rows, AssetRoots()))} assets)")
+    else:
+        print(f"Usage: {sys.argv[0]} export INVENTORYPATH", file=sys.stderr)
+        print(f"       {sys.argv[0]} check INPUTCSVPATH INVENTORYPATH", file=sys.stderr)
+        sys.exit(1)
+
+    sys.exit(0)
@@ -0,0 +1,161 @@
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Binary per-sequence camera ground truth (.npz) with precomputed intrinsics and extrinsics
+#
+# Each npz holds the frame indices, the raw camera parameters of the camera ground truth .csv file as float64 arrays
+# and vectorized 3x3 intrinsics and 4x4 world-to-camera matrices in Unreal and OpenCV conventions (see unreal_coordinate_system.md).
+# Training loaders get all cameras of a sequence with a single np.load() instead of recomputing the matrices per frame.
+#
+# Usage:
+# + Unreal Editor: used by render_movie_render_queue.py if NumPy is available in Unreal Python
+# + Offline conversion of existing camera ground truth .csv files (also done by be_post_render_pipeline.sh):
+#     python be_camera_ground_truth.py CAMERA_CSV_DIR [IMAGE_WIDTH IMAGE_HEIGHT]
+#
+# Dependencies:
+# + pip install numpy
+#
+
+import numpy as np
+from pathlib import Path
+import sys
+
+# Globals
+IMAGE_WIDTH = 1280 # Default render resolution of create_movie_render_queue.py
+IMAGE_HEIGHT = 720
+CAMERA_COLUMNS = ["x", "y", "z", "yaw", "pitch", "roll", "focal_length", "sensor_width", "sensor_height", "hfov"]
+
+# Unreal camera axes (X: forward, Y: right, Z: up) to OpenCV camera axes (x: right, y: down, z: forward)
+UNREAL_TO_OPENCV_CAMERA = np.array([[0.0, 1.0, 0.0], [0.0, 0.0, -1.0], [1.0, 0.0, 0.0]])
+
+# OpenCV world coordinates are right-handed Unreal world coordinates in [m]: x = X, y = -Y, z = Z
+OPENCV_TO_UNREAL_WORLD = np.diag([1.0, -1.0, 1.0])
+UNREAL_UNITS_PER_METER = 100.0
+
+################################################################################
+
+def get_rotation_matrices(yaw, pitch, roll):
+    """
+    Unreal rotation matrices for arrays of yaw/pitch/roll angles [deg], shape (..., 3, 3).
+    Rows are the world space directions of the local forward (X), right (Y) and up (Z) axes (FRotationMatrix).
+    """
+    (sy, cy) = (np.sin(np.radians(yaw)), np.cos(np.radians(yaw)))
+    (sp, cp) = (np.sin(np.radians(pitch)), np.cos(np.radians(pitch)))
+    (sr, cr) = (np.sin(np.radians(roll)), np.cos(np.radians(roll)))
+
+    forward = np.stack([cp * cy, cp * sy, sp], axis=-1)
+    right = np.stack([sr * sp * cy - cr * sy, sr * sp * sy + cr * cy, -sr * cp], axis=-1)
+    up = np.stack([-(cr * sp * cy + sr * sy), cy * sr - cr * sp * sy, cr * cp], axis=-1)
+
+    return np.stack([forward, right, up], axis=-2)
+
+def get_transforms(rotations, translations):
+    """
+    4x4 matrices from rotations (n, 3, 3) and translations (n, 3)
+    """
+    transforms = np.zeros((len(rotations), 4, 4))
+    transforms[:, :3, :3] = rotations
+    transforms[:, :3, 3] = translations
+    transforms[:, 3, 3] = 1.0
+    return transforms
+
+def get_camera_matrices(values, image_width=IMAGE_WIDTH, image_height=IMAGE_HEIGHT):
+    """
+    Intrinsics and world-to-camera matrices for all frames, values: dictionary of CAMERA_COLUMNS float64 arrays
+      intrinsics_opencv: [pixel], square pixels (fy = fx), principal point at image center, applied to OpenCV camera coordinates
+      intrinsics_unreal: same projection applied to Unreal camera coordinates, K_unreal = K_opencv * UNREAL_TO_OPENCV_CAMERA
+      world_to_camera_unreal: Unreal world [cm] to Unreal camera coordinates [cm]
+      world_to_camera_opencv: OpenCV world [m] to OpenCV camera coordinates [m]
+    """
+    num_frames = len(values["x"])
+
+    # Unreal renders square pixels, the horizontal field of view (sensor width) defines the focal length in both axes
+    focal_length_pixel = values["focal_length"] / values["sensor_width"] * image_width
+    intrinsics_opencv = np.zeros((num_frames, 3, 3))
+    intrinsics_opencv[:, 0, 0] = focal_length_pixel
+    intrinsics_opencv[:, 1, 1] = focal_length_pixel
+    intrinsics_opencv[:, 0, 2] = image_width / 2.0
+    intrinsics_opencv[:, 1, 2] = image_height / 2.0
+    intrinsics_opencv[:, 2, 2] = 1.0
+    intrinsics_unreal = intrinsics_opencv @ UNREAL_TO_OPENCV_CAMERA
+
+    rotations = get_rotation_matrices(values["yaw"], values["pitch"], values["roll"])
+    locations = np.stack([values["x"], values["y"], values["z"]], axis=-1)
+    translations = -np.einsum("nij,nj->ni", rotations, locations)
+    world_to_camera_unreal = get_transforms(rotations, translations)
+
+    rotations_opencv = UNREAL_TO_OPENCV_CAMERA @ rotations @ OPENCV_TO_UNREAL_WORLD
+    translations_opencv = (translations @ UNREAL_TO_OPENCV_CAMERA.T) / UNREAL_UNITS_PER_METER
+    world_to_camera_opencv = get_transforms(rotations_opencv, translations_opencv)
+
+    return { "intrinsics_unreal": intrinsics_unreal, "intrinsics_opencv": intrinsics_opencv, "world_to_camera_unreal": world_to_camera_unreal, "world_to_camera_opencv": world_to_camera_opencv }
+
+def save_camera_npz(npz_path, frames, rows, image_width=IMAGE_WIDTH, image_height=IMAGE_HEIGHT):
+    """
+    frames: frame index per row, rows: CAMERA_COLUMNS values per row
+    """
+    values = np.array(rows, dtype=np.float64).reshape(-1, len(CAMERA_COLUMNS))
+    arrays = { name: values[:, column_index] for (column_index, name) in enumerate(CAMERA_COLUMNS) }
+    arrays.update(get_camera_matrices(arrays, image_width, image_height))
+
+    # Write to temporary file first so that readers never see incomplete files
+    npz_path = Path(npz_path)
+    npz_path_tmp = npz_path.with_name(npz_path.stem + ".tmp.npz")
+    np.savez(npz_path_tmp, frames=np.array(frames, dtype=np.int64), image_size=np.array([image_width, image_height], dtype=np.int64), **arrays)
+    npz_path_tmp.replace(npz_path)
+    return
+
+def load_camera_npz(npz_path):
+    """
+    All camera arrays of a sequence as dictionary
+    """
+    with np.load(npz_path) as data:
+        return { name: data[name] for name in data.files }
+
+def convert_camera_csv(csv_path, image_width=IMAGE_WIDTH, image_height=IMAGE_HEIGHT):
+    """
+    Convert camera ground truth .csv file (name,x,y,z,yaw,pitch,roll,focal_length,sensor_width,sensor_height,hfov) to .npz
+    """
+    with open(csv_path, "r") as f:
+        lines = f.read().splitlines()[1:]
+
+    frames = []
+    rows = []
+    for line in lines:
+        items = line.split(",")
+        # Image name: seq_000000_0000.png
+        frames.append(int(items[0].rsplit("_", 1)[-1].split(".")[0]))
+        rows.append([float(item) for item in items[1:]])
+
+    save_camera_npz(Path(csv_path).with_suffix(".npz"), frames, rows, image_width, image_height)
+    return len(frames)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) != 2) and (len(sys.argv) != 4):
+        print(f"Usage: {sys.argv[0]} CAMERA_CSV_DIR [IMAGE_WIDTH IMAGE_HEIGHT]", file=sys.stderr)
+        sys.exit(1)
+
+    camera_csv_dir = Path(sys.argv[1])
+    image_width = IMAGE_WIDTH
+    image_height = IMAGE_HEIGHT
+    if len(sys.argv) == 4:
+        image_width = int(sys.argv[2])
+        image_height = int(sys.argv[3])
+
+    # Only convert .csv files without up-to-date .npz file
+    converted = 0
+    csv_paths = sorted(camera_csv_dir.glob("*_camera.csv"))
+    for csv_path in csv_paths:
+        npz_path = csv_path.with_suffix(".npz")
+        if npz_path.exists() and (npz_path.stat().st_mtime >= csv_path.stat().st_mtime):
+            continue
+
+        frames = convert_camera_csv(csv_path, image_width, image_height)
+        print(f"Saving camera ground truth ({frames} frames): {npz_path}")
+        converted += 1
+
+    print(f"Converted: {converted}, up-to-date: {len(csv_paths) - converted}")
+    sys.exit(0)
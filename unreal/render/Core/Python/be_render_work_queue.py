@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Shared render work queue for multiple render nodes, only needs a directory which all nodes can access (network drive)
+#
+# Queue directory layout, one empty or small file per LevelSequence name:
+# + pending/: not rendered yet
+# + claimed/: currently rendered, file content is the name of the render node which holds the lease
+# + done/: rendered successfully
+# + failed/: render failed, move back to pending/ to retry
+# + nodes/: one file per render node, touched to read the current file modification time
+#
+# Claiming a sequence is an atomic rename from pending/ to claimed/, only one node can win the rename.
+# The claiming node renews its lease by touching the claimed file (heartbeat). Claims whose file was not touched
+# within the lease time belong to crashed or hung nodes and are moved back to pending/ by the next node which claims work.
+# Reclaiming first renames the stale claim to claimed/NAME.reclaim.NODE so that only one node reclaims it, then checks its
+# modification time and owner again and restores the claim if it was renewed or claimed again before the rename.
+# Reclaims of nodes which crashed between the renames are moved to pending/ once their node file is older than the lease time.
+# Heartbeats and lease checks both use the modification time of touched files, render node clocks need to be synchronized
+# within a small fraction of the lease time if the file server uses the client time.
+# Sequences are rendered at least once: a node which lost its lease by missing heartbeats finishes its render, but cannot
+# mark the sequence as done anymore and the sequence is rendered again by the node which claims it next.
+#
+# Usage:
+#   be_render_work_queue.py add QUEUE_DIR INPUTCSVPATH|NAME_LIST_FILE
+#   be_render_work_queue.py status QUEUE_DIR
+#   be_render_work_queue.py retry QUEUE_DIR
+#
+# Unreal render nodes process the queue with render_work_queue.py
+#
+
+import csv
+import os
+from pathlib import Path
+import socket
+import sys
+
+# Globals
+LEASE_TIME = 600.0 # [s], claims without heartbeat for this time are reclaimed
+STATES = ["pending", "claimed", "done", "failed"]
+RECLAIM_SEPARATOR = ".reclaim." # claimed/NAME.reclaim.NODE: stale claim which is checked by reclaiming node
+
+################################################################################
+
+class WorkQueue:
+    def __init__(self, queue_dir, node_name=None, lease_time=LEASE_TIME):
+        self.queue_dir = Path(queue_dir)
+        self.node_name = node_name if node_name is not None else f"{socket.gethostname()}_{os.getpid()}"
+        self.lease_time = lease_time
+        for state in STATES + ["nodes"]:
+            (self.queue_dir / state).mkdir(parents=True, exist_ok=True)
+
+    def get_path(self, state, name):
+        return self.queue_dir / state / name
+
+    def get_names(self, state):
+        return sorted(entry.name for entry in os.scandir(self.queue_dir / state) if entry.is_file() and (RECLAIM_SEPARATOR not in entry.name))
+
+    def get_reclaims(self):
+        """
+        Claims which are being reclaimed, list of (sequence name, reclaiming node name)
+        """
+        return [tuple(entry.name.split(RECLAIM_SEPARATOR, 1)) for entry in os.scandir(self.queue_dir / "claimed") if entry.is_file() and (RECLAIM_SEPARATOR in entry.name)]
+
+    def get_time(self):
+        """
+        Current time in the same clock as the heartbeats, modification time of touched node file
+        """
+        node_path = self.queue_dir / "nodes" / self.node_name
+        node_path.touch()
+        return node_path.stat().st_mtime
+
+    def add(self, names):
+        """
+        Add sequences which are not in the queue yet, returns number of added sequences
+        """
+        existing = set(name for (name, _) in self.get_reclaims())
+        for state in STATES:
+            existing.update(self.get_names(state))
+
+        added = 0
+        for name in names:
+            if name not in existing:
+                self.get_path("pending", name).touch()
+                existing.add(name)
+                added += 1
+        return added
+
+    def reclaim_stale(self):
+        """
+        Move claims without heartbeat within lease time back to pending, returns reclaimed sequence names
+        """
+        now = self.get_time()
+        reclaimed = [name for name in self.get_names("claimed") if self.reclaim(name, now)]
+
+        # Reclaims of nodes which crashed between the renames, node files are touched right before reclaiming
+        for (name, node_name) in self.get_reclaims():
+            try:
+                if (now - (self.queue_dir / "nodes" / node_name).stat().st_mtime) < self.lease_time:
+                    continue
+                os.rename(self.get_path("claimed", name + RECLAIM_SEPARATOR + node_name), self.get_path("pending", name))
+                reclaimed.append(name)
+            except OSError:
+                continue # moved by other node
+        return reclaimed
+
+    def reclaim(self, name, now):
+        """
+        Move claim without heartbeat within lease time back to pending, False if claim is active or was reclaimed by other node
+        """
+        claimed_path = self.get_path("claimed", name)
+        reclaim_path = self.get_path("claimed", name + RECLAIM_SEPARATOR + self.node_name)
+        try:
+            if (now - claimed_path.stat().st_mtime) < self.lease_time:
+                return False
+            owner = claimed_path.read_text()
+            os.rename(claimed_path, reclaim_path)
+        except OSError:
+            return False # heartbeat, completion or reclaim by other node in the meantime
+
+        # Only this node has the renamed claim, check again for heartbeat or new claim before the rename
+        try:
+            if ((now - reclaim_path.stat().st_mtime) < self.lease_time) or (reclaim_path.read_text() != owner):
+                os.rename(reclaim_path, claimed_path)
+                return False
+            os.rename(reclaim_path, self.get_path("pending", name))
+        except OSError:
+            return False
+        return True
+
+    def claim(self):
+        """
+        Claim next pending sequence, None if queue is empty
+        """
+        self.reclaim_stale()
+        for name in self.get_names("pending"):
+            pending_path = self.get_path("pending", name)
+            claimed_path = self.get_path("claimed", name)
+            try:
+                # Renamed files keep their modification time, touch first so that claim is not stale
+                os.utime(pending_path)
+                os.rename(pending_path, claimed_path)
+            except OSError:
+                continue # claimed by other node
+
+            with open(claimed_path, "w") as f:
+                f.write(self.node_name)
+            return name
+        return None
+
+    def is_owner(self, name):
+        try:
+            with open(self.get_path("claimed", name), "r") as f:
+                return f.read() == self.node_name
+        except OSError:
+            return False
+
+    def heartbeat(self, name):
+        """
+        Renew lease, False if lease was lost (reclaimed after lease time)
+        """
+        if not self.is_owner(name):
+            return False
+        try:
+            os.utime(self.get_path("claimed", name))
+        except OSError:
+            return False
+        return True
+
+    def finish(self, name, success):
+        """
+        Move claimed sequence to done or failed, False if lease was lost
+        """
+        if not self.is_owner(name):
+            return False
+        try:
+            os.rename(self.get_path("claimed", name), self.get_path("done" if success else "failed", name))
+        except OSError:
+            return False
+        return True
+
+    def retry_failed(self):
+        names = self.get_names("failed")
+        for name in names:
+            os.rename(self.get_path("failed", name), self.get_path("pending", name))
+        return names
+
+    def get_status(self):
+        return { state: len(self.get_names(state)) for state in STATES }
+
+################################################################################
+
+def load_sequence_names(path):
+    """
+    Sequence names of be_seq.csv Group rows or of text file with one name per line
+    """
+    if Path(path).suffix == ".csv":
+        with open(path, mode="r") as csv_file:
+            return [dict(value.split("=") for value in row["Comment"].split(";"))["sequence_name"] for row in csv.DictReader(csv_file) if row["Type"] == "Group"]
+
+    with open(path, "r") as f:
+        return [line.strip() for line in f if line.strip() != ""]
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) == 4) and (sys.argv[1] == "add"):
+        work_queue = WorkQueue(sys.argv[2])
+        names = load_sequence_names(sys.argv[3])
+        added = work_queue.add(names)
+        print(f"Added {added} of {len(names)} sequences: {work_queue.get_status()}")
+        sys.exit(0)
+
+    if (len(sys.argv) == 3) and (sys.argv[1] == "status"):
+        work_queue = WorkQueue(sys.argv[2])
+        print(work_queue.get_status())
+        now = work_queue.get_time()
+        for name in work_queue.get_names("claimed"):
+            claimed_path = work_queue.get_path("claimed", name)
+            print(f"  Claimed: {name}, node: {claimed_path.read_text()}, last heartbeat: {now - claimed_path.stat().st_mtime:.0f}s")
+        for (name, node_name) in work_queue.get_reclaims():
+            print(f"  Reclaiming: {name}, node: {node_name}")
+        sys.exit(0)
+
+    if (len(sys.argv) == 3) and (sys.argv[1] == "retry"):
+        work_queue = WorkQueue(sys.argv[2])
+        names = work_queue.retry_failed()
+        print(f"Moved {len(names)} failed sequences back to pending: {work_queue.get_status()}")
+        sys.exit(0)
+
+    print(f"Usage: {sys.argv[0]} add QUEUE_DIR INPUTCSVPATH|NAME_LIST_FILE", file=sys.stderr)
+    print(f"       {sys.argv[0]} status QUEUE_DIR", file=sys.stderr)
+    print(f"       {sys.argv[0]} retry QUEUE_DIR", file=sys.stderr)
+    sys.exit(1)
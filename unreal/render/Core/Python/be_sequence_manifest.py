@@ -0,0 +1,170 @@
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Fingerprint manifest for incremental LevelSequence generation
+#
+# The manifest (.json) stores one fingerprint per generated LevelSequence. A fingerprint covers the sequence rows of the
+# be_seq.csv file (Group, Camera, View, Body), the used LevelSequence template, the camera movement and the generator script version.
+# Unchanged sequences with existing LevelSequence asset are skipped on rerun.
+# Each generation run also writes a report with rebuilt, skipped and failed sequences.
+#
+# A progress ledger (_levelsequences_progress.json) is written during generation and removed when the run finished.
+# It lists the completed sequences and the sequence which is currently being built. A rerun after an editor crash
+# resumes at the first unfinished sequence and removes the half-built LevelSequence of the interrupted run.
+#
+# Multi-camera LevelSequences get a camera views sidecar (seq_000000.views.json) next to their .uasset file in the Content
+# folder, so that the asset registry mode of create_movie_render_queue.py only loads these sequences for their camera views.
+#
+
+import glob
+import hashlib
+import json
+import os
+
+# Globals
+MANIFEST_VERSION = 1
+CAMERA_VIEWS_SUFFIX = ".views.json"
+
+################################################################################
+
+def get_script_version(script_paths):
+    """
+    Hash of generator script sources, any code change invalidates all fingerprints
+    """
+    script_hash = hashlib.sha256()
+    for script_path in script_paths:
+        with open(script_path, "rb") as f:
+            script_hash.update(f.read())
+    return script_hash.hexdigest()
+
+def get_sequence_fingerprint(sequence_rows, template, camera_movement, script_version):
+    """
+    sequence_rows: csv.DictReader rows of one sequence, Index column is ignored so that edits of other sequences do not change the fingerprint
+    """
+    rows = [[value for (key, value) in row.items() if key != "Index"] for row in sequence_rows]
+    data = json.dumps([rows, template, camera_movement, script_version])
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+def get_shard_name(shard_index, num_shards):
+    return f"shard{shard_index:03}of{num_shards:03}"
+
+def get_manifest_path(csv_path, shard_name=None):
+    """
+    Manifest next to csv file, sharded runs (create_level_sequences_csv_batch.py) write one manifest per shard
+    """
+    base_path = os.path.splitext(csv_path)[0] + "_levelsequences"
+    if shard_name is not None:
+        return f"{base_path}.{shard_name}.json"
+    return base_path + ".json"
+
+def get_shard_manifest_paths(csv_path):
+    return glob.glob(glob.escape(os.path.splitext(csv_path)[0] + "_levelsequences") + ".*.json")
+
+def get_report_path(csv_path, shard_name=None):
+    base_path = os.path.splitext(csv_path)[0] + "_levelsequences_report"
+    if shard_name is not None:
+        return f"{base_path}.{shard_name}.json"
+    return base_path + ".json"
+
+def get_progress_path(csv_path, shard_name=None):
+    base_path = os.path.splitext(csv_path)[0] + "_levelsequences_progress"
+    if shard_name is not None:
+        return f"{base_path}.{shard_name}.json"
+    return base_path + ".json"
+
+def get_run_id(csv_path, shard_name, camera_movement, script_version):
+    """
+    Identifies generation runs which can resume each other: same csv file contents, shard, camera movement and generator script
+    """
+    run_hash = hashlib.sha256()
+    with open(csv_path, "rb") as f:
+        run_hash.update(f.read())
+    run_hash.update(json.dumps([shard_name, camera_movement, script_version]).encode("utf-8"))
+    return run_hash.hexdigest()
+
+def load_progress(progress_path, run_id):
+    """
+    Progress of interrupted run with same run id: (completed sequence names, sequence name in progress or None)
+    """
+    if not os.path.exists(progress_path):
+        return ([], None)
+
+    with open(progress_path, "r") as f:
+        progress = json.load(f)
+
+    if (progress.get("version") != MANIFEST_VERSION) or (progress.get("run_id") != run_id):
+        return ([], None)
+    return (progress["completed"], progress["in_progress"])
+
+def save_progress(progress_path, run_id, completed, in_progress=None):
+    save_json(progress_path, { "version": MANIFEST_VERSION, "run_id": run_id, "completed": completed, "in_progress": in_progress })
+    return
+
+def read_manifest(manifest_path):
+    with open(manifest_path, "r") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["sequences"]
+
+def load_manifest(csv_path):
+    """
+    Fingerprints from main manifest and from shard manifests which were not merged yet, newer files take precedence
+    """
+    fingerprints = {}
+    manifest_paths = [path for path in [get_manifest_path(csv_path)] + get_shard_manifest_paths(csv_path) if os.path.exists(path)]
+    for manifest_path in sorted(manifest_paths, key=os.path.getmtime):
+        fingerprints.update(read_manifest(manifest_path))
+    return fingerprints
+
+def save_manifest(manifest_path, fingerprints):
+    save_json(manifest_path, { "version": MANIFEST_VERSION, "sequences": fingerprints })
+    return
+
+def merge_manifests(csv_path):
+    """
+    Merge shard manifests into main manifest and remove them
+    """
+    fingerprints = load_manifest(csv_path)
+    save_manifest(get_manifest_path(csv_path), fingerprints)
+    for manifest_path in get_shard_manifest_paths(csv_path):
+        os.remove(manifest_path)
+    return fingerprints
+
+def save_json(path, data):
+    # Write to temporary file first so that an interrupted run never leaves a broken file
+    path_tmp = path + ".tmp"
+    with open(path_tmp, "w") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(path_tmp, path)
+    return
+
+def get_content_folder(content_dir, package_path):
+    """
+    Folder of package path in project Content folder: /Game/Bedlam/LevelSequences/ -> CONTENT_DIR/Bedlam/LevelSequences
+    """
+    return os.path.join(content_dir, *[name for name in package_path.split("/")[2:] if name != ""])
+
+def get_camera_views_path(content_dir, package_path, sequence_name):
+    return os.path.join(get_content_folder(content_dir, package_path), sequence_name + CAMERA_VIEWS_SUFFIX)
+
+def save_camera_views(camera_views_path, views):
+    """
+    Camera view names of multi-camera LevelSequence, no sidecar for single camera LevelSequence
+    """
+    if len(views) > 0:
+        os.makedirs(os.path.dirname(camera_views_path), exist_ok=True)
+        save_json(camera_views_path, views)
+    elif os.path.exists(camera_views_path):
+        os.remove(camera_views_path)
+    return
+
+def find_camera_view_sequences(content_dir, package_path):
+    """
+    Names of multi-camera LevelSequences below package path
+    """
+    names = set()
+    for (_, _, file_names) in os.walk(get_content_folder(content_dir, package_path)):
+        names.update(file_name[:-len(CAMERA_VIEWS_SUFFIX)] for file_name in file_names if file_name.endswith(CAMERA_VIEWS_SUFFIX))
+    return names
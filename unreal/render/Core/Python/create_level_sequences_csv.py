@@ -9,11 +9,15 @@
 import csv
 from dataclasses import dataclass
 import re
-from math import radians, tan
+from math import ceil, radians, tan
+import os
 import sys
 import time
 import unreal
 
+from be_asset_preflight import AssetRoots, find_missing_assets, get_asset_inventory, log_missing_assets
+from be_sequence_manifest import get_camera_views_path, get_manifest_path, get_progress_path, get_report_path, get_run_id, get_script_version, get_sequence_fingerprint, get_shard_name, load_manifest, load_progress, save_camera_views, save_json, save_manifest, save_progress
+
 # Globals
 WARMUP_FRAMES = 10 # Needed for proper temporal sampling on frame 0 of animations and raytracing warmup. These frames are rendered out with negative numbers and will be deleted in post render pipeline.
 data_root_unreal = "/Engine/PS/Bedlam/"
@@ -36,7 +40,12 @@ bedlam_root = "/Game/Bedlam/"
 level_sequence_hdri_template = bedlam_root + "LS_Template_HDRI"
 level_sequences_root = bedlam_root + "LevelSequences/"
 camera_root = bedlam_root + "CameraMovement/"
+level_sequence_frames_template = bedlam_root + "LS_Template_Frames" # Generated, ground truth logger Frame keys which are shared by all sequences created from scratch
+source_frames_templates = {} # HDRI or camera movement template path -> generated copy with ground truth logger Frame keys, created once per run
 csv_path = r"C:\bedlam\images\test\be_seq.csv"
+FORCE_REBUILD = False # Rebuild all LevelSequences even if their fingerprint in the manifest did not change
+GARBAGE_COLLECTION_INTERVAL = 10 # [sequences], editor does not collect garbage while the script runs, destroyed template actors stay in memory until then
+CAMERA_VIEW_PREFIX = "view" # Camera binding names of multi-camera sequences (view00, view01, ...), create_movie_render_queue.py renders them as separate shots
 
 ################################################################################
 
@@ -67,6 +76,176 @@ class CameraPose:
     pitch: float
     roll: float
 
+@dataclass
+class CameraKey:
+    frame: int
+    pose: CameraPose
+    hfov: float
+
+@dataclass
+class CameraView:
+    index: int
+    pose: CameraPose
+    hfov: float
+
+class AssetCache:
+    """
+    Per-run cache for loaded assets. The same materials, meshes and animations are referenced by many bodies.
+    Failed loads are not cached. Call invalidate() when assets are changed, deleted or reimported during a run.
+    """
+    def __init__(self):
+        self.assets = {}
+        self.load_times = {}
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+        self.reset_statistics()
+
+    def get(self, loader_name, path, loader):
+        key = (loader_name, path)
+        if key in self.assets:
+            self.hits += 1
+            self.sequence_hits += 1
+            self.time_saved += self.load_times[key]
+            self.sequence_time_saved += self.load_times[key]
+            return self.assets[key]
+
+        start_time = time.perf_counter()
+        asset = loader()
+        self.misses += 1
+        self.sequence_misses += 1
+        if asset is not None:
+            self.assets[key] = asset
+            self.load_times[key] = time.perf_counter() - start_time
+        return asset
+
+    def load_object(self, path):
+        return self.get("load_object", path, lambda: unreal.load_object(None, path))
+
+    def load_asset(self, path):
+        return self.get("load_asset", path, lambda: unreal.load_asset(path))
+
+    def load_editor_asset(self, path):
+        return self.get("editor_load_asset", path, lambda: unreal.EditorAssetLibrary.load_asset(path))
+
+    def load_class(self, path):
+        return self.get("load_class", path, lambda: unreal.load_class(None, path))
+
+    def invalidate(self, path=None):
+        """
+        Remove all cached assets or only the ones loaded from given path
+        """
+        keys = [key for key in self.assets if (path is None) or (key[1] == path)]
+        for key in keys:
+            del self.assets[key]
+            del self.load_times[key]
+        return
+
+    def reset_statistics(self):
+        self.sequence_hits = 0
+        self.sequence_misses = 0
+        self.sequence_time_saved = 0.0
+        return
+
+    def log_statistics(self, label, hits, misses, time_saved):
+        requests = hits + misses
+        hit_rate = (100.0 * hits / requests) if requests > 0 else 0.0
+        unreal.log(f"  {label}: {requests} requests, hit rate: {hit_rate:.1f}%, cached assets: {len(self.assets)}, time saved: {time_saved:.2f}s")
+        return
+
+asset_cache = AssetCache()
+
+class TemplateActors:
+    """
+    Temporary template actors which are spawned into the level and converted to spawnables with add_spawnable_from_instance().
+    Actors are destroyed right after binding, destroy_all() removes leftovers of failed sequences so that the level actor count stays constant.
+    Template actors are not reused since level actor state (layers, materials) is copied into the spawnables.
+    """
+    def __init__(self):
+        self.actors = []
+        self.spawned = 0
+        self.leftovers = 0
+
+    def spawn(self, actor_class):
+        actor = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).spawn_actor_from_class(actor_class, unreal.Vector(0,0,0))
+        self.actors.append(actor)
+        self.spawned += 1
+        return actor
+
+    def destroy(self, actor):
+        self.actors.remove(actor)
+        unreal.get_editor_subsystem(unreal.EditorActorSubsystem).destroy_actor(actor)
+        return
+
+    def destroy_all(self):
+        self.leftovers += len(self.actors)
+        for actor in list(self.actors):
+            self.destroy(actor)
+        return
+
+template_actors = TemplateActors()
+
+class LayerRegistry:
+    """
+    Layers for segmentation mask naming (be_actor_XX_body/clothing/hair, see exr_save_depth_masks.py).
+    Layer names repeat between sequences, each layer is created once per run and only repopulated afterwards.
+    Template actors leave their layer when they are destroyed, the spawnables keep the layer name.
+    """
+    prefix = "be_actor"
+
+    def __init__(self):
+        self.layer_subsystem = None
+        self.layers = set()
+
+    def begin(self):
+        """
+        Adopt layers left by interrupted runs so that they are removed at the end of this run
+        """
+        self.layer_subsystem = unreal.get_editor_subsystem(unreal.LayersSubsystem)
+        self.layers = set(str(layer_name) for layer_name in self.layer_subsystem.add_all_layer_names_to() if str(layer_name).startswith(self.prefix))
+        return
+
+    def add_actor(self, actor, sequence_body_index, layer_suffix):
+        layer_name = f"{self.prefix}_{sequence_body_index:02}_{layer_suffix}"
+        self.layer_subsystem.add_actor_to_layer(actor, layer_name) # Creates layer on first use
+        self.layers.add(layer_name)
+        return
+
+    def delete_all(self):
+        for layer_name in sorted(self.layers):
+            self.layer_subsystem.delete_layer(layer_name)
+        self.layers = set()
+        return
+
+layer_registry = LayerRegistry()
+
+def get_process_memory():
+    """
+    Resident memory of editor process [MB], None if not available
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD), ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t), ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t), ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        ctypes.windll.psapi.GetProcessMemoryInfo.argtypes = [wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD]
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+            return None
+        return counters.WorkingSetSize / 2**20
+
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return None
+
 ################################################################################
 
 def add_geometry_cache(level_sequence, sequence_body_index, layer_suffix, start_frame, end_frame, target_object, x, y, z, yaw, pitch, roll, material=None, texture_body_path=None, texture_clothing_overlay_path=None):
@@ -88,12 +267,12 @@ def add_geometry_cache(level_sequence, sequence_body_index, layer_suffix, start_
 
     if texture_clothing_overlay_path is not None:
         # Use SMPL-X clothing overlay texture, dynamic material instance will be generated in BE_ClothingOverlayActor Construction Script
-        clothing_actor_class = unreal.load_class(None, clothing_actor_class_path)
-        geometry_cache_actor = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).spawn_actor_from_class(clothing_actor_class, unreal.Vector(0,0,0))
+        clothing_actor_class = asset_cache.load_class(clothing_actor_class_path)
+        geometry_cache_actor = template_actors.spawn(clothing_actor_class)
         geometry_cache_actor.set_editor_property("bodytexture", unreal.SystemLibrary.conv_soft_obj_path_to_soft_obj_ref(unreal.SoftObjectPath(texture_body_path)))
         geometry_cache_actor.set_editor_property("clothingtextureoverlay", unreal.SystemLibrary.conv_soft_obj_path_to_soft_obj_ref(unreal.SoftObjectPath(texture_clothing_overlay_path)))
     else:
-        geometry_cache_actor = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).spawn_actor_from_class(unreal.GeometryCacheActor, unreal.Vector(0,0,0))
+        geometry_cache_actor = template_actors.spawn(unreal.GeometryCacheActor)
         if material is not None:
             geometry_cache_actor.get_geometry_cache_component().set_material(0, material)
 
@@ -105,12 +284,11 @@ def add_geometry_cache(level_sequence, sequence_body_index, layer_suffix, start_
 
     # Add actor to new layer so that we can later use layer name when generating segmentation masks names.
     # Note: We cannot use ObjectIds of type "Actor" since actors which are added via add_spawnable_from_instance() will later use their class names when generating ObjectIds of type Actor.
-    layer_subsystem = unreal.get_editor_subsystem(unreal.LayersSubsystem)
-    layer_subsystem.add_actor_to_layer(geometry_cache_actor, f"be_actor_{sequence_body_index:02}_{layer_suffix}")
+    layer_registry.add_actor(geometry_cache_actor, sequence_body_index, layer_suffix)
 
 
     body_binding = level_sequence.add_spawnable_from_instance(geometry_cache_actor)
-    unreal.get_editor_subsystem(unreal.EditorActorSubsystem).destroy_actor(geometry_cache_actor) # Delete temporary template actor from level
+    template_actors.destroy(geometry_cache_actor) # Delete temporary template actor from level
 
     geometry_cache_track = body_binding.add_track(unreal.MovieSceneGeometryCacheTrack)
     geometry_cache_section = geometry_cache_track.add_section()
@@ -143,13 +321,13 @@ def add_hair(level_sequence, sequence_body_index, layer_suffix, start_frame, end
     """
 
     unreal.log(f"    Loading static hair mesh: {hair_path}")
-    hair_object = unreal.load_object(None, hair_path)
+    hair_object = asset_cache.load_object(hair_path)
     if hair_object is None:
         unreal.log_error("      Cannot load mesh")
         return False
 
     unreal.log(f"    Loading animation sequence: {animation_path}")
-    animsequence_object = unreal.load_asset(animation_path)
+    animsequence_object = asset_cache.load_asset(animation_path)
     if animsequence_object is None:
         unreal.log_error("      Cannot load animation sequence")
         return False
@@ -160,22 +338,22 @@ def add_hair(level_sequence, sequence_body_index, layer_suffix, start_frame, end
     animation_path_root = animation_path.replace(animation_path_name, "")
     skeletal_mesh_path = animation_path_root + animation_path_name.replace("_Anim", "")
     unreal.log(f"    Loading skeletal mesh: {skeletal_mesh_path}")
-    skeletal_mesh_object = unreal.load_asset(skeletal_mesh_path)
+    skeletal_mesh_object = asset_cache.load_asset(skeletal_mesh_path)
     if skeletal_mesh_object is None:
         unreal.log_error("      Cannot load skeletal mesh")
         return False
 
-    skeletal_mesh_actor = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).spawn_actor_from_class(unreal.SkeletalMeshActor, unreal.Vector(0,0,0))
+    skeletal_mesh_actor = template_actors.spawn(unreal.SkeletalMeshActor)
     skeletal_mesh_actor.set_actor_label(animsequence_object.get_name())
     skeletal_mesh_actor.skeletal_mesh_component.set_skeletal_mesh(skeletal_mesh_object)
 
     # Set hidden material to hide the skeletal mesh
-    material = unreal.EditorAssetLibrary.load_asset(f"Material'{material_hidden_name}'")
+    material = asset_cache.load_editor_asset(f"Material'{material_hidden_name}'")
     if not material:
         unreal.log_error('Cannot load hidden material: ' + material_hidden_name)
     skeletal_mesh_actor.skeletal_mesh_component.set_material(0, material)
 
-    hair_actor = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).spawn_actor_from_class(unreal.StaticMeshActor, unreal.Vector(0,0,0))
+    hair_actor = template_actors.spawn(unreal.StaticMeshActor)
     hair_actor.set_actor_label(hair_object.get_name())
     hair_actor.set_mobility(unreal.ComponentMobility.MOVABLE)
 
@@ -183,15 +361,14 @@ def add_hair(level_sequence, sequence_body_index, layer_suffix, start_frame, end
 
     # Add actor to new layer so that we can later use layer name when generating segmentation masks names.
     # Note: We cannot use ObjectIds of type "Actor" since actors which are added via add_spawnable_from_instance() will later use their class names when generating ObjectIds of type Actor.
-    layer_subsystem = unreal.get_editor_subsystem(unreal.LayersSubsystem)
-    layer_subsystem.add_actor_to_layer(hair_actor, f"be_actor_{sequence_body_index:02}_{layer_suffix}")
+    layer_registry.add_actor(hair_actor, sequence_body_index, layer_suffix)
 
     # Setup LevelSequence
     skeletal_mesh_actor_binding = level_sequence.add_spawnable_from_instance(skeletal_mesh_actor)
     hair_actor_binding = level_sequence.add_spawnable_from_instance(hair_actor)
 
-    unreal.get_editor_subsystem(unreal.EditorActorSubsystem).destroy_actor(skeletal_mesh_actor) # Delete temporary template actor from level
-    unreal.get_editor_subsystem(unreal.EditorActorSubsystem).destroy_actor(hair_actor) # Delete temporary template actor from level
+    template_actors.destroy(skeletal_mesh_actor) # Delete temporary template actor from level
+    template_actors.destroy(hair_actor) # Delete temporary template actor from level
 
     anim_track = skeletal_mesh_actor_binding.add_track(unreal.MovieSceneSkeletalAnimationTrack)
     anim_section = anim_track.add_section()
@@ -244,14 +421,109 @@ def get_focal_length(cine_camera_component, camera_hfov):
     focal_length = sensor_width / (2.0 * tan(radians(camera_hfov)/2))
     return focal_length
 
-def add_static_camera(level_sequence, camera_actor, camera_pose, camera_hfov):
+def add_keys(channel, frames, values, interpolation=None):
+    """
+    Write precomputed keys into channel.
+    The UE 5.0 Sequencer Python API has no batch key call so this is the only place where individual keys are added.
+    Keys which are identical between sequences should come from a template LevelSequence instead, see update_frames_template().
+    """
+    if interpolation is None:
+        for (frame, value) in zip(frames, values):
+            channel.add_key(unreal.FrameNumber(frame), value)
+    else:
+        for (frame, value) in zip(frames, values):
+            channel.add_key(unreal.FrameNumber(frame), value, interpolation=interpolation)
+    return
+
+def add_camera_transform_keys(camera_binding, camera_keys):
+    """
+    Key precomputed camera trajectory (be_camera_trajectories.py) into existing camera transform track
+    """
+    transform_channels = camera_binding.get_tracks()[0].get_sections()[0].get_channels()
+    frames = [camera_key.frame for camera_key in camera_keys]
+
+    # Channel order: location X, Y, Z, roll, pitch, yaw
+    channel_values = [[camera_key.pose.x for camera_key in camera_keys], [camera_key.pose.y for camera_key in camera_keys], [camera_key.pose.z for camera_key in camera_keys],
+                      [camera_key.pose.roll for camera_key in camera_keys], [camera_key.pose.pitch for camera_key in camera_keys], [camera_key.pose.yaw for camera_key in camera_keys]]
+
+    for (channel, values) in zip(transform_channels, channel_values):
+        add_keys(channel, frames, values, unreal.MovieSceneKeyInterpolation.LINEAR)
+    return
+
+def add_frame_track(logger_binding, num_frames):
+    """
+    Keyframe sequencer frame numbers into Frame variable of ground truth logger
+    """
+    frame_track = logger_binding.add_track(unreal.MovieSceneIntegerTrack)
+    frame_track.set_property_name_and_path('Frame', 'Frame')
+    frame_track_section = frame_track.add_section()
+    frame_track_section.set_range(-WARMUP_FRAMES, num_frames)
+
+    frames = list(range(0, num_frames))
+    if WARMUP_FRAMES > 0:
+        add_keys(frame_track_section.get_channels()[0], [-WARMUP_FRAMES], [-1])
+    add_keys(frame_track_section.get_channels()[0], frames, frames)
+    return frame_track_section
+
+def get_frame_track(level_sequence):
+    """
+    Ground truth logger binding and Frame track section of LevelSequence, (None, None) if not available
+    """
+    for binding in level_sequence.get_possessables():
+        for track in binding.get_tracks():
+            if isinstance(track, unreal.MovieSceneIntegerTrack) and (str(track.get_property_name()) == "Frame"):
+                return (binding, track.get_sections()[0])
+    return (None, None)
+
+def update_frames_template(template_path, ground_truth_logger_actor, num_frames, source_template=None):
+    """
+    Create template LevelSequence with ground truth logger Frame keys for num_frames frames.
+    Sequences duplicate it instead of keying every frame. Without source template it is an empty LevelSequence for sequences
+    created from scratch, otherwise a copy of the HDRI or camera movement template.
+    Created once per run: the logger binding of an existing template may belong to another map or a recreated logger actor
+    and its keys to other warm up frames.
+    Returns number of keyed frames.
+    """
+    unreal.log(f"Creating frames template LevelSequence: {template_path}, frames={num_frames}")
+    if unreal.EditorAssetLibrary.does_asset_exist(template_path):
+        unreal.EditorAssetLibrary.delete_asset(template_path)
+
+    if source_template is not None:
+        level_sequence = unreal.EditorAssetLibrary.duplicate_asset(source_template, template_path)
+    else:
+        (package_path, asset_name) = template_path.rsplit("/", 1)
+        asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+        level_sequence = unreal.AssetTools.create_asset(asset_tools, asset_name = asset_name, package_path = package_path, asset_class = unreal.LevelSequence, factory = unreal.LevelSequenceFactoryNew())
+
+    logger_binding = level_sequence.add_possessable(ground_truth_logger_actor)
+    add_frame_track(logger_binding, num_frames)
+    unreal.EditorAssetLibrary.save_asset(level_sequence.get_path_name())
+    return num_frames
+
+def get_source_frames_template(source_template, ground_truth_logger_actor, num_frames):
+    """
+    Copy of HDRI or camera movement template with ground truth logger Frame keys for num_frames frames, created on first use.
+    None if source template does not exist.
+    """
+    if source_template not in source_frames_templates:
+        template_path = None
+        if unreal.EditorAssetLibrary.does_asset_exist(source_template):
+            template_path = f"{level_sequence_frames_template}_{source_template.rsplit('/', 1)[-1]}"
+            update_frames_template(template_path, ground_truth_logger_actor, num_frames, source_template)
+        source_frames_templates[source_template] = template_path
+    return source_frames_templates[source_template]
+
+def add_static_camera(level_sequence, camera_actor, camera_pose, camera_hfov, camera_keys=None):
     """
     Add static camera actor and camera cut track to level sequence.
+    If camera keys are specified the camera follows the precomputed per-frame trajectory.
     """
 
     # Add camera with transform track
     camera_binding = level_sequence.add_possessable(camera_actor)
     add_transform_track(camera_binding, camera_pose)
+    if camera_keys:
+        add_camera_transform_keys(camera_binding, camera_keys)
     """
     transform_track = camera_binding.add_track(unreal.MovieScene3DTransformTrack)
     transform_section = transform_track.add_section()
@@ -285,6 +557,11 @@ def add_static_camera(level_sequence, camera_actor, camera_pose, camera_hfov):
         focal_length = get_focal_length(cine_camera_component, camera_hfov)
         focal_length_section.get_channels()[0].set_default(focal_length)
 
+        if camera_keys:
+            # Zoom
+            focal_length_channel = focal_length_section.get_channels()[0]
+            add_keys(focal_length_channel, [camera_key.frame for camera_key in camera_keys], [get_focal_length(cine_camera_component, camera_key.hfov) for camera_key in camera_keys], unreal.MovieSceneKeyInterpolation.LINEAR)
+
     camera_cut_track = level_sequence.add_master_track(unreal.MovieSceneCameraCutTrack)
     camera_cut_section = camera_cut_track.add_section()
     camera_cut_section.set_start_frame(-WARMUP_FRAMES) # Use negative frames as warmup frames
@@ -294,6 +571,64 @@ def add_static_camera(level_sequence, camera_actor, camera_pose, camera_hfov):
 
     return camera_cut_section
 
+def add_camera_views(level_sequence, camera_actor, camera_views, cameraroot_binding):
+    """
+    Add additional static camera views (View rows) to LevelSequence so that all views of the same bodies render in one job.
+    Each view is a spawnable copy of the level camera which is attached to the camera root and has its own camera cut section.
+    Movie Render Queue renders overlapping camera cuts as separate shots. Returns camera cut sections of added views, None on error.
+    """
+    unreal.log(f"  Adding camera views: {len(camera_views)}")
+
+    cameraroot_actor = camera_actor.get_attach_parent_actor()
+    if cameraroot_actor is None:
+        unreal.log_error("Cannot find camera root actor for CineCameraActor")
+        return None
+
+    if cameraroot_binding is None:
+        cameraroot_binding = level_sequence.add_possessable(cameraroot_actor)
+
+    cameraroot_binding_id = unreal.MovieSceneObjectBindingID()
+    cameraroot_binding_id.set_editor_property("Guid", cameraroot_binding.get_id())
+
+    # Main camera of Group row is first view
+    for binding in level_sequence.get_possessables():
+        if binding.get_name() == camera_actor.get_actor_label():
+            binding.set_display_name(f"{CAMERA_VIEW_PREFIX}00")
+
+    camera_cut_track = level_sequence.find_master_tracks_by_type(unreal.MovieSceneCameraCutTrack)[0]
+    camera_cut_sections = []
+    for camera_view in camera_views:
+        view_name = f"{CAMERA_VIEW_PREFIX}{camera_view.index:02}"
+
+        # Temporary template actor with same camera class and settings as level camera, see add_hair()
+        view_actor = template_actors.spawn(camera_actor.get_class())
+        view_actor.set_actor_label(view_name)
+        if camera_view.hfov is not None:
+            cine_camera_component = view_actor.get_cine_camera_component()
+            cine_camera_component.set_editor_property("current_focal_length", get_focal_length(cine_camera_component, camera_view.hfov))
+
+        view_binding = level_sequence.add_spawnable_from_instance(view_actor)
+        template_actors.destroy(view_actor) # Delete temporary template actor from level
+        view_binding.set_display_name(view_name)
+        add_transform_track(view_binding, camera_view.pose)
+
+        # Camera poses are relative to camera root like the Group row camera pose
+        attach_track = view_binding.add_track(unreal.MovieScene3DAttachTrack)
+        attach_section = attach_track.add_section()
+        attach_section.set_constraint_binding_id(cameraroot_binding_id)
+        attach_section.set_start_frame_bounded(False)
+        attach_section.set_end_frame_bounded(False)
+
+        camera_cut_section = camera_cut_track.add_section()
+        camera_cut_section.set_row_index(camera_view.index)
+        camera_cut_section.set_start_frame(-WARMUP_FRAMES) # Use negative frames as warmup frames
+        camera_binding_id = unreal.MovieSceneObjectBindingID()
+        camera_binding_id.set_editor_property("Guid", view_binding.get_id())
+        camera_cut_section.set_editor_property("CameraBindingID", camera_binding_id)
+        camera_cut_sections.append(camera_cut_section)
+
+    return camera_cut_sections
+
 def change_binding_end_keyframe_times(binding, new_frame):
     for track in binding.get_tracks():
         for section in track.get_sections():
@@ -306,8 +641,66 @@ def change_binding_end_keyframe_times(binding, new_frame):
                         end_key = channel_keys[1]
                         end_key.set_time(unreal.FrameNumber(new_frame))
 
-def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_actor, sequence_bodies, sequence_frames, hdri_name, camera_hfov=None, camera_movement="Static", cameraroot_yaw=None, cameraroot_location=None):
+def get_group_config(row):
+    return dict(value.split("=") for value in row["Comment"].split(";"))
+
+def get_shard_rows(csv_rows, shard_index=None, num_shards=None, name_range=None):
+    """
+    Select sequences for sharded generation, keeps Comment rows and the complete Group blocks (Group, Camera, View, Body rows) of the shard.
+    Sequences are either split into num_shards contiguous sections or selected by inclusive sequence name range (first, last).
+    """
+    num_groups = sum(1 for row in csv_rows if row["Type"] == "Group")
+    if num_shards is not None:
+        section_length = ceil(num_groups / num_shards)
+        start_index = shard_index * section_length
+        end_index = min(start_index + section_length, num_groups)
+        unreal.log(f"Processing shard: {shard_index}, total shards: {num_shards}, range: [{start_index}:{end_index}]")
+
+    shard_rows = []
+    group_index = -1
+    keep = False
+    for row in csv_rows:
+        if row["Type"] == "Comment":
+            shard_rows.append(row)
+            continue
+
+        if row["Type"] == "Group":
+            group_index += 1
+            if name_range is not None:
+                sequence_name = get_group_config(row)["sequence_name"]
+                keep = (name_range[0] <= sequence_name <= name_range[1])
+            elif num_shards is not None:
+                keep = (start_index <= group_index < end_index)
+            else:
+                keep = True
+
+        if keep:
+            shard_rows.append(row)
+
+    return shard_rows
+
+def get_resume_rows(csv_rows, completed_sequences):
+    """
+    Skip sequences which were completed by an interrupted previous run, rows start at the first unfinished Group row
+    """
+    for (row_index, row) in enumerate(csv_rows):
+        if (row["Type"] == "Group") and (get_group_config(row)["sequence_name"] not in completed_sequences):
+            return csv_rows[row_index:]
+    return []
+
+def get_level_sequence_template(hdri_name, camera_movement, camera_keys):
+    """
+    Template LevelSequence which add_level_sequence() will duplicate, None if sequence is created from scratch
+    """
+    if hdri_name is not None:
+        return level_sequence_hdri_template
+    elif (camera_movement != "Static") and not camera_keys:
+        return f"{camera_root}LS_Camera_{camera_movement}"
+    return None
+
+def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_actor, sequence_bodies, sequence_frames, hdri_name, camera_hfov=None, camera_movement="Static", cameraroot_yaw=None, cameraroot_location=None, camera_keys=None, frames_template=None, camera_views=None):
     asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+    asset_cache.reset_statistics()
 
     level_sequence_path = level_sequences_root + name
 
@@ -316,16 +709,26 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
         unreal.log("  Deleting existing old LevelSequence: " + level_sequence_path)
         unreal.EditorAssetLibrary.delete_asset(level_sequence_path)
 
+    # Camera views sidecar for asset registry mode of create_movie_render_queue.py, written after the LevelSequence is saved
+    camera_views_path = get_camera_views_path(unreal.Paths.convert_relative_path_to_full(unreal.Paths.project_content_dir()), level_sequences_root, name)
+    save_camera_views(camera_views_path, [])
+
+    # Precomputed camera trajectory from sequence definition replaces camera movement templates
+    if camera_keys:
+        if camera_movement != "Static":
+            unreal.log(f"  Using camera trajectory from sequence definition instead of camera movement template: {camera_movement}")
+        camera_movement = "Static"
+
     # Generate LevelSequence, either via template (HDRI, camera movement) or from scratch
     if hdri_name is not None:
         # Duplicate template HDRI LevelSequence
         if not unreal.EditorAssetLibrary.does_asset_exist(level_sequence_hdri_template):
             unreal.log_error("Cannot find LevelSequence HDRI template: " + level_sequence_hdri_template)
             return False
-        level_sequence = unreal.EditorAssetLibrary.duplicate_asset(level_sequence_hdri_template, level_sequence_path)
+        level_sequence = unreal.EditorAssetLibrary.duplicate_asset(frames_template if frames_template is not None else level_sequence_hdri_template, level_sequence_path)
         hdri_path = f"{hdri_root}{hdri_name}{hdri_suffix}"
         unreal.log(f"  Loading HDRI: {hdri_path}")
-        hdri_object = unreal.load_object(None, hdri_path)
+        hdri_object = asset_cache.load_object(hdri_path)
         if hdri_object is None:
             unreal.log_error("Cannot load HDRI")
             return False
@@ -344,7 +747,10 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
         if not unreal.EditorAssetLibrary.does_asset_exist(level_sequence_camera_template):
             unreal.log_error("Cannot find LevelSequence camera template: " + level_sequence_camera_template)
             return False
-        level_sequence = unreal.EditorAssetLibrary.duplicate_asset(level_sequence_camera_template, level_sequence_path)
+        level_sequence = unreal.EditorAssetLibrary.duplicate_asset(frames_template if frames_template is not None else level_sequence_camera_template, level_sequence_path)
+    elif frames_template is not None:
+        # Duplicate generated template with ground truth logger Frame keys
+        level_sequence = unreal.EditorAssetLibrary.duplicate_asset(frames_template, level_sequence_path)
     else:
         level_sequence = unreal.AssetTools.create_asset(asset_tools, asset_name = name, package_path = level_sequences_root, asset_class = unreal.LevelSequence, factory = unreal.LevelSequenceFactoryNew())
 
@@ -356,7 +762,7 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
 
     if camera_movement == "Static":
         # Create new camera
-        camera_cut_section = add_static_camera(level_sequence, camera_actor, camera_pose, camera_hfov)
+        camera_cut_section = add_static_camera(level_sequence, camera_actor, camera_pose, camera_hfov, camera_keys)
     else:
         # Use existing camera from LevelSequence template
         master_track = level_sequence.get_master_tracks()[0]
@@ -419,6 +825,13 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
         transform_channels[1].set_default(cameraroot_location.y)
         transform_channels[2].set_default(cameraroot_location.z)
 
+    # Additional camera views share all body tracks
+    view_camera_cut_sections = []
+    if camera_views:
+        view_camera_cut_sections = add_camera_views(level_sequence, camera_actor, camera_views, cameraroot_binding)
+        if view_camera_cut_sections is None:
+            return False
+
     """
     # Get end frame from body sequence
     body_object = unreal.load_object(None, body_path)
@@ -431,23 +844,20 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
     """
     end_frame = sequence_frames
     camera_cut_section.set_end_frame(end_frame)
+    for view_camera_cut_section in view_camera_cut_sections:
+        view_camera_cut_section.set_end_frame(end_frame)
     level_sequence.set_playback_start(-WARMUP_FRAMES) # Use negative frames as warmup frames
     level_sequence.set_playback_end(end_frame)
 
     # Add ground truth logger if available and keyframe sequencer frame numbers into Frame variable
     if ground_truth_logger_actor is not None:
-        logger_binding = level_sequence.add_possessable(ground_truth_logger_actor)
-
-        frame_track = logger_binding.add_track(unreal.MovieSceneIntegerTrack)
-        frame_track.set_property_name_and_path('Frame', 'Frame')
-        frame_track_section = frame_track.add_section()
-        frame_track_section.set_range(-WARMUP_FRAMES, end_frame)
-        frame_track_channel = frame_track_section.get_channels()[0]
-        if WARMUP_FRAMES > 0:
-            frame_track_channel.add_key(time=unreal.FrameNumber(-WARMUP_FRAMES), new_value=-1)
-
-        for frame_number in range (0, end_frame):
-            frame_track_channel.add_key(time=unreal.FrameNumber(frame_number), new_value=frame_number)
+        (logger_binding, frame_track_section) = get_frame_track(level_sequence)
+        if frame_track_section is not None:
+            # Frame keys from template, template may have more keys than needed
+            frame_track_section.set_range(-WARMUP_FRAMES, end_frame)
+        else:
+            logger_binding = level_sequence.add_possessable(ground_truth_logger_actor)
+            add_frame_track(logger_binding, end_frame)
 
         # Add level sequence name
         sequence_name_track = logger_binding.add_track(unreal.MovieSceneStringTrack)
@@ -460,7 +870,7 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
 
     for sequence_body_index, sequence_body in enumerate(sequence_bodies):
 
-        body_object = unreal.load_object(None, sequence_body.body_path)
+        body_object = asset_cache.load_object(sequence_body.body_path)
         if body_object is None:
             unreal.log_error(f"Cannot load body asset: {sequence_body.body_path}")
             return False
@@ -487,7 +897,7 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
             material = None
             if sequence_body.texture_body is not None:
                 material_asset_path = f"{material_body_root}/MI_{sequence_body.texture_body}"
-                material = unreal.EditorAssetLibrary.load_asset(f"MaterialInstanceConstant'{material_asset_path}'")
+                material = asset_cache.load_editor_asset(f"MaterialInstanceConstant'{material_asset_path}'")
                 if not material:
                     unreal.log_error(f"Cannot load material: {material_asset_path}")
                     return False
@@ -496,7 +906,7 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
 
             # Add clothing if available
             if sequence_body.clothing_path is not None:
-                clothing_object = unreal.load_object(None, sequence_body.clothing_path)
+                clothing_object = asset_cache.load_object(sequence_body.clothing_path)
                 if clothing_object is None:
                     unreal.log_error(f"Cannot load clothing asset: {sequence_body.clothing_path}")
                     return False
@@ -504,7 +914,7 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
                 material = None
                 if sequence_body.texture_clothing is not None:
                     material_asset_path = f"{material_clothing_root}/{sequence_body.subject}/MI_{sequence_body.subject}_{sequence_body.texture_clothing}"
-                    material = unreal.EditorAssetLibrary.load_asset(f"MaterialInstanceConstant'{material_asset_path}'")
+                    material = asset_cache.load_editor_asset(f"MaterialInstanceConstant'{material_asset_path}'")
                     if not material:
                         unreal.log_error(f"Cannot load material: {material_asset_path}")
                         return False
@@ -518,6 +928,10 @@ def add_level_sequence(name, camera_actor, camera_pose, ground_truth_logger_acto
                 return False
 
     unreal.EditorAssetLibrary.save_asset(level_sequence.get_path_name())
+    if camera_views:
+        save_camera_views(camera_views_path, [f"{CAMERA_VIEW_PREFIX}00"] + [f"{CAMERA_VIEW_PREFIX}{camera_view.index:02}" for camera_view in camera_views])
+
+    asset_cache.log_statistics("Asset cache", asset_cache.sequence_hits, asset_cache.sequence_misses, asset_cache.sequence_time_saved)
 
     return True
 
@@ -535,7 +949,25 @@ if __name__ == '__main__':
     if len(sys.argv) >= 3:
         camera_movement = sys.argv[2]
 
+    # Optional sharding for parallel generation in multiple editor processes (create_level_sequences_csv_batch.py)
+    #   create_level_sequences_csv.py be_seq.csv Static SHARD_INDEX NUM_SHARDS
+    #   create_level_sequences_csv.py be_seq.csv Static FIRST_SEQUENCE_NAME:LAST_SEQUENCE_NAME
+    shard_index = None
+    num_shards = None
+    name_range = None
+    shard_name = None
+    if len(sys.argv) >= 4:
+        if ":" in sys.argv[3]:
+            name_range = sys.argv[3].split(":", 1)
+            shard_name = f"{name_range[0]}-{name_range[1]}"
+        else:
+            shard_index = int(sys.argv[3])
+            num_shards = int(sys.argv[4])
+            shard_name = get_shard_name(shard_index, num_shards)
+
     start_time = time.perf_counter()
+    asset_cache.invalidate() # Do not reuse assets from previous runs in same editor session
+    layer_registry.begin()
 
     # Find CineCameraActor and BE_GroundTruthLogger in current map
     actors = unreal.get_editor_subsystem(unreal.EditorActorSubsystem).get_all_level_actors() # deprecated: unreal.EditorLevelLibrary.get_all_level_actors()
@@ -560,6 +992,53 @@ if __name__ == '__main__':
             csv_rows = list(csv_reader) # Convert to list of rows so that we can look ahead, this will skip header
             sequence_bodies = []
 
+            if shard_name is not None:
+                csv_rows = get_shard_rows(csv_rows, shard_index, num_shards, name_range)
+            shard_sequence_names = [get_group_config(row)["sequence_name"] for row in csv_rows if row["Type"] == "Group"]
+
+            # Validate all referenced assets before creating any LevelSequence
+            asset_roots = AssetRoots(body_root, data_root_unreal + "Clothing/", hair_root, animation_root, hdri_root, hdri_suffix, material_body_root, material_clothing_root, texture_body_root, texture_clothing_overlay_root, material_hidden_name)
+            asset_inventory = get_asset_inventory(asset_roots)
+            missing_assets = find_missing_assets(csv_rows, asset_inventory, asset_roots)
+            unreal.log(f"Asset preflight: {len(asset_inventory)} assets in inventory, {len(missing_assets)} missing")
+            if len(missing_assets) > 0:
+                log_missing_assets(missing_assets, unreal.log_error)
+                success = False
+                csv_rows = []
+
+            # Template with ground truth logger Frame keys for longest sequence, one template per shard since shards run in parallel
+            frames_template_frames = 0
+            if shard_name is not None:
+                level_sequence_frames_template += f"_{shard_name}"
+            sequence_frames_max = max([int(get_group_config(row)["frames"]) for row in csv_rows if row["Type"] == "Group"], default=0)
+            if (ground_truth_logger_actor is not None) and (sequence_frames_max > 0):
+                frames_template_frames = update_frames_template(level_sequence_frames_template, ground_truth_logger_actor, sequence_frames_max)
+
+            # Only rebuild sequences which changed since last run or which have no LevelSequence asset
+            manifest_path = get_manifest_path(csv_path, shard_name)
+            fingerprints = load_manifest(csv_path)
+            script_version = get_script_version([__file__])
+            rebuilt_sequences = []
+            skipped_sequences = []
+            failed_sequences = []
+            sequence_rows = []
+
+            # Resume interrupted run (editor crash) from progress ledger and remove its half-built LevelSequence
+            progress_path = get_progress_path(csv_path, shard_name)
+            run_id = get_run_id(csv_path, shard_name, camera_movement, script_version)
+            (completed_sequences, interrupted_sequence) = load_progress(progress_path, run_id)
+            resumed_sequences = list(completed_sequences)
+            generated_sequences = 0
+            resources = []
+            if interrupted_sequence is not None:
+                unreal.log(f"Removing incomplete LevelSequence of interrupted run: {interrupted_sequence}")
+                fingerprints.pop(interrupted_sequence, None)
+                if unreal.EditorAssetLibrary.does_asset_exist(level_sequences_root + interrupted_sequence):
+                    unreal.EditorAssetLibrary.delete_asset(level_sequences_root + interrupted_sequence)
+            if len(completed_sequences) > 0:
+                csv_rows = get_resume_rows(csv_rows, completed_sequences)
+                unreal.log(f"Resuming interrupted run: {len(completed_sequences)} sequences completed, progress: {progress_path}")
+
             sequence_name = None
             sequence_frames = 0
             hdri_name = None
@@ -567,11 +1046,30 @@ if __name__ == '__main__':
             camera_pose = None
             cameraroot_yaw = None
             cameraroot_location = None
+            camera_keys = []
+            camera_views = []
 
             for row_index, row in enumerate(csv_rows):
                 if row["Type"] == "Comment":
                     continue
 
+                if row["Type"] == "Camera":
+                    # Precomputed camera trajectory, see be_camera_trajectories.py
+                    camera_config = dict(value.split("=") for value in row["Comment"].split(";"))
+                    camera_key_pose = CameraPose(float(row["X"]), float(row["Y"]), float(row["Z"]), float(row["Yaw"]), float(row["Pitch"]), float(row["Roll"]))
+                    camera_keys.append(CameraKey(int(camera_config["frame"]), camera_key_pose, float(camera_config["camera_hfov"])))
+                    sequence_rows.append(row)
+                    continue
+
+                if row["Type"] == "View":
+                    # Additional static camera view, see be_modify_sequences.py views
+                    view_config = dict(value.split("=") for value in row["Comment"].split(";"))
+                    view_pose = CameraPose(float(row["X"]), float(row["Y"]), float(row["Z"]), float(row["Yaw"]), float(row["Pitch"]), float(row["Roll"]))
+                    view_hfov = float(view_config["camera_hfov"]) if "camera_hfov" in view_config else camera_hfov
+                    camera_views.append(CameraView(int(view_config["view"]), view_pose, view_hfov))
+                    sequence_rows.append(row)
+                    continue
+
                 if row["Type"] == "Group":
                     camera_pose = CameraPose(float(row["X"]), float(row["Y"]), float(row["Z"]), float(row["Yaw"]), float(row["Pitch"]), float(row["Roll"]))
 
@@ -611,11 +1109,14 @@ if __name__ == '__main__':
 
                     unreal.log(f"  Generating level sequence: {sequence_name}, frames={sequence_frames}, hdri={hdri_name}, camera_hfov={camera_hfov}")
                     sequence_bodies = []
+                    camera_keys = []
+                    camera_views = []
+                    sequence_rows = [row]
 
                     continue
 
                 if row["Type"] == "Body":
-                    index = int(row["Index"])
+                    sequence_rows.append(row)
                     body = row["Body"]
 
 
@@ -672,26 +1173,12 @@ if __name__ == '__main__':
                     # Clothing: GeometryCache'/Engine/PS/Bedlam/Clothing/rp_aaron_posed_002/rp_aaron_posed_002_0000_clo.rp_aaron_posed_002_0000_clo'
 
                     body_path = f"GeometryCache'{body_root}{subject}/{body}.{body}'"
-
-                    have_body = unreal.EditorAssetLibrary.does_asset_exist(body_path)
-                    if not have_body:
-                        unreal.log_error("No asset found for body path: " + body_path)
-                        success = False
-                        break
-
                     unreal.log("    Processing body: " + body_path)
 
                     clothing_path = None
                     if texture_clothing is not None:
                         clothing_path = body_path.replace("SMPLX", "Clothing")
                         clothing_path = clothing_path.replace(animation_id, f"{animation_id}_clo")
-
-                        have_clothing = unreal.EditorAssetLibrary.does_asset_exist(clothing_path)
-                        if not have_clothing:
-                            unreal.log_error("No asset found for clothing path: " + clothing_path)
-                            success = False
-                            break
-
                         unreal.log("    Clothing: " + clothing_path)
 
                     animation_path = None
@@ -704,24 +1191,77 @@ if __name__ == '__main__':
 
                     # Check if body was last item in current sequence
                     add_sequence = False
-                    if index >= (len(csv_rows) - 1):
+                    if row_index >= (len(csv_rows) - 1):
                         add_sequence = True
                     elif csv_rows[row_index + 1]["Type"] != "Body":
                         add_sequence = True
 
                     if add_sequence:
-                        success = add_level_sequence(sequence_name, camera_actor, camera_pose, ground_truth_logger_actor, sequence_bodies, sequence_frames, hdri_name, camera_hfov, camera_movement, cameraroot_yaw, cameraroot_location)
+                        template = get_level_sequence_template(hdri_name, camera_movement, camera_keys)
+                        fingerprint = get_sequence_fingerprint(sequence_rows, template, camera_movement, script_version)
+                        if (not FORCE_REBUILD) and (fingerprints.get(sequence_name) == fingerprint) and unreal.EditorAssetLibrary.does_asset_exist(level_sequences_root + sequence_name):
+                            unreal.log(f"  Skipping unchanged LevelSequence: {sequence_name}")
+                            skipped_sequences.append(sequence_name)
+                            completed_sequences.append(sequence_name)
+                            save_progress(progress_path, run_id, completed_sequences)
+                            continue
+
+                        save_progress(progress_path, run_id, completed_sequences, sequence_name)
+                        frames_template = None
+                        if template is None:
+                            frames_template = level_sequence_frames_template if frames_template_frames >= sequence_frames else None
+                        elif (ground_truth_logger_actor is not None) and (sequence_frames_max >= sequence_frames):
+                            # Frame keys of HDRI and camera movement sequences come from a keyed copy of their template
+                            frames_template = get_source_frames_template(template, ground_truth_logger_actor, sequence_frames_max)
+                        success = add_level_sequence(sequence_name, camera_actor, camera_pose, ground_truth_logger_actor, sequence_bodies, sequence_frames, hdri_name, camera_hfov, camera_movement, cameraroot_yaw, cameraroot_location, camera_keys, frames_template, camera_views)
+
+                        # Remove template actors left by failed sequence, segmentation mask layers are kept for next sequence
+                        template_actors.destroy_all()
+
+                        generated_sequences += 1
+                        if (GARBAGE_COLLECTION_INTERVAL > 0) and ((generated_sequences % GARBAGE_COLLECTION_INTERVAL) == 0):
+                            unreal.SystemLibrary.collect_garbage()
+
+                        # Level actor count and editor memory should stay flat over long runs
+                        level_actors = len(unreal.get_editor_subsystem(unreal.EditorActorSubsystem).get_all_level_actors())
+                        memory = get_process_memory()
+                        resources.append([sequence_name, level_actors, memory])
+                        unreal.log(f"  Level actors: {level_actors}, template actors spawned: {template_actors.spawned}, leftovers destroyed: {template_actors.leftovers}, editor memory: {f'{memory:.0f}MB' if memory is not None else 'n/a'}")
+
+                        if not success:
+                            fingerprints.pop(sequence_name, None)
+                        else:
+                            fingerprints[sequence_name] = fingerprint
+                            rebuilt_sequences.append(sequence_name)
+                            completed_sequences.append(sequence_name)
 
-                        # Remove added layers used for segmentation mask naming
-                        layer_subsystem = unreal.get_editor_subsystem(unreal.LayersSubsystem)
-                        layer_names = layer_subsystem.add_all_layer_names_to()
-                        for layer_name in layer_names:
-                            if str(layer_name).startswith("be_actor"):
-                                layer_subsystem.delete_layer(layer_name)
+                        # Only store sequences of this shard so that shard manifests do not overwrite each other when merged
+                        save_manifest(manifest_path, { name: fingerprints[name] for name in shard_sequence_names if name in fingerprints })
+
+                        # LevelSequence is saved, failed sequence stays in progress so that a rerun removes it
+                        if success:
+                            save_progress(progress_path, run_id, completed_sequences)
 
                         if not success:
+                            failed_sequences.append(sequence_name)
                             break
 
+            unreal.log(f"LevelSequences rebuilt: {len(rebuilt_sequences)}, skipped (unchanged): {len(skipped_sequences)}, resumed: {len(resumed_sequences)}, manifest: {manifest_path}")
+            if success and os.path.exists(progress_path):
+                os.remove(progress_path)
+
+            report = { "shard": shard_name, "sequences": len(shard_sequence_names), "rebuilt": rebuilt_sequences, "skipped": skipped_sequences, "resumed": resumed_sequences, "failed": failed_sequences, "missing_assets": [package_name for (package_name, _) in missing_assets] }
+            report["resources"] = resources # [sequence name, level actors, editor memory [MB]] after each generated sequence
+            report["success"] = success
+            report["time"] = time.perf_counter() - start_time
+            save_json(get_report_path(csv_path, shard_name), report)
+
+    asset_cache.log_statistics("Asset cache total", asset_cache.hits, asset_cache.misses, asset_cache.time_saved)
+
+    # Remove layers used for segmentation mask naming
+    unreal.log(f"Removing segmentation mask layers: {len(layer_registry.layers)}")
+    layer_registry.delete_all()
+
     if success:
         unreal.log(f"LevelSequence generation finished. Total time: {(time.perf_counter() - start_time):.1f}s")
         sys.exit(0)
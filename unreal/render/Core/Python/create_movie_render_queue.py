@@ -2,6 +2,7 @@
 # License: https://bedlam.is.tuebingen.mpg.de/license.html
 # 
 # Generates MovieRenderQueue render jobs for selected Content Browser LevelSequences
+# or for all LevelSequences below a Content Browser folder (asset registry mode)
 #
 # Requirements: 
 #   Unreal 5.0.3+
@@ -10,47 +11,219 @@
 #     + Movie Render Queue
 #     + Movie Render Queue Additional Render Passes (for segmentation masks)
 #
+# Short sequences can be packed as shots into master LevelSequences (render preset option PackN) so that N sequences share
+# one render job with a single PIE startup. Shots which follow a shot with the same HDRI use a shorter engine warm up.
+# Images are still written per sequence and render_movie_render_queue.py splits the camera ground truth per shot (be_render_shots.json).
+#
+# Multi-camera LevelSequences (View rows in be_seq.csv) render all camera views in one job, each view is a camera cut shot
+# with its own output folder ({sequence_name}_{camera_name}). These sequences are not packed.
+#
+# Asset registry mode creates the render jobs from the asset registry SoftObjectPaths without loading the LevelSequences
+# so that thousands of sequences can be queued. Packing needs the loaded sequence data and is not supported in this mode.
+# Multi-camera LevelSequences are found by their camera views sidecar (create_level_sequences_csv.py) and loaded for their views.
+#
+# Render preset option Resume scans the existing output images and camera ground truth before creating the jobs. Sequences with
+# all frames are skipped and partially rendered sequences only render the missing frames (custom playback range with warm up frames).
+# Multi-camera sequences render the frame range of the missing frames of all views for every view.
+#
+# Usage:
+#   create_movie_render_queue.py OUTPUT_DIR RENDER_PRESET [PACKAGE_PATH [NAME_GLOB|NAME_LIST_FILE]]
+#     PACKAGE_PATH: asset registry mode, for example /Game/Bedlam/LevelSequences
+#
+import fnmatch
+import os
+from pathlib import Path
+import re
 import sys
+from typing import NamedTuple
 import unreal
 
+from be_sequence_manifest import find_camera_view_sequences, save_json
+
 # Globals
 preview_mode = False
 output_dir = r"C:\bedlam\images\test"
-
-def add_render_job(pipeline_queue, level_sequence, output_frame_step, use_tsr):
-	global preview_mode
-	global output_dir
-
-	level_sequence_name = level_sequence.get_name()
-	# Create new movie pipeline job and set job parameters
-	job = pipeline_queue.allocate_new_job(unreal.MoviePipelineExecutorJob)
-	job.set_editor_property('job_name', level_sequence_name)
-	job.set_editor_property('sequence', unreal.SoftObjectPath(level_sequence.get_path_name()))
-
+master_sequences_root = "/Game/Bedlam/MasterSequences/"
+render_shots_name = "be_render_shots.json" # Shots of packed and multi-camera render jobs, used for camera ground truth export
+render_resume_name = "be_render_resume.json" # Frame ranges of resumed render jobs, camera ground truth export merges them with existing data
+render_configs = {} # Shared render configurations, created once per queue setup and copied into each job
+ENGINE_WARM_UP_COUNT = 32
+SHOT_ENGINE_WARM_UP_COUNT = 8 # Packed shots after a shot with same HDRI and camera views after the first view, level lighting and assets are already warm
+CAMERA_VIEW_PATTERN = re.compile(r"view\d+") # Camera binding names of multi-camera sequences, see create_level_sequences_csv.py
+
+class RenderPreset(NamedTuple):
+	output_frame_step: int = 1
+	use_tsr: bool = False
+	generate_exr: bool = False
+	pack_size: int = 1
+	resume: bool = False
+
+def parse_render_preset(render_preset):
+	"""
+	Render preset: output frame step followed by options, for example 5_DepthMask_Pack8
+	"""
+	values = render_preset.split("_")
+	output_frame_step = int(values[0])
+	use_tsr = "TSR" in values
+	generate_exr = "DepthMask" in values # generate depth map and segmentation masks in .exr file (separate render pass)
+	resume = "Resume" in values # only render frames which are missing in output folder
+
+	pack_size = 1
+	for value in values:
+		if value.startswith("Pack"):
+			pack_size = int(value[len("Pack"):]) # pack up to N sequences as shots into one render job
+
+	return RenderPreset(output_frame_step, use_tsr, generate_exr, pack_size, resume)
+
+def get_map_path():
+	"""
+	Map of current editor level, resolved once for all render jobs
+	"""
 	current_level = unreal.EditorLevelUtils.get_levels(unreal.EditorLevelLibrary.get_editor_world())[0]
-	map_path = unreal.SystemLibrary.get_path_name(unreal.SystemLibrary.get_outer_object(current_level))
-	job.set_editor_property('map', unreal.SoftObjectPath(map_path))
-
-	job.set_editor_property('author', "BEDLAM")
+	return unreal.SystemLibrary.get_path_name(unreal.SystemLibrary.get_outer_object(current_level))
+
+def find_level_sequences(package_path, name_filter=None):
+	"""
+	LevelSequences below package path from asset registry without loading them, list of [name, object path]
+	name_filter: glob pattern (seq_0001*) or path of text file with one sequence name per line
+	"""
+	names = None
+	if (name_filter is not None) and Path(name_filter).is_file():
+		with open(name_filter, "r") as f:
+			names = set(line.strip() for line in f if line.strip() != "")
+
+	asset_registry = unreal.AssetRegistryHelpers.get_asset_registry()
+	asset_registry.scan_paths_synchronous([package_path]) # asset registry might still be loading when run from command line
+
+	level_sequences = []
+	for asset_data in asset_registry.get_assets_by_path(package_path, recursive=True):
+		if str(asset_data.asset_class) != "LevelSequence":
+			continue
 
-	# Add deferred rendering
-	deferred_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineDeferredPassBase)
+		name = str(asset_data.asset_name)
+		if names is not None:
+			if name not in names:
+				continue
+		elif (name_filter is not None) and (not fnmatch.fnmatchcase(name, name_filter)):
+			continue
 
-	# Set output type PNG
-	jpg_setting = job.get_configuration().find_setting_by_class(unreal.MoviePipelineImageSequenceOutput_JPG)
-	if jpg_setting is not None:
-		job.get_configuration().remove_setting(jpg_setting)
-	job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineImageSequenceOutput_PNG)
+		level_sequences.append([name, str(asset_data.object_path)])
+
+	if names is not None:
+		found_names = set(name for (name, _) in level_sequences)
+		for name in sorted(names - found_names):
+			unreal.log_error(f"  LevelSequence not found: {name}")
+
+	return sorted(level_sequences)
+
+def get_sequence_hdri(level_sequence):
+	"""
+	HDRI of Skylight binding, None if LevelSequence was not created from HDRI template
+	"""
+	for binding in level_sequence.get_possessables():
+		if binding.get_name() == "Skylight":
+			for track in binding.get_tracks():
+				for section in track.get_sections():
+					for channel in section.get_channels():
+						hdri = channel.get_default()
+						if hdri is not None:
+							return hdri.get_path_name()
+	return None
+
+def get_sequence_views(level_sequence):
+	"""
+	Camera view names of multi-camera LevelSequence, empty list for sequences with single camera
+	"""
+	views = sorted(str(binding.get_display_name()) for binding in level_sequence.get_bindings() if CAMERA_VIEW_PATTERN.fullmatch(str(binding.get_display_name())))
+	return views if len(views) > 1 else []
+
+def create_master_sequence(name, level_sequences, output_frame_step):
+	"""
+	Pack LevelSequences as shots into new master LevelSequence, each shot keeps its playback range including warmup frames.
+	Shots are aligned so that the output frame step renders the same sequence frames as without packing.
+	Returns master LevelSequence and shot list: [shot name, frames, hdri]
+	"""
+	master_sequence_path = master_sequences_root + name
+	if unreal.EditorAssetLibrary.does_asset_exist(master_sequence_path):
+		unreal.EditorAssetLibrary.delete_asset(master_sequence_path)
+
+	asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+	master_sequence = unreal.AssetTools.create_asset(asset_tools, asset_name = name, package_path = master_sequences_root, asset_class = unreal.LevelSequence, factory = unreal.LevelSequenceFactoryNew())
+	master_sequence.set_display_rate(unreal.FrameRate(numerator = 30, denominator = 1))
+
+	shot_track = master_sequence.add_master_track(unreal.MovieSceneCinematicShotTrack)
+	shots = []
+	frame = 0
+	for level_sequence in level_sequences:
+		start_frame = level_sequence.get_playback_start() # negative warmup frames
+		end_frame = level_sequence.get_playback_end()
+		frame += (start_frame - frame) % output_frame_step # sequence frame 0 on output frame step
+
+		shot_section = shot_track.add_section()
+		shot_section.set_sequence(level_sequence)
+		shot_section.set_shot_display_name(level_sequence.get_name())
+		shot_section.set_range(frame, frame + end_frame - start_frame)
+		shots.append([level_sequence.get_name(), end_frame, get_sequence_hdri(level_sequence)])
+		frame += end_frame - start_frame
+
+	master_sequence.set_playback_start(0)
+	master_sequence.set_playback_end(frame)
+	unreal.EditorAssetLibrary.save_asset(master_sequence.get_path_name())
+	return (master_sequence, shots)
+
+def get_short_warm_up_shots(shots):
+	"""
+	Packed shots which follow a shot with the same HDRI. First shot and HDRI changes use the job warm up.
+	"""
+	return [shots[index][0] for index in range(1, len(shots)) if shots[index][2] == shots[index - 1][2]]
+
+def add_shot_warm_up_overrides(job, sequence_path, short_warm_up_shots, antialiasing_setting):
+	"""
+	Shorter engine warm up for given shots, matched by shot name (packed sequences) or camera name (camera views)
+	"""
+	if len(short_warm_up_shots) == 0:
+		return
+
+	level_sequence = unreal.load_asset(sequence_path) # already loaded for packed sequences and camera views
+	unreal.MoviePipelineLibrary.update_job_shot_list_from_sequence(level_sequence, job)
+	for shot_info in job.shot_info:
+		if (str(shot_info.outer_name) not in short_warm_up_shots) and (str(shot_info.inner_name) not in short_warm_up_shots):
+			continue
 
-	output_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineOutputSetting)
+		# Shot override replaces complete job setting
+		shot_config = shot_info.allocate_new_shot_override_config(unreal.MoviePipelineShotConfig)
+		shot_antialiasing_setting = shot_config.find_or_add_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
+		for name in ["spatial_sample_count", "temporal_sample_count", "override_anti_aliasing", "anti_aliasing_method", "render_warm_up_frames"]:
+			setattr(shot_antialiasing_setting, name, getattr(antialiasing_setting, name))
+		shot_antialiasing_setting.engine_warm_up_count = SHOT_ENGINE_WARM_UP_COUNT
+	return
+
+def get_output_format(output_type, shots=None, views=None):
+	"""
+	Output directory and file name format for output type (png, exr), images are written per shot for packed shots and per view for camera views
+	"""
+	global preview_mode
+	global output_dir
 
-	output_directory = output_dir + "\\png\\{sequence_name}"
+	output_directory = output_dir + f"\\{output_type}\\{{sequence_name}}"
 	file_name_format = "{sequence_name}_{frame_number}"
+	if shots is not None:
+		output_directory = output_dir + f"\\{output_type}\\{{shot_name}}"
+		file_name_format = "{shot_name}_{frame_number_shot}"
+	elif views:
+		output_directory = output_dir + f"\\{output_type}\\{{sequence_name}}_{{camera_name}}"
+		file_name_format = "{sequence_name}_{camera_name}_{frame_number}"
 
 	if preview_mode:
 		output_directory += "_preview"
 		file_name_format += "_preview"
 
+	return (output_directory, file_name_format)
+
+def add_output_setting(config, output_directory, file_name_format, output_frame_step):
+	global preview_mode
+
+	output_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineOutputSetting)
 	output_setting.output_directory = unreal.DirectoryPath(output_directory)
 	output_setting.file_name_format = file_name_format
 
@@ -61,9 +234,29 @@ def add_render_job(pipeline_queue, level_sequence, output_frame_step, use_tsr):
 
 	output_setting.zero_pad_frame_numbers = 4
 	output_setting.output_frame_step = output_frame_step
+	return
+
+def create_render_config(output_directory, file_name_format, output_frame_step, use_tsr):
+	"""
+	PNG render configuration, shared by all jobs with same output format
+	"""
+	global preview_mode
+
+	config = unreal.MoviePipelineMasterConfig()
+
+	# Add deferred rendering
+	deferred_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineDeferredPassBase)
+
+	# Set output type PNG
+	jpg_setting = config.find_setting_by_class(unreal.MoviePipelineImageSequenceOutput_JPG)
+	if jpg_setting is not None:
+		config.remove_setting(jpg_setting)
+	config.find_or_add_setting_by_class(unreal.MoviePipelineImageSequenceOutput_PNG)
+
+	add_output_setting(config, output_directory, file_name_format, output_frame_step)
 
 	# Anti-aliasing
-	antialiasing_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
+	antialiasing_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
 
 	if preview_mode:
 		antialiasing_setting.spatial_sample_count = 1
@@ -84,56 +277,29 @@ def add_render_job(pipeline_queue, level_sequence, output_frame_step, use_tsr):
 
 	# Ensure proper Lumen warmup at frame 0, especially when rendering with frame skipping (6 fps)
 	antialiasing_setting.render_warm_up_frames = True
-	antialiasing_setting.engine_warm_up_count = 32
-
-# Setup exr render job for generating depth map and segmentation masks
-def add_render_job_exr(pipeline_queue, level_sequence, output_frame_step):
-	global preview_mode
-	global output_dir
+	antialiasing_setting.engine_warm_up_count = ENGINE_WARM_UP_COUNT
 
-	level_sequence_name = level_sequence.get_name()
-	# Create new movie pipeline job and set job parameters
-	job = pipeline_queue.allocate_new_job(unreal.MoviePipelineExecutorJob)
-	job.set_editor_property('job_name', level_sequence_name + "_exr")
-	job.set_editor_property('sequence', unreal.SoftObjectPath(level_sequence.get_path_name()))
-
-	current_level = unreal.EditorLevelUtils.get_levels(unreal.EditorLevelLibrary.get_editor_world())[0]
-	map_path = unreal.SystemLibrary.get_path_name(unreal.SystemLibrary.get_outer_object(current_level))
-	job.set_editor_property('map', unreal.SoftObjectPath(map_path))
+	return config
 
-	job.set_editor_property('author', "BEDLAM")
+def create_render_config_exr(output_directory, file_name_format, output_frame_step):
+	"""
+	EXR render configuration for depth map and segmentation masks, shared by all jobs with same output format
+	"""
+	config = unreal.MoviePipelineMasterConfig()
 
 	# Set output type EXR
-	jpg_setting = job.get_configuration().find_setting_by_class(unreal.MoviePipelineImageSequenceOutput_JPG)
+	jpg_setting = config.find_setting_by_class(unreal.MoviePipelineImageSequenceOutput_JPG)
 	if jpg_setting is not None:
-		job.get_configuration().remove_setting(jpg_setting)
+		config.remove_setting(jpg_setting)
 
-	exr_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineImageSequenceOutput_EXR)
+	exr_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineImageSequenceOutput_EXR)
 	exr_setting.compression = unreal.EXRCompressionFormat.ZIP # ZIP results in better compression than PIZ when including segmentation masks (ObjectIds)
 	exr_setting.multilayer = True
 
-	output_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineOutputSetting)
-
-	output_directory = output_dir + "\\exr\\{sequence_name}"
-	file_name_format = "{sequence_name}_{frame_number}"
-
-	if preview_mode:
-		output_directory += "_preview"
-		file_name_format += "_preview"
-
-	output_setting.output_directory = unreal.DirectoryPath(output_directory)
-	output_setting.file_name_format = file_name_format
-
-	if preview_mode:
-		output_setting.output_resolution = unreal.IntPoint(640, 360)
-	else:
-		output_setting.output_resolution = unreal.IntPoint(1280, 720)
-
-	output_setting.zero_pad_frame_numbers = 4
-	output_setting.output_frame_step = output_frame_step
+	add_output_setting(config, output_directory, file_name_format, output_frame_step)
 
 	# Anti-aliasing: Disable for depth/mask rendering
-	antialiasing_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
+	antialiasing_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
 
 	antialiasing_setting.spatial_sample_count = 1
 	antialiasing_setting.temporal_sample_count = 1
@@ -142,10 +308,10 @@ def add_render_job_exr(pipeline_queue, level_sequence, output_frame_step):
 
 	# Ensure proper Lumen warmup at frame 0, especially when rendering with frame skipping (6 fps)
 	antialiasing_setting.render_warm_up_frames = True
-	antialiasing_setting.engine_warm_up_count = 32
+	antialiasing_setting.engine_warm_up_count = ENGINE_WARM_UP_COUNT
 
 	# Deferred renderer
-	deferred_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineDeferredPassBase)
+	deferred_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineDeferredPassBase)
 
 	# Depth and motion vectors
 	deferred_setting.use32_bit_post_process_materials = True # export 32-bit float depth
@@ -158,9 +324,163 @@ def add_render_job_exr(pipeline_queue, level_sequence, output_frame_step):
 
 	# Segmentation mask (Object ID) render setup
 	deferred_setting.disable_multisample_effects = True
-	objectid_setting = job.get_configuration().find_or_add_setting_by_class(unreal.MoviePipelineObjectIdRenderPass)
+	objectid_setting = config.find_or_add_setting_by_class(unreal.MoviePipelineObjectIdRenderPass)
 	objectid_setting.id_type = unreal.MoviePipelineObjectIdPassIdType.LAYER
 
+	return config
+
+def get_render_config(output_type, output_frame_step, use_tsr, shots=None, views=None):
+	"""
+	Shared render configuration for output type (png, exr) and output format, created once per queue setup
+	"""
+	global render_configs
+
+	(output_directory, file_name_format) = get_output_format(output_type, shots, views)
+	key = (output_type, output_directory, file_name_format, output_frame_step, use_tsr)
+	if key not in render_configs:
+		if output_type == "exr":
+			render_configs[key] = create_render_config_exr(output_directory, file_name_format, output_frame_step)
+		else:
+			render_configs[key] = create_render_config(output_directory, file_name_format, output_frame_step, use_tsr)
+	return render_configs[key]
+
+def add_job(pipeline_queue, job_name, sequence_path, map_path, config, shots=None, views=None):
+	"""
+	New render job with copy of shared render configuration
+	"""
+	# Create new movie pipeline job and set job parameters
+	job = pipeline_queue.allocate_new_job(unreal.MoviePipelineExecutorJob)
+	job.set_editor_property('job_name', job_name)
+	job.set_editor_property('sequence', unreal.SoftObjectPath(sequence_path))
+	job.set_editor_property('map', unreal.SoftObjectPath(map_path))
+	job.set_editor_property('author', "BEDLAM")
+	job.set_configuration(config)
+
+	antialiasing_setting = config.find_setting_by_class(unreal.MoviePipelineAntiAliasingSetting)
+	if shots is not None:
+		add_shot_warm_up_overrides(job, sequence_path, get_short_warm_up_shots(shots), antialiasing_setting)
+	elif views:
+		add_shot_warm_up_overrides(job, sequence_path, views[1:], antialiasing_setting)
+
+	return job
+
+def add_render_job(pipeline_queue, sequence_name, sequence_path, map_path, output_frame_step, use_tsr, shots=None, views=None):
+	"""
+	sequence_path: LevelSequence object path, the LevelSequence is not loaded
+	shots: render master LevelSequence with packed shots (see create_master_sequence()), images are written per shot
+	views: camera views of multi-camera LevelSequence (see get_sequence_views()), images are written per view
+	"""
+	config = get_render_config("png", output_frame_step, use_tsr, shots, views)
+	return add_job(pipeline_queue, sequence_name, sequence_path, map_path, config, shots, views)
+
+# Setup exr render job for generating depth map and segmentation masks
+def add_render_job_exr(pipeline_queue, sequence_name, sequence_path, map_path, output_frame_step, shots=None, views=None):
+	config = get_render_config("exr", output_frame_step, False, shots, views)
+	return add_job(pipeline_queue, sequence_name + "_exr", sequence_path, map_path, config, shots, views)
+
+def get_num_output_frames(frames, output_frame_step):
+	return len(range(0, frames, output_frame_step))
+
+def get_rendered_frames(output_type, name):
+	"""
+	Output frames of sequence or camera view with image and camera ground truth, frames without camera ground truth are rendered again
+	"""
+	global preview_mode
+	global output_dir
+
+	image_dir = Path(output_dir) / output_type / (name + ("_preview" if preview_mode else ""))
+	camera_csv_name = f"{name}_camera.csv" if output_type == "png" else f"{name}_exr_camera.csv"
+	camera_csv_path = Path(output_dir) / "ground_truth" / "camera" / camera_csv_name
+	if (not image_dir.is_dir()) or (not camera_csv_path.exists()):
+		return set()
+
+	image_pattern = re.compile(re.escape(name) + r"_(\d+)(?:_preview)?\." + output_type)
+	image_frames = set()
+	for entry in os.scandir(image_dir):
+		match = image_pattern.fullmatch(entry.name)
+		if match and (entry.stat().st_size > 0): # empty files of interrupted renders
+			image_frames.add(int(match.group(1)))
+
+	# Image name: seq_000000_0000.png
+	camera_frames = set()
+	with open(camera_csv_path, "r") as f:
+		for line in f.read().splitlines()[1:]:
+			camera_frames.add(int(line.split(",", 1)[0].rsplit("_", 1)[-1].split(".")[0]))
+
+	return image_frames & camera_frames
+
+def has_output(names, output_types):
+	"""
+	Fast check without directory scan, sequences or camera views without output directories are not rendered yet
+	"""
+	return any((Path(output_dir) / output_type / (name + ("_preview" if preview_mode else ""))).is_dir() for name in names for output_type in output_types)
+
+def get_resume_state(level_sequence, views, output_types, output_frame_step):
+	"""
+	Missing output frames per output type (png, exr) for all camera views of the sequence, empty list: all frames rendered
+	"""
+	names = [f"{level_sequence.get_name()}_{view}" for view in views]
+	if len(names) == 0:
+		names = [level_sequence.get_name()]
+
+	resume_state = {}
+	for output_type in output_types:
+		resume_state[output_type] = []
+		for name in names:
+			rendered_frames = get_rendered_frames(output_type, name)
+			resume_state[output_type].extend(frame for frame in range(0, level_sequence.get_playback_end(), output_frame_step) if frame not in rendered_frames)
+	return resume_state
+
+def is_not_rendered(level_sequence, resume_state, output_frame_step):
+	num_output_frames = get_num_output_frames(level_sequence.get_playback_end(), output_frame_step)
+	return all(len(missing_frames) == num_output_frames for missing_frames in resume_state.values())
+
+def set_resume_range(job, playback_start, missing_frames, output_frame_step):
+	"""
+	Render only the range of missing frames, preceded by the sequence warm up frames.
+	Range starts on output frame step so that the same sequence frames are rendered as without resume.
+	Camera views share the range of the missing frames of all views.
+	"""
+	start_frame = min(missing_frames) + playback_start # negative playback start: warm up frames
+	start_frame -= start_frame % output_frame_step
+	if start_frame < playback_start:
+		start_frame = playback_start + (-playback_start) % output_frame_step # first frame on output frame step in playback range
+	end_frame = max(missing_frames) + 1
+
+	output_setting = job.get_configuration().find_setting_by_class(unreal.MoviePipelineOutputSetting)
+	output_setting.use_custom_playback_range = True
+	output_setting.custom_start_frame = start_frame
+	output_setting.custom_end_frame = end_frame
+	return [start_frame, end_frame]
+
+def add_sequence_render_jobs(pipeline_queue, sequence_name, sequence_path, map_path, output_frame_step, use_tsr, generate_exr, render_shots, render_resume, level_sequence=None, views=[], resume_state=None):
+	"""
+	PNG and optional EXR render job of unpacked sequence.
+	resume_state: missing frames per output type (see get_resume_state()), outputs with all frames are skipped
+	and partially rendered sequences only render the frame range of the missing frames of all camera views
+	"""
+	output_types = ["png", "exr"] if generate_exr else ["png"]
+	for output_type in output_types:
+		missing_frames = None
+		if resume_state is not None:
+			missing_frames = resume_state[output_type]
+			if len(missing_frames) == 0:
+				unreal.log(f"  Skipping {output_type} render job (all frames rendered): {sequence_name}")
+				continue
+
+		if output_type == "exr":
+			# Render depth and segmentation masks into multilayer EXR file
+			job = add_render_job_exr(pipeline_queue, sequence_name, sequence_path, map_path, output_frame_step, views=views)
+		else:
+			job = add_render_job(pipeline_queue, sequence_name, sequence_path, map_path, output_frame_step, use_tsr, views=views)
+
+		if len(views) > 0:
+			render_shots[job.job_name] = [[f"{sequence_name}_{view}", level_sequence.get_playback_end()] for view in views]
+		if (missing_frames is not None) and (len(missing_frames) < max(len(views), 1) * get_num_output_frames(level_sequence.get_playback_end(), output_frame_step)):
+			render_resume[job.job_name] = set_resume_range(job, level_sequence.get_playback_start(), missing_frames, output_frame_step)
+			unreal.log(f"  Resuming {job.job_name}: missing frames: {len(missing_frames)}, frame range: {render_resume[job.job_name]}")
+	return
+
 ###############################################################################
 # Main
 ###############################################################################
@@ -168,22 +488,20 @@ if __name__ == '__main__':
 
 	unreal.log('BEDLAM: Setup Movie Render Queue render jobs for selected level sequences')
 
+	package_path = None
+	name_filter = None
+	if len(sys.argv) >= 4:
+		package_path = sys.argv[3]
+	if len(sys.argv) >= 5:
+		name_filter = sys.argv[4]
+
 	if len(sys.argv) >= 2:
 		output_dir = sys.argv[1]
 
-	output_frame_step = 1
-	use_tsr = False
-	generate_exr = False
-
+	render_preset = RenderPreset()
 	if len(sys.argv) >= 3:
-		values = sys.argv[2].split("_")
-		output_frame_step = int(values[0])
-		if "TSR" in values:
-			use_tsr = True
-
-		if "DepthMask" in values:
-			generate_exr = True # generate depth map and segmentation masks in .exr file (separate render pass)
-
+		render_preset = parse_render_preset(sys.argv[2])
+	(output_frame_step, use_tsr, generate_exr, pack_size, resume) = render_preset
 
 	# Setup movie render queue
 	subsystem = unreal.get_editor_subsystem(unreal.MoviePipelineQueueSubsystem)
@@ -194,7 +512,41 @@ if __name__ == '__main__':
 		for job in pipeline_queue.get_jobs():
 			pipeline_queue.delete_job(job)
 
-	selection = unreal.EditorUtilityLibrary.get_selected_assets() # Loads all selected assets into memory
+	map_path = get_map_path()
+	output_types = ["png", "exr"] if generate_exr else ["png"]
+	render_shots = {}
+	render_resume = {}
+
+	# Asset registry mode: LevelSequences are not loaded except multi-camera sequences and resumed sequences, no packing
+	if package_path is not None:
+		sequences = find_level_sequences(package_path, name_filter)
+		unreal.log(f"  Adding {len(sequences)} LevelSequences from asset registry: {package_path}")
+		if pack_size > 1:
+			unreal.log_warning("  Packing (PackN) needs loaded LevelSequences, ignored in asset registry mode")
+		view_sequences = find_camera_view_sequences(unreal.Paths.convert_relative_path_to_full(unreal.Paths.project_content_dir()), package_path)
+
+		for (sequence_name, sequence_path) in sequences:
+			level_sequence = None
+			views = []
+			if sequence_name in view_sequences:
+				level_sequence = unreal.load_asset(sequence_path) # multi-camera sequences are loaded for their camera views
+				views = get_sequence_views(level_sequence)
+				unreal.log(f"  Camera views: {sequence_name}: {', '.join(views)}")
+
+			resume_state = None
+			output_names = [f"{sequence_name}_{view}" for view in views] if len(views) > 0 else [sequence_name]
+			if resume and has_output(output_names, output_types):
+				if level_sequence is None:
+					level_sequence = unreal.load_asset(sequence_path) # only sequences with existing output are loaded for their frame range
+				resume_state = get_resume_state(level_sequence, views, output_types, output_frame_step)
+
+			add_sequence_render_jobs(pipeline_queue, sequence_name, sequence_path, map_path, output_frame_step, use_tsr, generate_exr, render_shots, render_resume, level_sequence, views, resume_state)
+
+	selection = []
+	if package_path is None:
+		selection = unreal.EditorUtilityLibrary.get_selected_assets() # Loads all selected assets into memory
+
+	level_sequences = []
 	for asset in selection:
 		if not isinstance(asset, unreal.LevelSequence):
 			unreal.log_error(f"  Ignoring (no LevelSequence): {asset.get_full_name()}")
@@ -202,9 +554,51 @@ if __name__ == '__main__':
 
 		level_sequence = asset
 		unreal.log(f"  Adding: {level_sequence.get_full_name()}")
+		level_sequences.append(level_sequence)
+
+	resume_states = {} # LevelSequence name -> missing frames per output type
+	if resume:
+		for level_sequence in level_sequences:
+			resume_states[level_sequence.get_name()] = get_resume_state(level_sequence, get_sequence_views(level_sequence), output_types, output_frame_step)
+
+	# Multi-camera sequences render their views as shots of one job and are not packed, resumed sequences are rendered in their own jobs
+	packed_sequences = []
+	if pack_size > 1:
+		packed_sequences = [level_sequence for level_sequence in level_sequences if len(get_sequence_views(level_sequence)) == 0]
+		if resume:
+			packed_sequences = [level_sequence for level_sequence in packed_sequences if is_not_rendered(level_sequence, resume_states[level_sequence.get_name()], output_frame_step)]
+
+	for level_sequence in level_sequences:
+		if level_sequence in packed_sequences:
+			continue
 
-		add_render_job(pipeline_queue, level_sequence, output_frame_step, use_tsr)
-		if generate_exr:
-			# Render depth and segmentation masks into multilayer EXR file
-			add_render_job_exr(pipeline_queue, level_sequence, output_frame_step)
+		views = get_sequence_views(level_sequence)
+		if len(views) > 0:
+			unreal.log(f"  Camera views: {level_sequence.get_name()}: {', '.join(views)}")
+
+		add_sequence_render_jobs(pipeline_queue, level_sequence.get_name(), level_sequence.get_path_name(), map_path, output_frame_step, use_tsr, generate_exr, render_shots, render_resume, level_sequence, views, resume_states.get(level_sequence.get_name()))
 
+	# Group sequences with same HDRI so that packed shots can use short warm up
+	packed_sequences.sort(key=lambda level_sequence: (get_sequence_hdri(level_sequence) or "", level_sequence.get_name()))
+	for start_index in range(0, len(packed_sequences), pack_size):
+		pack = packed_sequences[start_index:start_index + pack_size]
+		name = f"{pack[0].get_name()}_pack{len(pack):02}"
+		unreal.log(f"  Packing {len(pack)} sequences into master sequence: {name}")
+		(master_sequence, shots) = create_master_sequence(name, pack, output_frame_step)
+
+		job = add_render_job(pipeline_queue, name, master_sequence.get_path_name(), map_path, output_frame_step, use_tsr, shots)
+		render_shots[job.job_name] = [[shot_name, frames] for (shot_name, frames, _) in shots]
+		if generate_exr:
+			job = add_render_job_exr(pipeline_queue, name, master_sequence.get_path_name(), map_path, output_frame_step, shots)
+			render_shots[job.job_name] = [[shot_name, frames] for (shot_name, frames, _) in shots]
+
+	# Always written so that shots of previous queue setups in same output folder are not used
+	render_shots_path = Path(output_dir) / render_shots_name
+	unreal.log(f"  Saving render shots: {render_shots_path}")
+	render_shots_path.parent.mkdir(parents=True, exist_ok=True)
+	save_json(str(render_shots_path), render_shots)
+
+	# Always written so that existing camera ground truth is only merged for jobs of this queue setup
+	render_resume_path = Path(output_dir) / render_resume_name
+	unreal.log(f"  Saving resumed render jobs: {render_resume_path}")
+	save_json(str(render_resume_path), render_resume)
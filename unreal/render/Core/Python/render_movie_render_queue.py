@@ -7,15 +7,271 @@
 #   Python Editor Script Plugin
 #   Unreal 5.0.3+
 #
+# Camera ground truth is read incrementally from the project logfile, each job only parses the log lines written since the previous job.
+# The ground truth logger starts the camera log of a job with BEDLAM_CAMERA_START:SequenceName, camera logs are matched to jobs by
+# sequence name and their number of frames is checked against the output frames of the job (shots and resumed frame ranges).
+# Logfile parsing and .csv export run on a background thread so that the next render job starts without waiting for the export.
+# If NumPy is available in Unreal Python, each sequence also gets a .npz file with precomputed camera matrices (be_camera_ground_truth.py).
+# Camera ground truth of resumed render jobs (be_render_resume.json) is merged with the existing camera ground truth of the sequence.
+#
+# Render throughput of each job is appended to be_render_telemetry.jsonl in the output folder, one JSON record per line:
+#   wall time since previous job finished (first job: since queue start), rendered frames (camera ground truth lines),
+#   warm up overhead until the first output image was written, frames per second after warm up and output bytes.
+# Summarize with tools/render_planning/be_render_telemetry.py, fit render cost models with tools/render_planning/be_render_shards.py.
+#
+from datetime import datetime
+import json
+import os
 from pathlib import Path
+import platform
+import queue
 import re
 import sys
+import threading
+import time
 import unreal
 
+try:
+    from be_camera_ground_truth import save_camera_npz
+except ImportError:
+    save_camera_npz = None # No NumPy in Unreal Python, convert .csv files offline with be_camera_ground_truth.py
+
 # Globals
 output_dir = r"C:\bedlam\images\test"
+render_shots_name = "be_render_shots.json" # Shots of packed and multi-camera render jobs, see create_movie_render_queue.py
+render_resume_name = "be_render_resume.json" # Frame ranges of resumed render jobs, see create_movie_render_queue.py
+render_telemetry_name = "be_render_telemetry.jsonl" # Render throughput per job, appended
 
 pipeline_executor = None
+camera_log = None # CameraLogTailer of project logfile
+camera_export = None # CameraExportWorker
+render_shots = {}
+render_resume = {}
+job_start_time = None # Wall clock time [s] when current job started, comparable to output file modification times
+
+camera_log_wait_time = 10.0 # [s] Maximum wait for camera data of finished job which is not yet written to the logfile
+
+CAMERA_LOG_PATTERN = re.compile(rb"BEDLAM_CAMERA(?:_START(?::([^\r\n]*))?|:([^\r\n]*))")
+CAMERA_DATA_PATTERN = re.compile(r"(\d+),(.+)")
+
+class CameraLog:
+    """
+    Camera data lines after a BEDLAM_CAMERA_START line, name: SequenceName of ground truth logger, None for loggers without name
+    """
+    def __init__(self, name):
+        self.name = name
+        self.lines = []
+        self.exported = False
+        self.late_lines = 0 # Lines written after export
+
+class CameraLogTailer:
+    """
+    Reads camera ground truth of finished jobs from the growing project logfile.
+    Remembers the byte offset of the last read so that only new log bytes are parsed. Each BEDLAM_CAMERA_START:SequenceName line
+    starts a camera log which is matched to the job by sequence name, so that jobs which failed before the ground truth logger
+    started or camera logs of the next job do not shift the camera data of later jobs.
+    Camera logs without sequence name (BEDLAM_CAMERA_START) are assigned in job order.
+    Logfile rotation (new file or file smaller than offset) restarts at the beginning of the new file.
+    """
+    def __init__(self, logfile_path, wait_time=camera_log_wait_time):
+        self.logfile_path = logfile_path
+        self.wait_time = wait_time
+        self.offset = 0
+        self.file_id = None
+        self.partial_line = b""
+        self.camera_logs = [] # CameraLog of started jobs, oldest first, last exported log is kept to detect late lines
+        self.unassigned_lines = 0 # Camera data lines before first BEDLAM_CAMERA_START
+        self.errors = []
+        self.bytes_read = 0
+
+    def get_file_id(self, stat):
+        return (stat.st_dev, stat.st_ino)
+
+    def skip_to_end(self):
+        """
+        Ignore existing log content, camera logs of previous renders in same editor session are not used
+        """
+        if self.logfile_path.exists():
+            stat = os.stat(self.logfile_path)
+            self.file_id = self.get_file_id(stat)
+            self.offset = stat.st_size
+        return
+
+    def read(self):
+        if not self.logfile_path.exists():
+            return
+
+        with open(self.logfile_path, "rb") as fp:
+            stat = os.fstat(fp.fileno())
+            file_id = self.get_file_id(stat)
+            if (file_id != self.file_id) or (stat.st_size < self.offset):
+                # Rotated logfile
+                self.offset = 0
+                self.partial_line = b""
+                self.file_id = file_id
+
+            fp.seek(self.offset)
+            data = fp.read()
+
+        self.offset += len(data)
+        self.bytes_read += len(data)
+
+        # Only parse complete lines, unfinished last line is parsed with next read
+        data = self.partial_line + data
+        line_end = data.rfind(b"\n") + 1
+        self.partial_line = data[line_end:]
+
+        for match in CAMERA_LOG_PATTERN.finditer(data, 0, line_end):
+            if match.group(2) is None:
+                name = match.group(1).decode("utf-8", errors="replace").strip() if match.group(1) is not None else ""
+                self.camera_logs.append(CameraLog(name if len(name) > 0 else None))
+            elif len(self.camera_logs) == 0:
+                self.unassigned_lines += 1
+            elif self.camera_logs[-1].exported:
+                self.camera_logs[-1].late_lines += 1
+            else:
+                self.camera_logs[-1].lines.append(match.group(2).decode("utf-8", errors="replace"))
+        return
+
+    def find_log(self, names):
+        """
+        Index of first unexported camera log of the sequence names or without sequence name, None if not found
+        """
+        for (index, camera_log) in enumerate(self.camera_logs):
+            if (not camera_log.exported) and ((camera_log.name is None) or (camera_log.name in names)):
+                return index
+        return None
+
+    def get_next(self, names, expected_frames=None):
+        """
+        Camera data lines of next finished job, None if job did not log camera data.
+        names: sequence names of the job (get_job_sequence_names())
+        expected_frames: camera data lines of the job if known, waits up to wait_time for lines which are not yet written
+        Unexported camera logs of other sequences before the matched log belong to failed jobs and are discarded.
+        """
+        deadline = time.monotonic() + self.wait_time
+        while True:
+            self.read()
+            index = self.find_log(names)
+            frames = len(self.camera_logs[index].lines) if index is not None else 0
+            if (expected_frames is None) or (frames >= expected_frames) or (time.monotonic() >= deadline):
+                break
+            time.sleep(0.1)
+
+        if self.unassigned_lines > 0:
+            self.errors.append(f"{self.unassigned_lines} camera data lines without BEDLAM_CAMERA_START ignored")
+            self.unassigned_lines = 0
+
+        if index is None:
+            return None
+
+        for camera_log in self.camera_logs[:index]:
+            if not camera_log.exported:
+                self.errors.append(f"Camera log of sequence {camera_log.name} does not belong to a finished job, ignored")
+
+        # Keep exported camera log to count lines which are written after its export
+        camera_log = self.camera_logs[index]
+        camera_log.exported = True
+        self.report_late_lines(self.camera_logs[:index])
+        self.camera_logs = self.camera_logs[index:]
+        return camera_log.lines
+
+    def report_late_lines(self, camera_logs):
+        for camera_log in camera_logs:
+            if camera_log.late_lines > 0:
+                self.errors.append(f"{camera_log.late_lines} camera data lines of sequence {camera_log.name} were written after its export, ignored")
+        return
+
+    def finish(self):
+        """
+        Report camera data lines which were written after the export of the last job
+        """
+        self.read()
+        self.report_late_lines(self.camera_logs)
+        self.camera_logs = []
+        return
+
+    def get_errors(self):
+        (errors, self.errors) = (self.errors, [])
+        return errors
+
+class CameraExportWorker:
+    """
+    Exports camera ground truth of finished jobs on a background thread, jobs are exported in order of completion.
+    The export does not use the unreal API, its log messages are queued and logged on the editor thread (flush_messages()).
+    Export latency is measured from job completion to written .csv files.
+    Render telemetry of the job is written after its export since it needs the camera log of the job and scans its output images.
+    """
+    def __init__(self):
+        self.jobs = queue.Queue()
+        self.messages = queue.Queue()
+        self.latencies = [] # [job name, latency [s]]
+        self.thread = threading.Thread(target=self.run, name="BEDLAM camera export", daemon=True)
+        self.thread.start()
+
+    def add_job(self, job_name, shots, image_size, merge=False, telemetry=None, expected_frames=None):
+        self.jobs.put((job_name, shots, image_size, merge, telemetry, expected_frames, time.perf_counter()))
+        return
+
+    def run(self):
+        while True:
+            item = self.jobs.get()
+            if item is None:
+                return
+
+            (job_name, shots, image_size, merge, telemetry, expected_frames, finish_time) = item
+            output = []
+            try:
+                output = read_camera_log(job_name, shots, expected_frames)
+                if shots is None:
+                    export_camera_data(job_name, output, image_size, merge)
+                else:
+                    export_camera_data_shots(job_name, shots, image_size, output, merge)
+            except Exception as e:
+                self.log_error(f"Camera data export failed: {job_name}: {e}")
+
+            if telemetry is not None:
+                try:
+                    write_render_telemetry(telemetry, output)
+                except Exception as e:
+                    self.log_error(f"Render telemetry failed: {job_name}: {e}")
+
+            latency = time.perf_counter() - finish_time
+            self.latencies.append([job_name, latency])
+            self.log(f"BEDLAM: Camera data export finished: {job_name}, latency: {1000.0 * latency:.1f}ms")
+
+    def log(self, message):
+        self.messages.put((False, message))
+        return
+
+    def log_error(self, message):
+        self.messages.put((True, message))
+        return
+
+    def flush_messages(self):
+        while True:
+            try:
+                (is_error, message) = self.messages.get_nowait()
+            except queue.Empty:
+                return
+
+            if is_error:
+                unreal.log_error(message)
+            else:
+                unreal.log(message)
+
+    def drain(self):
+        """
+        Wait until all queued exports are written and stop thread
+        """
+        self.jobs.put(None)
+        self.thread.join()
+        self.flush_messages()
+
+        if len(self.latencies) > 0:
+            latencies = [latency for (_, latency) in self.latencies]
+            unreal.log(f"BEDLAM: Camera data export latency: jobs={len(latencies)}, mean={1000.0 * sum(latencies) / len(latencies):.1f}ms, max={1000.0 * max(latencies):.1f}ms")
+        return
 
 """
     Summary:
@@ -25,6 +281,13 @@ pipeline_executor = None
 """
 def OnQueueFinishedCallback(executor, success):
 	unreal.log("Render queue completed. Success: " + str(success))
+
+	# Wait for camera ground truth of last jobs
+	camera_export.drain()
+	camera_log.finish()
+	for error in camera_log.get_errors():
+		unreal.log_error(error)
+	unreal.log(f"Camera ground truth: parsed {camera_log.bytes_read} new logfile bytes")
     
 	# Delete our reference too so we don"t keep it alive.
 	global pipeline_executor
@@ -38,59 +301,261 @@ def OnQueueFinishedCallback(executor, success):
         editor world.
 """
 def OnIndividualJobFinishedCallback(job, success):
+    global job_start_time
+
+    finish_time = time.time()
+    unreal.log(f"Individual job completed: success={success}, time: {finish_time - job_start_time:.1f}s")
+
+    # Export camera ground truth to .csv and write render telemetry on background thread
+    camera_export.flush_messages()
+    output_setting = job.get_configuration().find_setting_by_class(unreal.MoviePipelineOutputSetting)
+    image_size = (output_setting.output_resolution.x, output_setting.output_resolution.y) if output_setting is not None else None
+    shots = render_shots.get(job.job_name)
+    telemetry = get_render_telemetry(job, output_setting, shots, success, job_start_time, finish_time)
+    expected_frames = get_expected_frames(job.job_name, shots, output_setting) if success else None
+    camera_export.add_job(job.job_name, shots, image_size, job.job_name in render_resume, telemetry, expected_frames)
+
+    # Next job starts now, its wall time includes PIE startup and warm up
+    job_start_time = finish_time
+
+def get_expected_frames(job_name, shots, output_setting):
+    """
+    Number of camera data lines of job: output frames of its shots, limited to the frame range of resumed jobs.
+    None if unknown, frame ranges of unpacked sequences are not available without loading them.
+    """
+    if output_setting is None:
+        return None
+
+    output_frame_step = output_setting.output_frame_step
+    frame_range = render_resume.get(job_name)
+    if shots is None:
+        if frame_range is None:
+            return None
+        shots = [[job_name, frame_range[1]]]
+
+    # No camera data for warm up frames
+    (start_frame, end_frame) = (max(frame_range[0], 0), frame_range[1]) if frame_range is not None else (0, None)
+    return sum(len(range(start_frame, frames if end_frame is None else min(frames, end_frame), output_frame_step)) for (_, frames) in shots)
+
+def get_render_telemetry(job, output_setting, shots, success, start_time, finish_time):
+    """
+    Render telemetry record of finished job, completed on export thread (write_render_telemetry())
+    """
+    # Output directories of the job: one per sequence, packed shot or camera view (create_movie_render_queue.py get_output_format())
+    output_directories = []
+    if output_setting is not None:
+        output_directory = output_setting.output_directory.path
+        base_dir = output_directory.split("{", 1)[0].rstrip("\\/")
+        suffix = output_directory.rsplit("}", 1)[-1] if "}" in output_directory else ""
+        sequence_name = job.job_name[:-len("_exr")] if job.job_name.endswith("_exr") else job.job_name
+        names = [shot_name for (shot_name, _) in shots] if shots is not None else [sequence_name]
+        output_directories = [os.path.join(base_dir, name + suffix) for name in names]
+
+    telemetry = {
+        "job_name": job.job_name,
+        "node": platform.node(),
+        "engine_version": unreal.SystemLibrary.get_engine_version(),
+        "start": datetime.fromtimestamp(start_time).isoformat(timespec="milliseconds"),
+        "time": finish_time - start_time,
+        "success": success,
+        "resumed": job.job_name in render_resume,
+        "output_directories": output_directories,
+    }
+    if shots is not None:
+        telemetry["shots"] = [shot_name for (shot_name, _) in shots]
+    return telemetry
+
+def get_output_files_since(output_directories, start_time):
+    """
+    Number, total size and earliest modification time of files written since start time
+    """
+    files = 0
+    output_bytes = 0
+    first_time = None
+    for output_directory in output_directories:
+        if not os.path.isdir(output_directory):
+            continue
+        for entry in os.scandir(output_directory):
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if stat.st_mtime < start_time:
+                continue # Existing image of resumed job
+            files += 1
+            output_bytes += stat.st_size
+            first_time = stat.st_mtime if first_time is None else min(first_time, stat.st_mtime)
+    return (files, output_bytes, first_time)
+
+def write_render_telemetry(telemetry, output):
+    """
+    Add frames, warm up and output size to telemetry record and append it to render telemetry file.
+    output: camera data lines of the job, one per rendered image
+    """
+    start_time = datetime.fromisoformat(telemetry["start"]).timestamp()
+    (output_files, output_bytes, first_time) = get_output_files_since(telemetry.pop("output_directories"), start_time)
+
+    frames = sum(1 for line in output if CAMERA_DATA_PATTERN.search(line))
+    warmup = None
+    render_time = telemetry["time"]
+    if first_time is not None:
+        # Output images are written when the first frame is finished, warm up includes PIE startup and warm up frames
+        warmup = min(max(first_time - start_time, 0.0), render_time)
+        render_time -= warmup
+
+    telemetry["frames"] = frames
+    telemetry["frames_per_second"] = frames / render_time if render_time > 0.0 else None
+    telemetry["camera_data"] = frames > 0 # No frame count if camera log of job was not found, not used for throughput and cost model
+    telemetry["warmup"] = warmup
+    telemetry["output_files"] = output_files
+    telemetry["output_bytes"] = output_bytes
+
+    # Single write per record so that nodes sharing an output folder do not interleave lines
+    with open(Path(output_dir) / render_telemetry_name, "a") as fp:
+        fp.write(json.dumps(telemetry) + "\n")
+
+    camera_export.log(f"BEDLAM: Render telemetry: {telemetry['job_name']}, frames: {frames}, time: {telemetry['time']:.1f}s, warm up: {'n/a' if warmup is None else f'{warmup:.1f}s'}, output: {output_bytes / 1e6:.1f}MB")
+    return
+
+def load_render_shots():
+    """
+    Shots of packed and multi-camera render jobs (create_movie_render_queue.py), job name -> list of [sequence or view name, frames]
+    """
+    return load_json(Path(output_dir) / render_shots_name)
+
+def load_render_resume():
+    """
+    Resumed render jobs (create_movie_render_queue.py), job name -> [start frame, end frame]
+    """
+    return load_json(Path(output_dir) / render_resume_name)
 
-    unreal.log("Individual job completed: success=" + str(success))
+def load_json(path):
+    if not path.exists():
+        return {}
 
-    # Export camera ground truth to .csv
-    sequence_name = job.job_name
-    export_camera_data(sequence_name)
+    with open(path, "r") as fp:
+        return json.load(fp)
 
-def export_camera_data(sequence_name):
+def get_logfile_path():
+    logfile_dir = unreal.Paths.project_log_dir()
+    project_path = unreal.Paths.get_project_file_path()
+    (path, logfile_name, ext) = unreal.Paths.split(project_path)
+    return Path(logfile_dir) / f"{logfile_name}.log"
+
+def get_job_sequence_names(job_name, shots=None):
+    """
+    Sequence names which the ground truth logger of the job logs in BEDLAM_CAMERA_START: sequence of unpacked and camera view jobs,
+    shots of packed jobs
+    """
+    names = { job_name[:-len("_exr")] if job_name.endswith("_exr") else job_name }
+    if shots is not None:
+        names.update(shot_name for (shot_name, _) in shots)
+    return names
+
+def read_camera_log(job_name, shots=None, expected_frames=None):
+    """
+    Camera data lines of finished job from project logfile
+    """
+    output = camera_log.get_next(get_job_sequence_names(job_name, shots), expected_frames)
+    for error in camera_log.get_errors():
+        camera_export.log_error(error)
+
+    if output is None:
+        camera_export.log_error(f"No camera data in project logfile for finished job: {job_name}")
+        return []
+
+    if (expected_frames is not None) and (len(output) != expected_frames):
+        camera_export.log_error(f"Camera data of job {job_name} has {len(output)} frames, expected: {expected_frames}")
+    return output
+
+def read_camera_csv(camera_csv_path):
+    """
+    Existing camera ground truth, frame -> camera data
+    """
+    camera_data = {}
+    with open(camera_csv_path, "r") as fp:
+        for line in fp.read().splitlines()[1:]:
+            (name, data) = line.split(",", 1)
+            # Image name: seq_000000_0000.png
+            camera_data[int(name.rsplit("_", 1)[-1].split(".")[0])] = data
+    return camera_data
+
+def export_camera_data(sequence_name, output=None, image_size=None, merge=False):
+    """
+    image_size: (width, height) of rendered images for .npz intrinsics, default: be_camera_ground_truth.py resolution
+    merge: keep existing camera ground truth of frames which were not rendered again (resumed render job)
+    """
 
     camera_csv_dir = Path(output_dir) / "ground_truth" / "camera"
     camera_csv_dir.mkdir(parents=True, exist_ok=True)
     camera_csv_path = camera_csv_dir / f"{sequence_name}_camera.csv"
 
-    unreal.log(f"BEDLAM: Exporting camera data: {camera_csv_path}")
+    camera_export.log(f"BEDLAM: Exporting camera data: {camera_csv_path}")
 
     # Open project logfile to read camera parameters
-    output = []
-    logfile_dir = unreal.Paths.project_log_dir()
-    project_path = unreal.Paths.get_project_file_path()
-    (path, logfile_name, ext) = unreal.Paths.split(project_path)
-    logfile_path = Path(logfile_dir) / f"{logfile_name}.log"
+    if output is None:
+        output = read_camera_log(sequence_name)
 
-    with open(logfile_path, "r") as fp:
-        lines = fp.readlines()
-        lines.reverse()
+    camera_data = {}
+    if merge and camera_csv_path.exists():
+        camera_data = read_camera_csv(camera_csv_path)
+        camera_export.log(f"BEDLAM: Merging camera data with {len(camera_data)} existing frames")
 
-        output = []
-        for line in lines:
-            line = line.rstrip()
-            if "BEDLAM_CAMERA_START" in line:
-                break
+    for line in output:
+        match = CAMERA_DATA_PATTERN.search(line)
+        if not match:
+            camera_export.log_error("Invalid camera data: " + line)
+            return False
 
-            match = re.search(r"BEDLAM_CAMERA:(.*)", line)
-            if match:
-                output.append(match.group(1))
+        camera_data[int(match.group(1))] = match.group(2)
 
-    output.reverse()
+    # EXR jobs render the same cameras, binary camera data only for image jobs
+    write_npz = (save_camera_npz is not None) and not sequence_name.endswith("_exr")
+    frames = sorted(camera_data) if merge else list(camera_data)
+    rows = []
 
     with open(camera_csv_path, "w") as fp:
         fp.write("name,x,y,z,yaw,pitch,roll,focal_length,sensor_width,sensor_height,hfov\n")
-        for (index, line) in enumerate(output):
-            match = re.search(r"(\d+),(.+)", line)
-            if not match:
-                unreal.log_error("Invalid camera data: " + line)
-                return False
-
-            frame = int(match.group(1))
+        for frame in frames:
             name = f"{sequence_name}_{frame:04d}.png"
-            line = match.group(2)
+            fp.write(name + "," + camera_data[frame] + "\n")
+            if write_npz:
+                rows.append([float(value) for value in camera_data[frame].split(",")])
 
-            fp.write(name + "," + line + "\n")
+    if write_npz:
+        if image_size is None:
+            save_camera_npz(camera_csv_path.with_suffix(".npz"), frames, rows)
+        else:
+            save_camera_npz(camera_csv_path.with_suffix(".npz"), frames, rows, *image_size)
 
-        return True
+    return True
+
+def export_camera_data_shots(job_name, shots, image_size=None, output=None, merge=False):
+    """
+    Split camera data of packed or multi-camera render job per shot, ground truth logger frame numbers restart with every shot
+    merge: keep existing camera ground truth of each shot (resumed multi-camera job)
+    """
+    if output is None:
+        output = read_camera_log(job_name, shots)
+    shot_outputs = []
+    previous_frame = None
+    for line in output:
+        match = CAMERA_DATA_PATTERN.search(line)
+        frame = int(match.group(1)) if match else None
+        if (len(shot_outputs) == 0) or ((frame is not None) and (previous_frame is not None) and (frame <= previous_frame)):
+            shot_outputs.append([])
+        shot_outputs[-1].append(line)
+        previous_frame = frame
+
+    if len(shot_outputs) != len(shots):
+        camera_export.log_error(f"Camera data of job {job_name} has {len(shot_outputs)} shots, expected: {len(shots)}")
+        return False
+
+    # Same file names as unpacked jobs, EXR jobs keep their suffix
+    suffix = "_exr" if job_name.endswith("_exr") else ""
+    for ((sequence_name, frames), shot_output) in zip(shots, shot_outputs):
+        if not export_camera_data(sequence_name + suffix, shot_output, image_size, merge):
+            return False
+    return True
 
 
 ###############################################################################
@@ -102,6 +567,13 @@ if __name__ == "__main__":
     if len(sys.argv) == 2:
         output_dir = sys.argv[1]
 
+    camera_log = CameraLogTailer(get_logfile_path())
+    camera_log.skip_to_end()
+    render_shots = load_render_shots()
+    render_resume = load_render_resume()
+    camera_export = CameraExportWorker()
+    job_start_time = time.time()
+
 	# Process queue
     movie_pipeline_queue_subsystem = unreal.get_editor_subsystem(unreal.MoviePipelineQueueSubsystem)
     pipeline_queue = movie_pipeline_queue_subsystem.get_queue()
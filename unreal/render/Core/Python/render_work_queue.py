@@ -0,0 +1,182 @@
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Render LevelSequences from a render work queue which is shared by multiple render nodes (be_render_work_queue.py)
+#
+# Requirements:
+#   Python Editor Script Plugin
+#   Unreal 5.0.3+
+#
+# Each render node claims the next pending LevelSequence, creates its render jobs (create_movie_render_queue.py), renders them
+# with camera ground truth export (render_movie_render_queue.py), marks the sequence as done and claims the next one until
+# the queue is empty. The lease of the claimed sequence is renewed from the editor tick while rendering.
+# Sequences of crashed nodes are reclaimed after the lease time, use render preset option Resume to only render their missing frames.
+# Packing (PackN) is not used since each claim renders one sequence.
+#
+# Usage:
+#   render_work_queue.py QUEUE_DIR OUTPUT_DIR RENDER_PRESET [PACKAGE_PATH]
+#
+import sys
+import time
+import unreal
+
+from be_render_work_queue import WorkQueue
+import create_movie_render_queue
+import render_movie_render_queue
+
+# Globals
+level_sequences_root = "/Game/Bedlam/LevelSequences"
+HEARTBEAT_INTERVAL = 30.0 # [s], needs to be much shorter than lease time of work queue
+
+work_queue = None
+render_preset = None
+map_path = None
+pipeline_executor = None
+tick_handle = None
+current_sequence = None # Claimed LevelSequence name
+current_success = True
+start_next = False
+time_since_heartbeat = 0.0
+
+def add_sequence_jobs(pipeline_queue, sequence_name):
+    """
+    Render jobs of claimed LevelSequence, returns False if LevelSequence does not exist
+    """
+    sequence_path = f"{level_sequences_root}/{sequence_name}.{sequence_name}"
+    level_sequence = unreal.load_asset(sequence_path)
+    if level_sequence is None:
+        unreal.log_error(f"BEDLAM: LevelSequence not found: {sequence_path}")
+        return False
+
+    views = create_movie_render_queue.get_sequence_views(level_sequence)
+    output_types = ["png", "exr"] if render_preset.generate_exr else ["png"]
+    resume_state = None
+    if render_preset.resume:
+        resume_state = create_movie_render_queue.get_resume_state(level_sequence, views, output_types, render_preset.output_frame_step)
+
+    render_shots = {}
+    render_resume = {}
+    create_movie_render_queue.add_sequence_render_jobs(pipeline_queue, sequence_name, level_sequence.get_path_name(), map_path, render_preset.output_frame_step, render_preset.use_tsr, render_preset.generate_exr, render_shots, render_resume, level_sequence, views, resume_state)
+
+    # Camera ground truth export of render_movie_render_queue.py uses the shots and resume ranges of the current jobs
+    render_movie_render_queue.render_shots = render_shots
+    render_movie_render_queue.render_resume = render_resume
+    return True
+
+def start_next_sequence():
+    """
+    Claim next LevelSequence and start rendering, stops when queue is empty
+    """
+    global current_sequence
+    global current_success
+    global pipeline_executor
+    global start_next
+
+    current_sequence = work_queue.claim()
+    if current_sequence is None:
+        unreal.log(f"BEDLAM: Render work queue finished: {work_queue.get_status()}")
+        unreal.log(f"Camera ground truth: parsed {render_movie_render_queue.camera_log.bytes_read} new logfile bytes")
+        unreal.unregister_slate_post_tick_callback(tick_handle)
+        return
+
+    unreal.log(f"BEDLAM: Claimed LevelSequence: {current_sequence}")
+    current_success = True
+
+    subsystem = unreal.get_editor_subsystem(unreal.MoviePipelineQueueSubsystem)
+    pipeline_queue = subsystem.get_queue()
+    for job in pipeline_queue.get_jobs():
+        pipeline_queue.delete_job(job)
+
+    if not add_sequence_jobs(pipeline_queue, current_sequence):
+        work_queue.finish(current_sequence, False)
+        current_sequence = None
+        start_next = True
+        return
+
+    if len(pipeline_queue.get_jobs()) == 0:
+        # All frames rendered (Resume)
+        work_queue.finish(current_sequence, True)
+        current_sequence = None
+        start_next = True
+        return
+
+    render_movie_render_queue.camera_export = render_movie_render_queue.CameraExportWorker()
+    render_movie_render_queue.job_start_time = time.time()
+    pipeline_executor = subsystem.render_queue_with_executor(unreal.MoviePipelinePIEExecutor)
+    pipeline_executor.on_executor_finished_delegate.add_callable_unique(OnSequenceFinishedCallback)
+    pipeline_executor.on_individual_job_finished_delegate.add_callable_unique(OnIndividualJobFinishedCallback)
+    return
+
+def OnIndividualJobFinishedCallback(job, success):
+    global current_success
+
+    if not success:
+        current_success = False
+    render_movie_render_queue.OnIndividualJobFinishedCallback(job, success)
+
+def OnSequenceFinishedCallback(executor, success):
+    """
+    Mark sequence as done after its camera ground truth is written, next sequence is claimed on next editor tick
+    """
+    global current_sequence
+    global start_next
+
+    render_movie_render_queue.camera_export.drain()
+
+    success = success and current_success
+    if work_queue.finish(current_sequence, success):
+        unreal.log(f"BEDLAM: Finished LevelSequence: {current_sequence}, success: {success}, queue: {work_queue.get_status()}")
+    else:
+        unreal.log_error(f"BEDLAM: Lost lease of LevelSequence, rendered again by other node: {current_sequence}")
+
+    current_sequence = None
+    start_next = True
+
+def OnTick(delta_time):
+    """
+    Start next sequence outside of executor callbacks and renew lease of current sequence
+    """
+    global start_next
+    global time_since_heartbeat
+
+    if start_next:
+        start_next = False
+        time_since_heartbeat = 0.0
+        start_next_sequence()
+        return
+
+    if current_sequence is None:
+        return
+
+    time_since_heartbeat += delta_time
+    if time_since_heartbeat >= HEARTBEAT_INTERVAL:
+        time_since_heartbeat = 0.0
+        if not work_queue.heartbeat(current_sequence):
+            unreal.log_warning(f"BEDLAM: Lost lease of LevelSequence: {current_sequence}")
+
+###############################################################################
+# Main
+###############################################################################
+if __name__ == "__main__":
+
+    unreal.log("BEDLAM: Render LevelSequences from render work queue")
+    if (len(sys.argv) < 4) or (len(sys.argv) > 5):
+        unreal.log_error(f"Usage: {sys.argv[0]} QUEUE_DIR OUTPUT_DIR RENDER_PRESET [PACKAGE_PATH]")
+        sys.exit(1)
+
+    work_queue = WorkQueue(sys.argv[1])
+    output_dir = sys.argv[2]
+    render_preset = create_movie_render_queue.parse_render_preset(sys.argv[3])
+    if len(sys.argv) == 5:
+        level_sequences_root = sys.argv[4].rstrip("/")
+
+    unreal.log(f"  Node: {work_queue.node_name}, queue: {work_queue.get_status()}")
+
+    create_movie_render_queue.output_dir = output_dir
+    render_movie_render_queue.output_dir = output_dir
+    render_movie_render_queue.camera_log = render_movie_render_queue.CameraLogTailer(render_movie_render_queue.get_logfile_path())
+    render_movie_render_queue.camera_log.skip_to_end()
+    map_path = create_movie_render_queue.get_map_path()
+
+    start_next = True
+    tick_handle = unreal.register_slate_post_tick_callback(OnTick)
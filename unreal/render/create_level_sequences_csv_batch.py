@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# Copyright (c) 2023 Max Planck Society
+# License: https://bedlam.is.tuebingen.mpg.de/license.html
+#
+# Batch generate LevelSequences for be_seq.csv in multiple headless Unreal Editor processes
+#
+# Each process runs create_level_sequences_csv.py on one contiguous shard of the sequences.
+# Shard fingerprint manifests are merged afterwards and a merged report is written next to the csv file.
+#
+# Notes:
+# + Python for Windows: py -3 create_level_sequences_csv_batch.py
+#
+
+import json
+from multiprocessing import Pool
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+sys.path.append(str(Path(__file__).parent / "Core" / "Python"))
+from be_sequence_manifest import get_report_path, get_shard_name, merge_manifests, save_json
+
+# Globals
+UNREAL_APP_PATH = r"C:\UE\UE_5.0\Engine\Binaries\Win64\UnrealEditor-Cmd.exe"
+UNREAL_PROJECT_PATH = r"C:\UEProjects\5.0\Sandbox5\Sandbox5.uproject"
+UNREAL_MAP_PATH = "/Game/Bedlam/Maps/BE_Map" # Target Level map, needs BE_CineCameraActor_Blueprint and BE_GroundTruthLogger actors
+CREATE_SCRIPT_PATH = "C:/bedlam_render/unreal/render/Core/Python/create_level_sequences_csv.py" # need forward slashes when calling via -ExecutePythonScript
+
+def worker(unreal_app_path, unreal_project_path, unreal_map_path, create_script_path, csv_path, camera_movement, shard_index, num_shards):
+    # "C:\UE\UE_5.0\Engine\Binaries\Win64\UnrealEditor-Cmd.exe" "C:\UEProjects\5.0\Sandbox5\Sandbox5.uproject" /Game/Bedlam/Maps/BE_Map -stdout -FullStdOutLogOutput -ExecutePythonScript="C:/bedlam_render/unreal/render/Core/Python/create_level_sequences_csv.py C:/bedlam/images/test/be_seq.csv Static 0 10"
+    subprocess_args = [unreal_app_path, unreal_project_path, unreal_map_path, "-stdout", "-FullStdOutLogOutput", f"-ExecutePythonScript={create_script_path} {csv_path} {camera_movement} {shard_index} {num_shards}"]
+    print(subprocess_args)
+
+    log_path = Path(csv_path).parent / f"log_levelsequences_{get_shard_name(shard_index, num_shards)}.txt"
+    with open(log_path, "w") as log_file:
+        result = subprocess.run(subprocess_args, stdout=log_file, stderr=subprocess.STDOUT)
+    return result.returncode
+
+def worker_args(args):
+    return worker(*args)
+
+def merge_reports(csv_path, num_shards):
+    report = { "shards": num_shards, "sequences": 0, "rebuilt": [], "skipped": [], "resumed": [], "failed": [], "missing_assets": [], "resources": [], "failed_shards": [] }
+    for shard_index in range(num_shards):
+        shard_name = get_shard_name(shard_index, num_shards)
+        shard_report_path = Path(get_report_path(csv_path, shard_name))
+        if not shard_report_path.exists():
+            report["failed_shards"].append(shard_name)
+            continue
+
+        shard_report = read_json(shard_report_path)
+        if not shard_report["success"]:
+            report["failed_shards"].append(shard_name)
+        report["sequences"] += shard_report["sequences"]
+        for key in ["rebuilt", "skipped", "resumed", "failed", "missing_assets", "resources"]:
+            report[key].extend(shard_report[key])
+        shard_report_path.unlink()
+
+    report["missing_assets"] = sorted(set(report["missing_assets"]))
+    report["success"] = (len(report["failed_shards"]) == 0)
+    return report
+
+def read_json(path):
+    with open(path, "r") as f:
+        return json.load(f)
+
+################################################################################
+# Main
+################################################################################
+if __name__ == "__main__":
+    if (len(sys.argv) < 4) or (len(sys.argv) > 5):
+        print('Usage: %s INPUTCSVPATH NUM_SHARDS PROCESSES [CAMERA_MOVEMENT]' % (sys.argv[0]), file=sys.stderr)
+        sys.exit(1)
+
+    csv_path = sys.argv[1].replace("\\", "/") # need forward slashes when calling via -ExecutePythonScript
+    num_shards = int(sys.argv[2])
+    processes = int(sys.argv[3])
+    camera_movement = "Static"
+    if len(sys.argv) == 5:
+        camera_movement = sys.argv[4]
+
+    print(f"Starting pool with {processes} processes, shards: {num_shards}\n", file=sys.stderr)
+    pool = Pool(processes)
+
+    start_time = time.perf_counter()
+    tasklist = []
+    for shard_index in range(num_shards):
+        tasklist.append( (UNREAL_APP_PATH, UNREAL_PROJECT_PATH, UNREAL_MAP_PATH, CREATE_SCRIPT_PATH, csv_path, camera_movement, shard_index, num_shards) )
+
+    result = pool.map(worker_args, tasklist)
+
+    fingerprints = merge_manifests(csv_path)
+    report = merge_reports(csv_path, num_shards)
+    report["time"] = time.perf_counter() - start_time
+    save_json(get_report_path(csv_path), report)
+
+    print(f"Sequences: {report['sequences']}, rebuilt: {len(report['rebuilt'])}, skipped (unchanged): {len(report['skipped'])}, resumed: {len(report['resumed'])}, failed: {len(report['failed'])}, fingerprints: {len(fingerprints)}")
+    for package_name in report["missing_assets"]:
+        print(f"  Missing asset: {package_name}")
+    for shard_name in report["failed_shards"]:
+        print(f"  Failed shard: {shard_name}")
+    print(f"Finished. Total batch generation time: {(time.perf_counter() - start_time):.1f}s")
+
+    if not report["success"]:
+        sys.exit(1)